@@ -0,0 +1,106 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:12
+
+import django.db.models.deletion
+import ujian_core.models
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ujian_core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RemoteAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('access_type', models.CharField(choices=[('MONITOR', 'Monitoring Only'), ('ASSIST', 'Assistance Mode'), ('CONTROL', 'Full Control')], default='MONITOR', max_length=20)),
+                ('admin_access_token', models.CharField(default=uuid.uuid4, max_length=100, unique=True)),
+                ('view_only_token', models.CharField(blank=True, max_length=100, null=True, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('start_time', models.DateTimeField(auto_now_add=True)),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('admin_consented', models.BooleanField(default=False)),
+                ('user_consented', models.BooleanField(default=False)),
+                ('user_consent_time', models.DateTimeField(blank=True, null=True)),
+                ('admin_ip', models.GenericIPAddressField(blank=True, null=True)),
+                ('encryption_key', models.CharField(default=ujian_core.models.generate_encryption_key, max_length=64)),
+                ('activity_log', models.JSONField(default=list)),
+            ],
+            options={
+                'verbose_name': 'Remote Access',
+                'verbose_name_plural': 'Remote Accesses',
+            },
+        ),
+        migrations.CreateModel(
+            name='SecurityEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('LOCK', 'Session Locked'), ('UNLOCK_ATTEMPT', 'Unlock Attempt'), ('UNLOCK_SUCCESS', 'Unlock Success'), ('UNLOCK_FAILED', 'Unlock Failed'), ('REMOTE_ACCESS_REQUEST', 'Remote Access Request'), ('REMOTE_ACCESS_GRANTED', 'Remote Access Granted'), ('REMOTE_ACCESS_REVOKED', 'Remote Access Revoked'), ('PAGE_VIOLATION', 'Page Violation'), ('SESSION_TAMPER', 'Session Tampering')], max_length=50)),
+                ('description', models.TextField()),
+                ('ip_address', models.GenericIPAddressField()),
+                ('user_agent', models.TextField()),
+                ('browser_fingerprint', models.TextField(blank=True)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('metadata', models.JSONField(default=dict)),
+            ],
+            options={
+                'verbose_name': 'Security Event',
+                'verbose_name_plural': 'Security Events',
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SessionLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_locked', models.BooleanField(default=False)),
+                ('lock_start_time', models.DateTimeField(blank=True, null=True)),
+                ('lock_end_time', models.DateTimeField(blank=True, null=True)),
+                ('user_consented', models.BooleanField(default=False)),
+                ('consent_time', models.DateTimeField(blank=True, null=True)),
+                ('session_token', models.CharField(default=uuid.uuid4, max_length=100, unique=True)),
+                ('unlock_token', models.CharField(blank=True, max_length=100, null=True, unique=True)),
+                ('browser_fingerprint', models.TextField(blank=True)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('user_agent', models.TextField(blank=True)),
+                ('screen_resolution', models.CharField(blank=True, max_length=20)),
+                ('unlock_attempts', models.IntegerField(default=0)),
+                ('last_unlock_attempt', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Session Lock',
+                'verbose_name_plural': 'Session Locks',
+            },
+        ),
+        migrations.AddField(
+            model_name='remoteaccess',
+            name='granted_by_admin',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='granted_accesses', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='securityevent',
+            name='remote_access',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='ujian_core.remoteaccess'),
+        ),
+        migrations.AddField(
+            model_name='sessionlock',
+            name='hasil_ujian',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='session_lock', to='ujian_core.hasilujian'),
+        ),
+        migrations.AddField(
+            model_name='securityevent',
+            name='session_lock',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='security_events', to='ujian_core.sessionlock'),
+        ),
+        migrations.AddField(
+            model_name='remoteaccess',
+            name='session_lock',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='remote_accesses', to='ujian_core.sessionlock'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.8 on 2026-10-18 08:15
+
+from django.db import migrations, models
+
+
+def isi_nama_normal(apps, schema_editor):
+    """Backfill nama_normal untuk peserta lama.
+
+    Data lama bisa punya nama dobel di kelas yang sama; yang pertama (id
+    terkecil) dapat nama_normal asli, sisanya diberi akhiran #id supaya
+    constraint unik bisa dibuat tanpa menghapus data (lookup nama tetap
+    mengembalikan peserta pertama, sama seperti .first() sebelumnya).
+    """
+    Peserta = apps.get_model('ujian_core', 'Peserta')
+    seen = set()
+    batch = []
+
+    for peserta in Peserta.objects.order_by('id').only('id', 'nama', 'kelas').iterator(chunk_size=1000):
+        # Sama dengan roster.normalize_nama (disalin agar migrasi tetap beku)
+        normal = " ".join(str(peserta.nama or "").split()).casefold()
+        if (normal, peserta.kelas) in seen:
+            normal = f"{normal}#{peserta.id}"[:100]
+        seen.add((normal, peserta.kelas))
+
+        peserta.nama_normal = normal
+        batch.append(peserta)
+        if len(batch) >= 1000:
+            Peserta.objects.bulk_update(batch, ['nama_normal'])
+            batch = []
+
+    if batch:
+        Peserta.objects.bulk_update(batch, ['nama_normal'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ujian_core', '0002_remoteaccess_securityevent_sessionlock_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='peserta',
+            name='nama_normal',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(isi_nama_normal, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='peserta',
+            constraint=models.UniqueConstraint(fields=('nama_normal', 'kelas'), name='unique_peserta_nama_normal_kelas'),
+        ),
+    ]
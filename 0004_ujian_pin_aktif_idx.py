@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ujian_core', '0003_peserta_nama_normal'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ujian',
+            index=models.Index(fields=['pin_ujian', 'aktif'], name='ujian_pin_aktif_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-18 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ujian_core', '0004_ujian_pin_aktif_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hasilujian',
+            name='jawaban_seq',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,126 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:30
+
+import hashlib
+import json
+from datetime import timezone as dt_timezone
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signing import Signer, BadSignature
+from django.db import migrations, models
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+# Model historis tidak punya method. Rumus hash/tanda tangan disalin (dibekukan)
+# dari AuditEntry.compute_hash / sign_hash versi migrasi ini, bukan di-import
+# dari models.py: migrasi harus tetap jalan walau model berubah nanti.
+def compute_hash(prev_hash, seq, timestamp, action, details, admin):
+    payload = json.dumps(
+        [prev_hash, seq, timestamp.astimezone(dt_timezone.utc).isoformat(), action, details, admin],
+        cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def sign_hash(entry_hash):
+    return Signer(salt='ujian_core.audit').sign(entry_hash).rsplit(':', 1)[1]
+
+
+def explode_activity_log(apps, schema_editor):
+    """Pecah array RemoteAccess.activity_log jadi satu baris AuditEntry per entri"""
+    RemoteAccess = apps.get_model('ujian_core', 'RemoteAccess')
+    AuditEntry = apps.get_model('ujian_core', 'AuditEntry')
+    signer = Signer()
+    batch = getattr(settings, 'AUDIT_SIGN_BATCH', 20)
+    now = timezone.now()
+
+    for remote_access in RemoteAccess.objects.only('id', 'activity_log').iterator(chunk_size=100):
+        rows = []
+        prev_hash = ''
+        for seq, raw in enumerate(remote_access.activity_log or [], start=1):
+            try:
+                entry = signer.unsign_object(raw)
+                action = str(entry.get('action', ''))[:100]
+                details = entry.get('details', {})
+                admin = str(entry.get('admin', ''))[:150]
+                timestamp = parse_datetime(entry.get('timestamp') or '') or now
+                if timezone.is_naive(timestamp):
+                    timestamp = timezone.make_aware(timestamp)
+            except (BadSignature, TypeError, ValueError, AttributeError):
+                # SECRET_KEY sudah ganti / entri diubah: simpan apa adanya
+                action, details, admin, timestamp = 'LEGACY_UNVERIFIED', {'raw': raw}, '', now
+
+            entry_hash = compute_hash(prev_hash, seq, timestamp, action, details, admin)
+            rows.append(AuditEntry(
+                remote_access_id=remote_access.id,
+                seq=seq,
+                timestamp=timestamp,
+                action=action,
+                details=details,
+                admin=admin,
+                prev_hash=prev_hash,
+                entry_hash=entry_hash,
+                signature=sign_hash(entry_hash) if seq % batch == 0 else '',
+            ))
+            prev_hash = entry_hash
+        AuditEntry.objects.bulk_create(rows, batch_size=500)
+
+
+def implode_activity_log(apps, schema_editor):
+    """Kebalikan: susun ulang array activity_log bertanda tangan"""
+    RemoteAccess = apps.get_model('ujian_core', 'RemoteAccess')
+    AuditEntry = apps.get_model('ujian_core', 'AuditEntry')
+    signer = Signer()
+
+    for remote_access in RemoteAccess.objects.only('id').iterator(chunk_size=100):
+        log = []
+        for entry in AuditEntry.objects.filter(remote_access_id=remote_access.id).order_by('seq').iterator():
+            if entry.action == 'LEGACY_UNVERIFIED' and 'raw' in entry.details:
+                log.append(entry.details['raw'])
+            else:
+                log.append(signer.sign_object({
+                    'timestamp': entry.timestamp.isoformat(),
+                    'action': entry.action,
+                    'details': entry.details,
+                    'admin': entry.admin,
+                }))
+        if log:
+            RemoteAccess.objects.filter(id=remote_access.id).update(activity_log=log)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ujian_core', '0005_hasilujian_jawaban_seq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField()),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('action', models.CharField(max_length=100)),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('admin', models.CharField(blank=True, max_length=150)),
+                ('prev_hash', models.CharField(blank=True, max_length=64)),
+                ('entry_hash', models.CharField(max_length=64)),
+                ('signature', models.CharField(blank=True, max_length=200)),
+                ('remote_access', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audit_entries', to='ujian_core.remoteaccess')),
+            ],
+            options={
+                'verbose_name': 'Audit Entry',
+                'verbose_name_plural': 'Audit Entries',
+                'constraints': [models.UniqueConstraint(fields=('remote_access', 'seq'), name='unique_audit_entry_seq')],
+            },
+        ),
+        migrations.RunPython(explode_activity_log, implode_activity_log),
+        migrations.RemoveField(
+            model_name='remoteaccess',
+            name='activity_log',
+        ),
+    ]
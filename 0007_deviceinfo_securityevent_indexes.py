@@ -0,0 +1,147 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:20
+
+import hashlib
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+# Disalin (dibekukan) dari DeviceInfo.hash_for versi migrasi ini, bukan di-import
+# dari models.py: DeviceInfo.intern() harus menemukan baris hasil migrasi ini
+def hash_for(user_agent, browser_fingerprint=''):
+    return hashlib.sha256(f"{user_agent}\0{browser_fingerprint}".encode('utf-8')).hexdigest()
+
+
+BATCH_SIZE = 1000
+
+
+def intern_devices(apps, schema_editor):
+    """
+    Pindahkan user_agent/fingerprint ke DeviceInfo dan isi ujian_id dari session_lock.
+
+    Event dibaca per batch pk; device & ujian dicocokkan di memori lalu
+    ditulis dengan bulk_update per pk. (UPDATE ... WHERE user_agent=... per
+    pasangan = full scan tabel per pasangan, kolom teks itu tidak ber-index.)
+    """
+    SecurityEvent = apps.get_model('ujian_core', 'SecurityEvent')
+    DeviceInfo = apps.get_model('ujian_core', 'DeviceInfo')
+    SessionLock = apps.get_model('ujian_core', 'SessionLock')
+
+    devices = {}  # hash → DeviceInfo.id
+    ujian_by_lock = {}  # SessionLock.id → ujian_id
+    last_pk = 0
+    while True:
+        events = list(
+            SecurityEvent.objects
+            .filter(pk__gt=last_pk)
+            .order_by('pk')
+            .only('id', 'user_agent', 'browser_fingerprint', 'session_lock_id')[:BATCH_SIZE]
+        )
+        if not events:
+            break
+        last_pk = events[-1].pk
+
+        keys = {event.pk: hash_for(event.user_agent, event.browser_fingerprint) for event in events}
+        missing = {}
+        for event in events:
+            key = keys[event.pk]
+            if key not in devices:
+                missing.setdefault(key, (event.user_agent, event.browser_fingerprint))
+        if missing:
+            DeviceInfo.objects.bulk_create(
+                [DeviceInfo(hash=key, user_agent=ua, browser_fingerprint=fp) for key, (ua, fp) in missing.items()],
+                ignore_conflicts=True,
+            )
+            devices.update(DeviceInfo.objects.filter(hash__in=list(missing)).values_list('hash', 'id'))
+
+        locks = {event.session_lock_id for event in events} - set(ujian_by_lock) - {None}
+        if locks:
+            ujian_by_lock.update(
+                SessionLock.objects.filter(id__in=locks).values_list('id', 'hasil_ujian__ujian_id')
+            )
+
+        for event in events:
+            event.device_id = devices[keys[event.pk]]
+            event.ujian_id = ujian_by_lock.get(event.session_lock_id)
+        SecurityEvent.objects.bulk_update(events, ['device', 'ujian'], batch_size=BATCH_SIZE)
+
+
+def restore_device_text(apps, schema_editor):
+    SecurityEvent = apps.get_model('ujian_core', 'SecurityEvent')
+    DeviceInfo = apps.get_model('ujian_core', 'DeviceInfo')
+    for device in DeviceInfo.objects.iterator(chunk_size=1000):
+        SecurityEvent.objects.filter(device=device).update(
+            user_agent=device.user_agent,
+            browser_fingerprint=device.browser_fingerprint,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ujian_core', '0006_auditentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeviceInfo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.CharField(max_length=64, unique=True)),
+                ('user_agent', models.TextField(blank=True)),
+                ('browser_fingerprint', models.TextField(blank=True)),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Device Info',
+                'verbose_name_plural': 'Device Info',
+            },
+        ),
+        migrations.AddField(
+            model_name='securityevent',
+            name='ujian',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='security_events', to='ujian_core.ujian'),
+        ),
+        migrations.AlterField(
+            model_name='securityevent',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='securityevent',
+            name='device',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='ujian_core.deviceinfo'),
+        ),
+        migrations.RunPython(intern_devices, restore_device_text),
+        # blank=True supaya kolom bisa dibuat ulang saat migrasi dibalik
+        migrations.AlterField(
+            model_name='securityevent',
+            name='user_agent',
+            field=models.TextField(blank=True),
+        ),
+        migrations.RemoveField(
+            model_name='securityevent',
+            name='browser_fingerprint',
+        ),
+        migrations.RemoveField(
+            model_name='securityevent',
+            name='user_agent',
+        ),
+        migrations.AddIndex(
+            model_name='securityevent',
+            index=models.Index(fields=['ujian', 'event_type', '-timestamp'], name='secevent_ujian_type_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='securityevent',
+            index=models.Index(fields=['session_lock', '-timestamp'], name='secevent_session_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='securityevent',
+            index=models.Index(fields=['event_type', '-timestamp'], name='secevent_type_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='securityevent',
+            index=models.Index(fields=['-timestamp'], name='secevent_time_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ujian_core', '0007_deviceinfo_securityevent_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hasilujian',
+            name='jumlah_benar',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='hasilujian',
+            name='skor',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='hasilujian',
+            name='skor_digest',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.CreateModel(
+            name='AnalisisSoal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('soal', models.CharField(max_length=20)),
+                ('jumlah_peserta', models.IntegerField(default=0)),
+                ('tingkat_kesulitan', models.FloatField(blank=True, null=True)),
+                ('daya_beda', models.FloatField(blank=True, null=True)),
+                ('distraktor', models.JSONField(default=dict)),
+                ('diperbarui', models.DateTimeField(auto_now=True)),
+                ('ujian', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analisis_soal', to='ujian_core.ujian')),
+            ],
+            options={
+                'verbose_name': 'Analisis Soal',
+                'verbose_name_plural': 'Analisis Soal',
+                'constraints': [models.UniqueConstraint(fields=('ujian', 'soal'), name='unique_analisis_soal')],
+            },
+        ),
+        migrations.CreateModel(
+            name='KunciJawaban',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('soal', models.CharField(max_length=20)),
+                ('kunci', models.CharField(max_length=100)),
+                ('bobot', models.FloatField(default=1)),
+                ('ujian', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='kunci_jawaban', to='ujian_core.ujian')),
+            ],
+            options={
+                'verbose_name': 'Kunci Jawaban',
+                'verbose_name_plural': 'Kunci Jawaban',
+                'constraints': [models.UniqueConstraint(fields=('ujian', 'soal'), name='unique_kunci_soal')],
+            },
+        ),
+    ]
@@ -1,10 +1,20 @@
+from django import forms
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import path
 from django.shortcuts import render, redirect
-from django.http import HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.db.models import Count
+import codecs
 import csv
-from .models import Ujian, Peserta, KodeAkses, HasilUjian
+from .models import Ujian, Peserta, KodeAkses, HasilUjian, KunciJawaban, AnalisisSoal
+from .importer import bulk_import_peserta
+from .kode_akses import generate_kode_akses, write_csv, build_zip, KODE_PANJANG
+from .qr_render import qr_available
+from .export_hasil import EXPORTERS, Echo
+from .scoring import nilai_ujian, scoring_available
+from .exam_clock import forget_session
+from .monitor_feed import publish_session
 
 class MobileFriendlyAdmin(admin.ModelAdmin):
     class Media:
@@ -13,6 +23,14 @@ class MobileFriendlyAdmin(admin.ModelAdmin):
         }
 
 # ==================== FITUR IMPORT CSV ====================
+def parse_csv_row(row):
+    """Satu baris CSV (header nama, kelas, nis) → field Peserta"""
+    return {
+        'nama': row['nama'].strip(),
+        'kelas': (row.get('kelas') or '').strip(),
+        'nis': (row.get('nis') or '').strip(),
+    }
+
 class ImportExportMixin:
     """Mixin untuk fitur import/export data"""
     
@@ -25,30 +43,24 @@ class ImportExportMixin:
                 return redirect('..')
             
             try:
-                decoded_file = csv_file.read().decode('utf-8').splitlines()
-                reader = csv.DictReader(decoded_file)
-                
-                imported = 0
-                errors = []
-                
-                for row_num, row in enumerate(reader, 2):  # row 2 karena header di row 1
-                    try:
-                        # Buat peserta baru
-                        peserta, created = Peserta.objects.get_or_create(
-                            nama=row['nama'].strip(),
-                            defaults={
-                                'kelas': row.get('kelas', '').strip(),
-                                'nis': row.get('nis', '').strip()
-                            }
-                        )
-                        if created:
-                            imported += 1
-                        else:
-                            errors.append(f"Baris {row_num}: {row['nama']} sudah ada")
-                            
-                    except Exception as e:
-                        errors.append(f"Baris {row_num}: Error - {str(e)}")
-                
+                # Dibaca per baris (streaming), tidak di-load semua ke memori
+                reader = csv.DictReader(codecs.iterdecode(csv_file, 'utf-8-sig'))
+
+                report = bulk_import_peserta(
+                    enumerate(reader, 2),  # row 2 karena header di row 1
+                    parse_csv_row,
+                    match_kelas=True,
+                )
+                imported = report['imported']
+                errors = [
+                    (row_num, f"Baris {row_num}: {nama} sudah ada")
+                    for row_num, nama in report['existing']
+                ] + [
+                    (row_num, f"Baris {row_num}: Error - {pesan}")
+                    for row_num, _, pesan in report['errors']
+                ]
+                errors = [pesan for _, pesan in sorted(errors)]
+
                 # Tampilkan hasil
                 if imported > 0:
                     self.message_user(request, f"✅ {imported} data berhasil diimport!")
@@ -74,6 +86,10 @@ class PesertaAdmin(MobileFriendlyAdmin, ImportExportMixin):
     search_fields = ('nis', 'nama', 'kelas')
     list_per_page = 50
     
+    def get_queryset(self, request):
+        # Jumlah ujian dihitung di query changelist, bukan 1 query per baris
+        return super().get_queryset(request).annotate(_ujian_count=Count('hasilujian'))
+    
     # Tambah URL custom untuk import
     def get_urls(self):
         urls = super().get_urls()
@@ -83,13 +99,14 @@ class PesertaAdmin(MobileFriendlyAdmin, ImportExportMixin):
         return custom_urls + urls
     
     def ujian_count(self, obj):
-        count = obj.hasilujian_set.count()
+        count = obj._ujian_count
         return format_html(
             '<span style="color: {};">{}</span>',
             'green' if count > 0 else 'gray',
             count
         )
     ujian_count.short_description = 'Ujian'
+    ujian_count.admin_order_field = '_ujian_count'
     
     def actions_column(self, obj):
         """Tombol aksi cepat"""
@@ -106,16 +123,17 @@ class PesertaAdmin(MobileFriendlyAdmin, ImportExportMixin):
     actions = ['export_selected', 'duplicate_selected']
     
     def export_selected(self, request, queryset):
-        """Export data terpilih ke CSV"""
-        response = "HttpResponse"(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="peserta_export.csv"'
+        """Export data terpilih ke CSV (streaming, tanpa load semua objek)"""
+        writer = csv.writer(Echo())
+        rows = queryset.order_by('id').values_list('nis', 'nama', 'kelas').iterator(chunk_size=2000)
         
-        writer = csv.writer(response)
-        writer.writerow(['NIS', 'Nama', 'Kelas'])
-        
-        for peserta in queryset:
-            writer.writerow([peserta.nis, peserta.nama, peserta.kelas])
+        def _lines():
+            yield writer.writerow(['NIS', 'Nama', 'Kelas'])
+            for row in rows:
+                yield writer.writerow(row)
         
+        response = StreamingHttpResponse(_lines(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="peserta_export.csv"'
         return response
     export_selected.short_description = "📤 Export data terpilih ke CSV"
     
@@ -125,7 +143,7 @@ class PesertaAdmin(MobileFriendlyAdmin, ImportExportMixin):
         for peserta in queryset:
             # Buat duplikat dengan nama yang berbeda
             new_nama = f"{peserta.nama} (Copy)"
-            if not Peserta.objects.filter(nama=new_nama).exists():
+            if not Peserta.cari_nama(new_nama).filter(kelas=peserta.kelas).exists():
                 Peserta.objects.create(
                     nama=new_nama,
                     kelas=peserta.kelas,
@@ -137,17 +155,37 @@ class PesertaAdmin(MobileFriendlyAdmin, ImportExportMixin):
     duplicate_selected.short_description = "📝 Duplikat data terpilih"
 
 # ==================== UJIAN ADMIN - DITAMBAH FITUR BATCH ====================
+class GenerateKodeAksesForm(forms.Form):
+    jumlah = forms.IntegerField(label='Jumlah kode per ujian', min_value=1, max_value=50000, initial=100)
+    panjang = forms.IntegerField(label='Panjang kode', min_value=6, max_value=20, initial=KODE_PANJANG)
+    prefix = forms.CharField(label='Awalan', required=False, max_length=10)
+    format = forms.ChoiceField(
+        label='Lembar cetak',
+        choices=[('csv', 'CSV'), ('zip', 'ZIP (CSV + QR PNG)')],
+        initial='csv',
+    )
+
+class KunciJawabanInline(admin.TabularInline):
+    model = KunciJawaban
+    extra = 0
+    fields = ('soal', 'kunci', 'bobot')
+
 @admin.register(Ujian)
 class UjianAdmin(MobileFriendlyAdmin):
     list_display = ('nama_ujian', 'pin_ujian', 'waktu_mulai', 'durasi', 'aktif', 'peserta_count', 'ujian_actions')
     list_filter = ('aktif', 'waktu_mulai')
     search_fields = ('nama_ujian', 'pin_ujian')
-    list_editable = ('aktif',)  # Bisa edit langsung dari list
+    list_editable = ('aktif',)  # Bisa edit langsung dari list (save → post_save → cache PIN login di-reset)
+    inlines = [KunciJawabanInline]
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_peserta_count=Count('hasilujian'))
     
     def peserta_count(self, obj):
-        count = obj.hasilujian_set.count()
+        count = obj._peserta_count
         return format_html('<b>{}</b>', count)
     peserta_count.short_description = 'Peserta'
+    peserta_count.admin_order_field = '_peserta_count'
     
     def ujian_actions(self, obj):
         """Tombol aksi untuk ujian"""
@@ -159,6 +197,63 @@ class UjianAdmin(MobileFriendlyAdmin):
             obj.id, obj.id
         )
     ujian_actions.short_description = 'Aksi'
+    
+    actions = ['generate_kode_akses', 'hitung_skor']
+    
+    def generate_kode_akses(self, request, queryset):
+        """Generate N kode akses per ujian terpilih, langsung diunduh sebagai lembar cetak"""
+        form = GenerateKodeAksesForm(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            data = form.cleaned_data
+            if data['format'] == 'zip' and not qr_available():
+                self.message_user(request, "❌ Library QR belum terpasang (pip install segno)", level='ERROR')
+                return None
+            
+            try:
+                batches = [
+                    (ujian, generate_kode_akses(ujian, data['jumlah'], panjang=data['panjang'], prefix=data['prefix']))
+                    for ujian in queryset
+                ]
+            except ValueError as e:
+                self.message_user(request, f"❌ {e}", level='ERROR')
+                return None
+            
+            if data['format'] == 'zip':
+                response = HttpResponse(build_zip(batches), content_type='application/zip')
+                response['Content-Disposition'] = 'attachment; filename="kode_akses.zip"'
+            else:
+                response = HttpResponse(content_type='text/csv')
+                response['Content-Disposition'] = 'attachment; filename="kode_akses.csv"'
+                for i, (ujian, codes) in enumerate(batches):
+                    write_csv(response, ujian, codes, header=(i == 0))
+            return response
+        
+        return render(request, 'ujian_core/generate_kode_akses.html', {
+            'title': 'Generate Kode Akses',
+            'opts': self.model._meta,
+            'form': form,
+            'queryset': queryset,
+            'action_checkbox_name': admin.helpers.ACTION_CHECKBOX_NAME,
+        })
+    generate_kode_akses.short_description = "🔑 Generate kode akses (CSV / QR)"
+    
+    def hitung_skor(self, request, queryset):
+        """Nilai hasil ujian terpilih + analisis soal (hanya hasil yang berubah yang ditulis ulang)"""
+        if not scoring_available():
+            self.message_user(request, "❌ Library numpy belum terpasang (pip install numpy)", level='ERROR')
+            return
+        for ujian in queryset:
+            try:
+                ringkasan = nilai_ujian(ujian.id)
+            except ValueError as e:
+                self.message_user(request, f"⚠️ {ujian.nama_ujian}: {e}", level='WARNING')
+                continue
+            self.message_user(
+                request,
+                f"✅ {ujian.nama_ujian}: {ringkasan['dinilai']} hasil dinilai, "
+                f"{ringkasan['diperbarui']} skor diperbarui, {ringkasan['soal']} soal dianalisis",
+            )
+    hitung_skor.short_description = "🧮 Hitung skor & analisis soal"
 
 # ==================== KODE AKSES ADMIN - TETAP SAMA ====================
 @admin.register(KodeAkses)
@@ -166,18 +261,22 @@ class KodeAksesAdmin(MobileFriendlyAdmin):
     list_display = ('kode', 'ujian', 'terpakai', 'created_time')
     list_filter = ('terpakai', 'ujian')
     search_fields = ('kode',)
+    list_select_related = ('ujian',)
 
     def created_time(self, obj):
         return obj.ujian.waktu_mulai
     created_time.short_description = 'Waktu Ujian'
+    created_time.admin_order_field = 'ujian__waktu_mulai'
 
 # ==================== HASIL UJIAN ADMIN - TETAP SAMA ====================
 @admin.register(HasilUjian)
 class HasilUjianAdmin(MobileFriendlyAdmin):
-    list_display = ('peserta', 'ujian', 'status_badge', 'percobaan_keluar', 'duration', 'waktu_mulai')
+    list_display = ('peserta', 'ujian', 'status_badge', 'skor', 'percobaan_keluar', 'duration', 'waktu_mulai')
     list_filter = ('status', 'ujian', 'waktu_mulai')
     search_fields = ('peserta__nama', 'ujian__nama_ujian')
-    readonly_fields = ('waktu_mulai', 'percobaan_keluar', 'jawaban_preview')
+    readonly_fields = ('waktu_mulai', 'percobaan_keluar', 'skor', 'jumlah_benar', 'jawaban_preview')
+    exclude = ('skor_digest',)
+    list_select_related = ('peserta', 'ujian')
 
     def status_badge(self, obj):
         colors = {
@@ -206,23 +305,66 @@ class HasilUjianAdmin(MobileFriendlyAdmin):
     jawaban_preview.short_description = 'Preview Jawaban'
 
     # Actions
-    actions = ['reset_ujian', 'diskualifikasi_ujian']
+    actions = ['reset_ujian', 'diskualifikasi_ujian', 'export_csv', 'export_jsonl']
+
+    def _ubah_status(self, queryset, **changes):
+        """
+        UPDATE massal + buang cache jam sesi (status baru langsung berlaku
+        untuk autosave / submit) + kirim ke feed monitor, seperti di views
+        """
+        ids = list(queryset.values_list('id', flat=True))
+        updated = HasilUjian.objects.filter(id__in=ids).update(**changes)
+        for hasil_ujian_id in ids:
+            forget_session(hasil_ujian_id=hasil_ujian_id)
+            publish_session(hasil_ujian_id, changes['status'])
+        return updated
 
     def reset_ujian(self, request, queryset):
-        updated = queryset.update(
+        updated = self._ubah_status(
+            queryset,
             status='mulai',
             percobaan_keluar=0,
             jawaban={},
-            waktu_selesai=None
+            jawaban_seq={},
+            waktu_selesai=None,
+            # Skor lama jangan ikut tampil / ter-export; dinilai ulang setelah selesai lagi
+            skor=None,
+            jumlah_benar=None,
+            skor_digest=''
         )
         self.message_user(request, f"{updated} ujian berhasil direset")
     reset_ujian.short_description = "🔄 Reset ujian terpilih"
 
     def diskualifikasi_ujian(self, request, queryset):
-        updated = queryset.update(status='diskualifikasi')
+        updated = self._ubah_status(queryset, status='diskualifikasi')
         self.message_user(request, f"{updated} peserta didiskualifikasi")
     diskualifikasi_ujian.short_description = "🚫 Diskualifikasi peserta terpilih"
 
+    def _export(self, queryset, fmt):
+        exporter, content_type = EXPORTERS[fmt]
+        response = StreamingHttpResponse(exporter(queryset), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="hasil_ujian.{fmt}"'
+        return response
+
+    def export_csv(self, request, queryset):
+        return self._export(queryset, 'csv')
+    export_csv.short_description = "📤 Export hasil terpilih ke CSV (1 kolom per soal)"
+
+    def export_jsonl(self, request, queryset):
+        return self._export(queryset, 'jsonl')
+    export_jsonl.short_description = "📤 Export hasil terpilih ke JSONL"
+
+# ==================== ANALISIS SOAL ADMIN (HASIL scoring.py) ====================
+@admin.register(AnalisisSoal)
+class AnalisisSoalAdmin(MobileFriendlyAdmin):
+    list_display = ('ujian', 'soal', 'jumlah_peserta', 'tingkat_kesulitan', 'daya_beda', 'distraktor', 'diperbarui')
+    list_filter = ('ujian',)
+    list_select_related = ('ujian',)
+    readonly_fields = ('ujian', 'soal', 'jumlah_peserta', 'tingkat_kesulitan', 'daya_beda', 'distraktor', 'diperbarui')
+
+    def has_add_permission(self, request):
+        return False
+
 # ==================== TAMBAH LINK IMPORT DI HALAMAN UTAMA ADMIN ====================
 admin.site.site_header = "Sistem Ujian Digital"
 admin.site.site_title = "Admin Ujian"
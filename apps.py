@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class UjianCoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ujian_core'
+
+    def ready(self):
+        # Daftarkan signal invalidasi cache jam ujian & feed monitor
+        from . import exam_clock  # noqa: F401
+        from . import monitor_feed  # noqa: F401
+
+        # Bangun indeks siswa.json sekali saat startup (bukan saat login pertama)
+        from .roster import get_roster
+        get_roster().refresh(force=True)
+
+        # Render halaman peserta sekarang supaya request pertama tidak menunggu render
+        if settings.PAGE_CACHE_ENABLED:
+            from .page_cache import warm
+            warm()
@@ -0,0 +1,28 @@
+"""
+ASGI config for ujian_platform project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+Alternatif wsgi.py untuk server async, misalnya:
+
+    uvicorn ujian_platform.asgi:application --host 0.0.0.0 --port 8000
+
+Di mode ini endpoint alert, test-notif dan feed monitor berjalan async;
+kerja ORM-nya lewat thread pool terbatas (ASYNC_ORM_THREADS). File di
+STATIC_ROOT dilayani StaticASGIMiddleware sebelum masuk Django.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ujian_platform.settings')
+
+application = get_asgi_application()
+
+from ujian_core.static_serve import StaticASGIMiddleware  # noqa: E402 (butuh settings)
+
+application = StaticASGIMiddleware(application)
@@ -0,0 +1,36 @@
+"""
+Thread pool terbatas untuk kerja sinkron (ORM, file log) dari view async.
+
+sync_to_async bawaan memakai executor default / satu thread per request;
+di sini jumlah thread dibatasi ASYNC_ORM_THREADS supaya lonjakan alert
+tidak membuka koneksi DB sebanyak jumlah request.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+# Thread dibuat saat dibutuhkan, paling banyak max_workers
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'ASYNC_ORM_THREADS', 8),
+    thread_name_prefix='async-orm',
+)
+
+
+def _call(func, args, kwargs):
+    # Sama seperti siklus request: koneksi kadaluarsa / rusak dibuang dulu
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_orm(func, *args, **kwargs):
+    """Jalankan func(*args, **kwargs) di thread pool, tunggu hasilnya"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor, functools.partial(_call, func, args, kwargs)
+    )
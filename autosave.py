@@ -0,0 +1,212 @@
+"""
+Autosave jawaban per soal (delta) dengan penggabungan tulis.
+
+Client mengirim patch {soal: jawaban} dengan nomor urut (seq) yang naik
+terus. Patch ditampung di memori per sesi lalu ditulis oleh thread
+background paling sering sekali per AUTOSAVE_INTERVAL detik per sesi,
+sehingga beban tulis tersebar sepanjang ujian. Di DB setiap soal
+menyimpan seq terakhirnya (HasilUjian.jawaban_seq), jadi patch yang
+datang terlambat / diulang tidak menimpa jawaban yang lebih baru, bahkan
+kalau patch sesi yang sama mampir ke worker berbeda.
+
+Kalau penulisan gagal (mis. SQLite "database is locked"), patch
+dikembalikan ke antrean dan dicoba lagi di putaran berikutnya.
+
+Submit hanya bisa menulis patch yang tertampung di worker yang melayani
+submit itu. Patch yang masih tertahan di worker lain ditulis belakangan:
+untuk sesi yang sudah 'selesai', patch tetap dipakai kalau diterima
+server sebelum waktu_selesai (jawaban yang dikirim sebelum submit tidak
+hilang). Sesi diskualifikasi tidak pernah diubah.
+"""
+import atexit
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .exam_clock import masih_dalam_waktu
+from .models import HasilUjian
+
+_pending = {}
+_pending_lock = threading.Lock()
+_flusher = None
+_flusher_pid = None
+
+
+def _interval():
+    return getattr(settings, 'AUTOSAVE_INTERVAL', 10)
+
+
+def queue_patch(hasil_ujian_id, seq, jawaban):
+    """
+    Tampung patch jawaban. Return (diterima, seq_tertinggi_yang_diterima);
+    patch dengan seq <= seq terakhir yang sudah diterima proses ini diabaikan.
+    """
+    if getattr(settings, 'AUTOSAVE_BACKGROUND', True):
+        _ensure_flusher()
+    diterima = timezone.now()
+    with _pending_lock:
+        state = _state(hasil_ujian_id)
+        if seq <= state['max_seq']:
+            return False, state['max_seq']
+
+        state['max_seq'] = seq
+        _merge(state, {str(soal): (seq, nilai, diterima) for soal, nilai in jawaban.items()})
+        return True, seq
+
+
+def _state(hasil_ujian_id):
+    state = _pending.get(hasil_ujian_id)
+    if state is None:
+        state = _pending[hasil_ujian_id] = {
+            'deltas': {},
+            'max_seq': -1,
+            'dirty_since': None,
+            'last_flush': 0.0,
+        }
+    return state
+
+
+def _merge(state, deltas):
+    """Gabungkan {soal: (seq, jawaban, diterima)} ke antrean; per soal seq terbesar menang"""
+    for soal, delta in deltas.items():
+        old = state['deltas'].get(soal)
+        if old is None or old[0] < delta[0]:
+            state['deltas'][soal] = delta
+    if state['deltas'] and state['dirty_since'] is None:
+        state['dirty_since'] = time.monotonic()
+
+
+def _write(hasil_ujian_id, deltas):
+    """apply_deltas; kalau gagal patch dikembalikan ke antrean lalu error diteruskan"""
+    try:
+        return apply_deltas(hasil_ujian_id, deltas)
+    except Exception:
+        with _pending_lock:
+            _merge(_state(hasil_ujian_id), deltas)
+        raise
+
+
+def flush_session(hasil_ujian_id):
+    """Tulis patch tertunda satu sesi sekarang (dipakai saat submit)"""
+    with _pending_lock:
+        state = _pending.get(hasil_ujian_id)
+        deltas = _take(state)
+    if deltas:
+        _write(hasil_ujian_id, deltas)
+
+
+def flush_due(force=False):
+    """Tulis semua sesi yang patch-nya sudah menunggu >= interval"""
+    now = time.monotonic()
+    interval = _interval()
+    due = []
+    with _pending_lock:
+        for hasil_ujian_id, state in list(_pending.items()):
+            if state['dirty_since'] is None:
+                # Sesi diam lama → buang state supaya memori tidak tumbuh terus
+                if now - state['last_flush'] > 10 * interval:
+                    del _pending[hasil_ujian_id]
+                continue
+            if force or now - state['last_flush'] >= interval:
+                state['last_flush'] = now
+                due.append((hasil_ujian_id, _take(state)))
+
+    for hasil_ujian_id, deltas in due:
+        try:
+            _write(hasil_ujian_id, deltas)
+        except Exception as e:
+            print(f"Error autosave jawaban sesi {hasil_ujian_id} (dicoba lagi nanti):", e)
+
+
+def pending_deltas(hasil_ujian_id):
+    """Salinan patch yang belum ditulis untuk satu sesi"""
+    with _pending_lock:
+        state = _pending.get(hasil_ujian_id)
+        return dict(state['deltas']) if state else {}
+
+
+def clear_pending():
+    with _pending_lock:
+        _pending.clear()
+
+
+def _take(state):
+    if state is None or not state['deltas']:
+        return None
+    deltas, state['deltas'] = state['deltas'], {}
+    state['dirty_since'] = None
+    return deltas
+
+
+def apply_deltas(hasil_ujian_id, deltas):
+    """
+    Gabungkan {soal: (seq, jawaban, diterima)} ke HasilUjian; per soal
+    hanya seq yang lebih besar dari yang tersimpan yang dipakai. Sesi
+    'mulai' yang lewat deadline + grace dan sesi diskualifikasi tidak
+    diubah; sesi 'selesai' hanya menerima patch yang diterima sebelum
+    waktu_selesai. Return True kalau ada yang ditulis.
+    """
+    with transaction.atomic():
+        row = (
+            HasilUjian.objects
+            # of=self: filter deadline join ke Ujian, baris ujiannya jangan ikut dikunci
+            .select_for_update(of=('self',))
+            .filter(Q(masih_dalam_waktu(), status='mulai') | Q(status='selesai'), id=hasil_ujian_id)
+            .values('status', 'waktu_selesai', 'jawaban', 'jawaban_seq')
+            .first()
+        )
+        if row is None:
+            return False
+
+        selesai = row['status'] == 'selesai'
+        jawaban = dict(row['jawaban'] or {})
+        jawaban_seq = dict(row['jawaban_seq'] or {})
+        changed = False
+        for soal, (seq, nilai, diterima) in deltas.items():
+            if selesai and (row['waktu_selesai'] is None or diterima > row['waktu_selesai']):
+                continue
+            if seq > jawaban_seq.get(soal, -1):
+                jawaban[soal] = nilai
+                jawaban_seq[soal] = seq
+                changed = True
+
+        if changed:
+            HasilUjian.objects.filter(id=hasil_ujian_id).update(
+                jawaban=jawaban,
+                jawaban_seq=jawaban_seq,
+            )
+        return changed
+
+
+def _ensure_flusher():
+    global _flusher, _flusher_pid
+    if _flusher is not None and _flusher.is_alive() and _flusher_pid == os.getpid():
+        return
+    with _pending_lock:
+        if _flusher is not None and _flusher.is_alive() and _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+        _flusher = threading.Thread(target=_flush_forever, name="autosave-flush", daemon=True)
+        _flusher.start()
+
+
+def _flush_forever():
+    while True:
+        time.sleep(1)
+        try:
+            flush_due()
+        finally:
+            connection.close()
+
+
+@atexit.register
+def _flush_all():
+    try:
+        flush_due(force=True)
+    except Exception as e:
+        print("Error autosave jawaban saat proses berhenti:", e)
@@ -0,0 +1,240 @@
+"""
+Log event JSON-lines (alerts.log, violations_fallback.log) dengan buffer.
+
+Event ditampung di memori lalu ditulis per batch (saat buffer penuh, tiap
+flush_interval detik, dan saat proses keluar) dengan satu write() ber-
+O_APPEND di bawah file lock, sehingga baris dari beberapa worker tidak
+saling tumpang tindih. File dirotasi kalau melewati max_bytes atau ganti
+hari; hasil rotasi di-gzip dan hanya backup_count terakhir yang disimpan.
+"""
+import atexit
+import glob
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import date
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: runserver 1 proses, cukup lock antar thread
+    fcntl = None
+
+
+class EventLog:
+    """Writer JSON-lines ber-buffer dengan rotasi ukuran/tanggal"""
+
+    def __init__(self, path, max_buffer=200, flush_interval=1.0,
+                 max_bytes=10 * 1024 * 1024, backup_count=10, compress=True):
+        self.path = str(path)
+        self.max_buffer = max_buffer
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def write(self, record):
+        """Tambahkan satu event (dict) ke buffer"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._ensure_flusher()
+        with self._lock:
+            self._buffer.append(line)
+            full = len(self._buffer) >= self.max_buffer
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Tulis semua isi buffer ke file sekarang"""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if not lines:
+            return
+        data = "".join(lines).encode("utf-8")
+
+        with self._write_lock, _FileLock(self.path + ".lock"):
+            self._maybe_rotate(len(data))
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    written = os.write(fd, view)
+                    view = view[written:]
+            finally:
+                os.close(fd)
+
+    def tail(self, limit=100, student=None, exam=None):
+        """Event terbaru (paling baru dulu), termasuk yang masih di buffer"""
+        self.flush()
+        return read_events(self.path, limit=limit, student=student, exam=exam)
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Proses hasil fork: buffer warisan tetap di-flush oleh induknya
+                self._buffer = []
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="eventlog-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print("Error flushing event log:", e)
+
+    def _maybe_rotate(self, incoming):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if not st.st_size:
+            return
+        too_big = st.st_size + incoming > self.max_bytes
+        new_day = date.fromtimestamp(st.st_mtime) != date.today()
+        if too_big or new_day:
+            self._rotate()
+
+    def _rotate(self):
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        rotated = f"{self.path}.{stamp}"
+        n = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = f"{self.path}.{stamp}-{n}"
+            n += 1
+        os.replace(self.path, rotated)
+
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
+
+        # Urut waktu, bukan nama: "x.<stamp>-1.gz" (rotasi kedua di detik yang
+        # sama) tersortir sebelum "x.<stamp>.gz"
+        backups = sorted(
+            (p for p in glob.glob(glob.escape(self.path) + ".*") if not p.endswith(".lock")),
+            key=lambda p: (os.path.getmtime(p), p),
+        )
+        for old in backups[:-self.backup_count or None] if self.backup_count else backups:
+            os.remove(old)
+
+
+class _FileLock:
+    """Lock eksklusif antar proses (flock) pada file .lock"""
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self.fd = os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o644)
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+
+
+def _reverse_lines(path, block_size=64 * 1024):
+    """Baris file dari belakang, dibaca per blok (tidak load seluruh file)"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        rest = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step) + rest
+            lines = chunk.split(b"\n")
+            rest = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line
+        if rest:
+            yield rest
+
+
+def read_events(path, limit=100, student=None, exam=None):
+    """
+    Ambil event terbaru dari file log (paling baru dulu).
+
+    Filter student/exam tidak peka huruf besar; baris disaring dulu dengan
+    pencarian teks sebelum di-parse supaya tidak semua baris di-json.loads.
+    """
+    needles = [
+        (key, value.casefold())
+        for key, value in (("student", student), ("exam", exam))
+        if value
+    ]
+    results = []
+    try:
+        lines = _reverse_lines(path)
+        for raw in lines:
+            text = raw.decode("utf-8", errors="replace")
+            folded = text.casefold()
+            if any(value not in folded for _, value in needles):
+                continue
+            try:
+                event = json.loads(text)
+            except ValueError:
+                continue
+            if any(value != str(event.get(key, "")).casefold() for key, value in needles):
+                continue
+            results.append(event)
+            if limit and len(results) >= limit:
+                break
+    except FileNotFoundError:
+        pass
+    return results
+
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+
+def get_event_log(filename):
+    """EventLog bersama per file (relatif ke BASE_DIR)"""
+    log = _logs.get(filename)
+    if log is None:
+        with _logs_lock:
+            log = _logs.get(filename)
+            if log is None:
+                log = EventLog(
+                    os.path.join(settings.BASE_DIR, filename),
+                    max_buffer=getattr(settings, "EVENT_LOG_MAX_BUFFER", 200),
+                    flush_interval=getattr(settings, "EVENT_LOG_FLUSH_INTERVAL", 1.0),
+                    max_bytes=getattr(settings, "EVENT_LOG_MAX_BYTES", 10 * 1024 * 1024),
+                    backup_count=getattr(settings, "EVENT_LOG_BACKUP_COUNT", 10),
+                    compress=getattr(settings, "EVENT_LOG_COMPRESS", True),
+                )
+                _logs[filename] = log
+    return log
+
+
+@atexit.register
+def _flush_all():
+    for log in list(_logs.values()):
+        try:
+            log.flush()
+        except Exception as e:
+            print("Error flushing event log:", e)
@@ -432,10 +432,39 @@ class UniversalExamSystem {
         // Start interval
         this.timerInterval = setInterval(updateTimer, 1000);
         updateTimer(); // Panggil sekali untuk update langsung
+        this.startServerClockSync();
 
         console.log("✅ TIMER STARTED");
     }
 
+    startServerClockSync() {
+        // Sisa waktu otoritatif dari server (hanya kalau sesi punya session_token)
+        const sessionToken = localStorage.getItem('session_token');
+        if (!sessionToken) {
+            return;
+        }
+
+        const sync = async () => {
+            try {
+                const response = await fetch(`/api/heartbeat/?session_token=${encodeURIComponent(sessionToken)}`);
+                if (!response.ok) {
+                    return;
+                }
+                const data = await response.json();
+                if (data.sesi !== 'mulai') {
+                    this.timeLeft = 0;
+                } else if (typeof data.remaining === 'number') {
+                    this.timeLeft = data.remaining;
+                }
+            } catch (error) {
+                console.warn('⚠️ HEARTBEAT FAILED:', error);
+            }
+        };
+
+        sync();
+        this.heartbeatInterval = setInterval(sync, 15000);
+    }
+
     showTimeWarning(message) {
         const warning = document.createElement('div');
         warning.className = 'time-warning';
@@ -1146,6 +1175,9 @@ tryAudioMethod3() {
         if (this.timerInterval) {
             clearInterval(this.timerInterval);
         }
+        if (this.heartbeatInterval) {
+            clearInterval(this.heartbeatInterval);
+        }
 
         // Show time up modal
         this.showTimeUpModal();
@@ -0,0 +1,196 @@
+"""
+Jam ujian otoritatif di server.
+
+Sisa waktu dihitung dari HasilUjian.waktu_mulai + Ujian.durasi (menit),
+dikunci per SessionLock.session_token. Deadline tiap sesi di-cache di
+memori, jadi heartbeat yang dipanggil semua siswa tiap beberapa detik
+cukup lookup dict tanpa query/tulis DB. Sesi yang waktunya habis
+ditutup massal (status → selesai) oleh sweeper di thread background
+atau lewat `manage.py expire_sesi_ujian`.
+
+Submit dan autosave hanya diterima sampai deadline + EXAM_SUBMIT_GRACE
+detik (masih_dalam_waktu() dipakai langsung di UPDATE bersyaratnya),
+supaya request yang dikirim tepat sebelum waktu habis tidak ditolak.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import DateTimeField, DurationField, ExpressionWrapper, F, Value
+from django.db.models.lookups import GreaterThanOrEqual
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Ujian, HasilUjian, SessionLock
+from .monitor_feed import bus as monitor_bus
+
+# Status sesi dibaca ulang dari DB paling lama tiap N detik (admin reset,
+# diskualifikasi, submit dari worker lain)
+SESSION_CACHE_TTL = 60
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def _grace():
+    return timedelta(seconds=getattr(settings, 'EXAM_SUBMIT_GRACE', 30))
+
+
+def masih_dalam_waktu(now=None):
+    """
+    Kondisi filter HasilUjian: waktu_mulai + durasi ujian + grace belum
+    lewat. Dihitung di DB, jadi bisa ikut di UPDATE bersyarat submit.
+    """
+    now = now or timezone.now()
+    durasi = ExpressionWrapper(F('ujian__durasi') * Value(timedelta(minutes=1)), output_field=DurationField())
+    deadline = ExpressionWrapper(F('waktu_mulai') + durasi, output_field=DateTimeField())
+    return GreaterThanOrEqual(deadline, Value(now - _grace(), output_field=DateTimeField()))
+
+
+def _load_session(session_token):
+    row = (
+        SessionLock.objects
+        .filter(session_token=session_token)
+        .values(
+            'id',
+            'hasil_ujian_id',
+            'hasil_ujian__status',
+            'hasil_ujian__waktu_mulai',
+            'hasil_ujian__ujian_id',
+            'hasil_ujian__ujian__durasi',
+        )
+        .first()
+    )
+    if row is None:
+        return None
+    return {
+        'session_lock_id': row['id'],
+        'hasil_ujian_id': row['hasil_ujian_id'],
+        'ujian_id': row['hasil_ujian__ujian_id'],
+        'status': row['hasil_ujian__status'],
+        'deadline': row['hasil_ujian__waktu_mulai'] + timedelta(minutes=row['hasil_ujian__ujian__durasi']),
+    }
+
+
+def get_session_clock(session_token):
+    """
+    Jam sesi: dict session_lock_id, hasil_ujian_id, ujian_id, status, deadline, remaining
+    (detik, >= 0), menerima (jawaban masih boleh dikirim: sesi berjalan dan
+    belum lewat deadline + grace). None kalau token tidak dikenal.
+    """
+    now = time.monotonic()
+    entry = _sessions.get(session_token)
+    if entry is None or entry[0] <= now:
+        sesi = _load_session(session_token)
+        if sesi is None:
+            return None
+        entry = (now + SESSION_CACHE_TTL, sesi)
+        with _sessions_lock:
+            _sessions[session_token] = entry
+
+    _ensure_sweeper()
+    sesi = entry[1]
+    status = sesi['status']
+    remaining = 0
+    menerima = False
+    if status == 'mulai':
+        sekarang = timezone.now()
+        remaining = int((sesi['deadline'] - sekarang).total_seconds())
+        menerima = sekarang <= sesi['deadline'] + _grace()
+        if remaining <= 0:
+            # Belum ditutup sweeper, tapi menurut jam server sudah habis
+            status, remaining = 'selesai', 0
+    return dict(sesi, status=status, remaining=remaining, menerima=menerima)
+
+
+def forget_session(session_token=None, hasil_ujian_id=None):
+    """Buang cache sesi (setelah submit / perubahan status)"""
+    with _sessions_lock:
+        if session_token is not None:
+            _sessions.pop(session_token, None)
+        if hasil_ujian_id is not None:
+            for token, (_, sesi) in list(_sessions.items()):
+                if sesi['hasil_ujian_id'] == hasil_ujian_id:
+                    del _sessions[token]
+
+
+def clear_session_cache():
+    with _sessions_lock:
+        _sessions.clear()
+
+
+def expire_overdue_sessions(now=None):
+    """
+    Tutup semua sesi 'mulai' yang melewati durasi ujian + grace.
+
+    Satu UPDATE per ujian yang masih punya sesi berjalan; waktu_selesai
+    diisi deadline sesi itu sendiri. Return jumlah sesi yang ditutup.
+    """
+    now = now or timezone.now()
+    total = 0
+    running = (
+        Ujian.objects
+        .filter(hasilujian__status='mulai')
+        .values_list('id', 'durasi')
+        .distinct()
+    )
+    for ujian_id, durasi in running:
+        durasi = timedelta(minutes=durasi)
+        closed = HasilUjian.objects.filter(
+            ujian_id=ujian_id,
+            status='mulai',
+            waktu_mulai__lte=now - durasi - _grace(),
+        ).update(
+            status='selesai',
+            waktu_selesai=F('waktu_mulai') + durasi,
+        )
+        if closed:
+            monitor_bus.publish('expired', {'ujian_id': ujian_id, 'jumlah': closed}, ujian_id=ujian_id)
+        total += closed
+    if total:
+        clear_session_cache()
+    return total
+
+
+def _ensure_sweeper():
+    global _sweeper
+    if _sweeper is not None and _sweeper.is_alive():
+        return
+    interval = getattr(settings, 'EXAM_EXPIRY_SWEEP_INTERVAL', 30)
+    if not interval:
+        return
+    with _sweeper_lock:
+        if _sweeper is not None and _sweeper.is_alive():
+            return
+        _sweeper = threading.Thread(target=_sweep_forever, args=(interval,), name="exam-expiry", daemon=True)
+        _sweeper.start()
+
+
+def _sweep_forever(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            expire_overdue_sessions()
+        except Exception as e:
+            print("Error expiring exam sessions:", e)
+        finally:
+            # Thread ini punya koneksi DB sendiri; jangan ditahan antar sweep
+            connection.close()
+
+
+@receiver(post_save, sender=Ujian)
+@receiver(post_delete, sender=Ujian)
+def invalidate_on_ujian_change(sender, **kwargs):
+    """Durasi ujian bisa berubah → semua deadline dihitung ulang"""
+    clear_session_cache()
+
+
+@receiver(post_save, sender=HasilUjian)
+def invalidate_on_hasil_change(sender, instance, created, **kwargs):
+    if not created:
+        forget_session(hasil_ujian_id=instance.id)
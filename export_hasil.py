@@ -0,0 +1,132 @@
+"""
+Ekspor HasilUjian (CSV / JSON Lines) secara streaming.
+
+Baris dibaca dengan values().iterator(chunk_size) dan ditulis per potong,
+jadi memori tetap kecil walau puluhan ribu hasil dan unduhan langsung
+mulai. Untuk CSV, nomor soal di `jawaban` dikumpulkan dulu dalam satu
+pass (hanya kolom jawaban) supaya tiap soal jadi satu kolom.
+"""
+import csv
+import json
+import re
+
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+# Jumlah baris per potong yang di-yield ke response
+ROWS_PER_YIELD = 200
+
+EXPORT_FIELDS = (
+    'id',
+    'peserta__nis',
+    'peserta__nama',
+    'peserta__kelas',
+    'ujian__nama_ujian',
+    'status',
+    'percobaan_keluar',
+    'waktu_mulai',
+    'waktu_selesai',
+    'skor',
+    'jumlah_benar',
+    'jawaban',
+)
+
+BASE_COLUMNS = [
+    'id', 'nis', 'nama', 'kelas', 'ujian', 'status',
+    'pelanggaran', 'waktu_mulai', 'waktu_selesai', 'durasi_detik',
+    'skor', 'jumlah_benar',
+]
+
+
+class Echo:
+    """Pseudo-buffer untuk csv.writer: writerow() langsung mengembalikan teks baris"""
+
+    def write(self, value):
+        return value
+
+
+def soal_sort_key(soal):
+    # "2" sebelum "10"; soal non-angka di belakang
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', str(soal))]
+
+
+def discover_soal(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Semua nomor soal yang muncul di jawaban (urut natural)"""
+    soal = set()
+    for jawaban in queryset.order_by().values_list('jawaban', flat=True).iterator(chunk_size=chunk_size):
+        if isinstance(jawaban, dict):
+            soal.update(jawaban)
+    return sorted(soal, key=soal_sort_key)
+
+
+def _rows(queryset, chunk_size):
+    return queryset.order_by('id').values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def _base(row, fmt_time):
+    mulai, selesai = row['waktu_mulai'], row['waktu_selesai']
+    return [
+        row['id'],
+        row['peserta__nis'],
+        row['peserta__nama'],
+        row['peserta__kelas'],
+        row['ujian__nama_ujian'],
+        row['status'],
+        row['percobaan_keluar'],
+        fmt_time(mulai) if mulai else None,
+        fmt_time(selesai) if selesai else None,
+        int((selesai - mulai).total_seconds()) if mulai and selesai else None,
+        row['skor'],
+        row['jumlah_benar'],
+    ]
+
+
+def _csv_time(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def iter_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Potongan teks CSV (diawali BOM supaya Excel membaca UTF-8)"""
+    yield '\ufeff'
+    soal = discover_soal(queryset, chunk_size)
+    writer = csv.writer(Echo())
+    yield writer.writerow(BASE_COLUMNS + [f'soal_{s}' for s in soal])
+
+    lines = []
+    for row in _rows(queryset, chunk_size):
+        jawaban = row['jawaban'] if isinstance(row['jawaban'], dict) else {}
+        values = _base(row, _csv_time) + [jawaban.get(s) for s in soal]
+        lines.append(writer.writerow([_csv_value(value) for value in values]))
+        if len(lines) >= ROWS_PER_YIELD:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def iter_jsonl(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Satu objek JSON per baris; jawaban tetap utuh sebagai object"""
+    lines = []
+    for row in _rows(queryset, chunk_size):
+        record = dict(zip(BASE_COLUMNS, _base(row, lambda value: value.isoformat())))
+        record['jawaban'] = row['jawaban']
+        lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+        if len(lines) >= ROWS_PER_YIELD:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+EXPORTERS = {
+    'csv': (iter_csv, 'text/csv; charset=utf-8'),
+    'jsonl': (iter_jsonl, 'application/x-ndjson; charset=utf-8'),
+}
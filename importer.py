@@ -0,0 +1,94 @@
+"""
+Import peserta massal (siswa.json & CSV admin).
+
+Semua nama yang sudah ada diambil dengan satu query, dicocokkan di memori,
+lalu peserta baru di-insert dengan bulk_create per batch di dalam satu
+transaksi. Import satu sekolah jadi beberapa query saja, bukan ribuan
+round trip + fsync per baris.
+"""
+from django.db import transaction
+
+from .models import Peserta
+from .roster import normalize_nama
+
+IMPORT_BATCH_SIZE = 500
+
+
+def bulk_import_peserta(items, parse, match_kelas=False, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import peserta dari iterable (label, raw).
+
+    parse(raw) harus mengembalikan dict nama/nis/kelas; exception dari parse
+    dicatat sebagai error baris itu saja. Kalau match_kelas=False nama yang
+    sudah ada di kelas mana pun dilewati, kalau True hanya yang sama kelasnya.
+
+    Return dict: imported (baris yang benar-benar ter-insert), skipped,
+    errors [(label, nama, pesan)], existing [(label, nama)].
+    """
+    report = {"imported": 0, "skipped": 0, "errors": [], "existing": []}
+
+    def key(nama_normal, kelas):
+        return (nama_normal, kelas) if match_kelas else nama_normal
+
+    with transaction.atomic():
+        seen = {
+            key(nama_normal, kelas)
+            for nama_normal, kelas in Peserta.objects.values_list('nama_normal', 'kelas').iterator()
+        }
+        batch = []
+
+        for label, raw in items:
+            try:
+                data = parse(raw)
+                nama = data["nama"]
+                kelas = data.get("kelas", "")
+            except Exception as e:
+                report["errors"].append((label, _raw_nama(raw), str(e)))
+                report["skipped"] += 1
+                continue
+
+            if not nama:
+                report["skipped"] += 1
+                continue
+
+            nama_normal = normalize_nama(nama)
+            k = key(nama_normal, kelas)
+            if k in seen:
+                report["existing"].append((label, nama))
+                report["skipped"] += 1
+                continue
+            seen.add(k)
+
+            # bulk_create tidak memanggil save(), jadi nama_normal diisi di sini
+            batch.append(Peserta(
+                nama=nama,
+                nis=data.get("nis", ""),
+                kelas=kelas,
+                nama_normal=nama_normal,
+            ))
+            if len(batch) >= batch_size:
+                _flush(batch, report)
+                batch = []
+
+        if batch:
+            _flush(batch, report)
+
+    return report
+
+
+def _flush(batch, report):
+    # ignore_conflicts: peserta yang dibuat login bersamaan tidak
+    # menggagalkan seluruh import. Baris yang bentrok tidak ikut ter-insert,
+    # jadi jumlahnya dihitung dari isi tabel sebelum/sesudah, bukan len(batch).
+    sejenis = Peserta.objects.filter(nama_normal__in={p.nama_normal for p in batch})
+    sebelum = sejenis.count()
+    Peserta.objects.bulk_create(batch, ignore_conflicts=True)
+    imported = sejenis.count() - sebelum
+    report["imported"] += imported
+    report["skipped"] += len(batch) - imported
+
+
+def _raw_nama(raw):
+    if isinstance(raw, dict):
+        return raw.get("Nama", raw.get("nama", ""))
+    return ""
@@ -0,0 +1,84 @@
+"""
+Generate kode akses massal per ujian + ekspor lembar cetak (CSV / QR).
+
+Semua kode yang sudah ada diambil sekali ke set di memori; kode baru
+diacak sampai unik terhadap set itu (tanpa query cek per kode), lalu
+di-insert dengan bulk_create per chunk dalam satu transaksi. Unique index
+`kode` tetap jadi penjaga terakhir: kalau admin lain meng-insert kode
+yang sama di saat bersamaan, transaksi diulang dengan set yang baru.
+"""
+import csv
+import io
+import secrets
+import zipfile
+
+from django.db import IntegrityError, transaction
+
+from .models import KodeAkses
+from .qr_render import render_many
+
+# Tanpa 0/O dan 1/I/L supaya tidak salah baca di kertas
+KODE_ALPHABET = "ABCDEFGHJKMNPQRSTUVWXYZ23456789"
+KODE_PANJANG = 8
+KODE_BATCH_SIZE = 1000
+
+
+def generate_kode_akses(ujian, jumlah, panjang=KODE_PANJANG, prefix='', batch_size=KODE_BATCH_SIZE, max_retries=3):
+    """Buat `jumlah` KodeAkses baru untuk ujian; return list kode (urutan insert)"""
+    ruang = len(KODE_ALPHABET) ** panjang
+    if jumlah > ruang // 2:
+        raise ValueError(f"Kode {panjang} karakter terlalu pendek untuk {jumlah} kode")
+
+    for attempt in range(max_retries):
+        try:
+            with transaction.atomic():
+                existing = set(
+                    KodeAkses.objects
+                    .filter(kode__startswith=prefix)
+                    .values_list('kode', flat=True)
+                    .iterator(chunk_size=5000)
+                )
+                codes = []
+                while len(codes) < jumlah:
+                    kode = prefix + ''.join(secrets.choice(KODE_ALPHABET) for _ in range(panjang))
+                    if kode not in existing:
+                        existing.add(kode)
+                        codes.append(kode)
+
+                for i in range(0, len(codes), batch_size):
+                    KodeAkses.objects.bulk_create(
+                        [KodeAkses(kode=kode, ujian=ujian) for kode in codes[i:i + batch_size]]
+                    )
+            return codes
+        except IntegrityError:
+            # Bentrok dengan kode yang baru di-insert proses lain → ulang
+            if attempt == max_retries - 1:
+                raise
+
+
+def write_csv(stream, ujian, codes, header=True):
+    """Lembar kode akses: kode, ujian, pin (kolom pertama = kode, dibaca loadtest.py)"""
+    writer = csv.writer(stream)
+    if header:
+        writer.writerow(['kode', 'ujian', 'pin_ujian'])
+    for kode in codes:
+        writer.writerow([kode, ujian.nama_ujian, ujian.pin_ujian])
+
+
+def build_zip(batches, qr=True, workers=None):
+    """
+    ZIP berisi satu CSV per ujian (+ PNG QR per kode kalau qr=True).
+    batches: list (ujian, codes). Return bytes.
+    """
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for ujian, codes in batches:
+            folder = f"ujian_{ujian.id}"
+            text = io.StringIO()
+            write_csv(text, ujian, codes)
+            zf.writestr(f"{folder}/kode_akses.csv", text.getvalue())
+            if qr:
+                for kode, png in render_many(codes, workers=workers):
+                    # PNG sudah terkompresi
+                    zf.writestr(zipfile.ZipInfo(f"{folder}/qr/{kode}.png"), png, compress_type=zipfile.ZIP_STORED)
+    return buf.getvalue()
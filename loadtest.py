@@ -0,0 +1,424 @@
+"""
+LOAD TEST SKENARIO UJIAN: login → validasi kode akses → pelanggaran
+(report_pelanggaran + telegram_alert) → submit jawaban
+
+Jalankan terhadap server yang sudah hidup (runserver / gunicorn / waitress),
+dengan ujian aktif (PIN) dan kode akses yang belum terpakai:
+
+    python manage.py generate_kode_akses <ujian_id> --jumlah 500 --csv kode.csv
+    python loadtest.py --pin 123456 --kode-file kode.csv --siswa 300 --concurrency 100
+
+kode.csv berisi satu kode per baris (kolom pertama CSV juga boleh). Nama
+siswa diambil dari siswa.json. Bandingkan hasilnya antara DB_ENGINE=sqlite
+dan DB_ENGINE=postgres untuk memilih profil yang cukup di jam sibuk.
+
+Kedatangan siswa diatur dengan --arrival selama --ramp detik:
+    linear   rata (default; --ramp 0 = semua sekaligus)
+    poisson  jeda acak eksponensial (pakai --seed supaya bisa diulang)
+    wave     per gelombang (--waves, mis. satu lab per gelombang)
+    burst    90% siswa masuk di 10% awal waktu ramp (bel masuk)
+
+Telegram palsu: --fake-telegram 8081 menyalakan pengganti api.telegram.org
+di proses ini (--telegram-latency, --telegram-429 untuk simulasi lambat /
+rate limit). Server yang diuji dijalankan dengan
+TELEGRAM_API_URL=http://127.0.0.1:8081 dan TELEGRAM_BOT_TOKEN / CHAT_ID
+sembarang; di akhir dilaporkan berapa pesan yang benar-benar terkirim.
+
+Jumlah query DB dan error "database is locked" per endpoint dibaca dari
+header X-DB-* yang ditambahkan server kalau dijalankan dengan
+BENCHMARK_HEADERS=True (lihat middleware.py). View async (telegram_alert)
+menjalankan ORM di thread pool run_orm, jadi query-nya tidak terhitung.
+
+Baseline: --save-baseline loadtest_baseline.json menyimpan hasil sebagai
+JSON (ikut di-commit); --baseline loadtest_baseline.json membandingkan run
+sekarang dan exit 1 kalau ada regresi di luar --tolerance.
+
+Skenario --scenario alert hanya memukul /api/telegram-alert/ (tidak perlu
+PIN / kode), untuk membandingkan server WSGI sungguhan dan ASGI (bukan
+runserver):
+
+    gunicorn -w 1 -k gthread --threads 16 -b 127.0.0.1:8000 ujian_platform.wsgi:application
+    uvicorn ujian_platform.asgi:application --port 8001
+
+    python loadtest.py --scenario alert --siswa 200 --alerts 5 --concurrency 4 --ramp 5 --base-url http://127.0.0.1:8000
+    python loadtest.py --scenario alert --siswa 200 --alerts 5 --concurrency 4 --ramp 5 --base-url http://127.0.0.1:8001
+
+Klien load test ini satu proses Python: kalau --concurrency terlalu besar
+yang diukur antrean di klien, bukan server. Jaga concurrency di bawah
+jumlah thread server dan naikkan bertahap; idealnya klien jalan di mesin
+lain supaya tidak berebut CPU dengan server.
+
+Jalankan server dengan TELEGRAM_API_URL ke alamat lokal yang tidak dipakai
+supaya uji beban tidak mengirim pesan sungguhan.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+STEPS = ("login", "validate_kode", "report_pelanggaran", "telegram_alert", "submit_jawaban")
+ARRIVALS = ("linear", "poisson", "wave", "burst")
+
+# Regresi latency di bawah selisih ini (ms) dianggap noise
+NOISE_FLOOR_MS = 5
+
+
+class Recorder:
+    """Kumpulkan latency, status & header X-DB-* per endpoint (thread-safe)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = defaultdict(list)
+        self.status = defaultdict(lambda: defaultdict(int))
+        self.queries = defaultdict(int)
+        self.db_ms = defaultdict(float)
+        self.lock_errors = defaultdict(int)
+        self.instrumented = set()
+
+    def add(self, step, seconds, code, headers=None):
+        with self.lock:
+            self.latency[step].append(seconds)
+            self.status[step][code] += 1
+            if code == 503:
+                # KodeAksesSibuk: retry lock di server sudah habis
+                self.lock_errors[step] += 1
+            if headers and "X-DB-Queries" in headers:
+                self.instrumented.add(step)
+                self.queries[step] += int(headers["X-DB-Queries"])
+                self.db_ms[step] += float(headers.get("X-DB-Time-Ms", 0))
+                self.lock_errors[step] += int(headers.get("X-DB-Lock-Errors", 0))
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    """Pengganti api.telegram.org: hitung pesan, bisa lambat / kena 429"""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        with server.lock:
+            limited = server.rng.random() < server.rate_limit
+            server.counts["429" if limited else "sent"] += 1
+        if limited:
+            code, data = 429, {"ok": False, "error_code": 429, "parameters": {"retry_after": 1}}
+        else:
+            code, data = 200, {"ok": True, "result": {"message_id": server.counts["sent"]}}
+        raw = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_telegram(port, latency=0.0, rate_limit=0.0, seed=None):
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeTelegramHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.rate_limit = rate_limit
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.counts = defaultdict(int)
+    threading.Thread(target=server.serve_forever, name="fake-telegram", daemon=True).start()
+    return server
+
+
+def arrival_offsets(jumlah, arrival, ramp, waves=4, seed=None):
+    """Detik sejak mulai untuk kedatangan tiap siswa (naik, panjang = jumlah)"""
+    if jumlah <= 1 or ramp <= 0:
+        return [0.0] * jumlah
+    if arrival == "poisson":
+        rng = random.Random(seed)
+        t, offsets = 0.0, []
+        for _ in range(jumlah):
+            offsets.append(min(t, ramp))
+            t += rng.expovariate(jumlah / ramp)
+        return offsets
+    if arrival == "wave":
+        waves = max(1, min(waves, jumlah))
+        per_wave = math.ceil(jumlah / waves)
+        gap = ramp / (waves - 1) if waves > 1 else 0.0
+        return [(i // per_wave) * gap for i in range(jumlah)]
+    if arrival == "burst":
+        head = math.ceil(jumlah * 0.9)
+        return [
+            (0.1 * ramp * i / head) if i < head else 0.1 * ramp + 0.9 * ramp * (i - head) / max(1, jumlah - head)
+            for i in range(jumlah)
+        ]
+    return [ramp * i / (jumlah - 1) for i in range(jumlah)]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    # nearest-rank
+    k = max(0, math.ceil(pct / 100 * len(values)) - 1)
+    return values[k]
+
+
+def timed_post(session, recorder, step, url, payload):
+    start = time.perf_counter()
+    try:
+        resp = session.post(url, json=payload, timeout=30)
+        code = resp.status_code
+        data = resp.json() if resp.headers.get("Content-Type", "").startswith("application/json") else {}
+        headers = resp.headers
+    except requests.RequestException as e:
+        code, data, headers = type(e).__name__, {}, None
+    recorder.add(step, time.perf_counter() - start, code, headers)
+    return code, data
+
+
+def alert_payload(nama, n, session_token=None):
+    return {
+        "student": nama,
+        "class": "LOADTEST",
+        "exam": "Load Test",
+        "violationType": "TAB_SWITCH",
+        "details": f"alert ke-{n + 1}",
+        "warningCount": n + 1,
+        "platform": "loadtest",
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "session_token": session_token,
+    }
+
+
+def run_student(base_url, pin, nama, kode, recorder, pelanggaran=0, think=0.0):
+    """Satu siswa menjalankan alur ujian lengkap"""
+    session = requests.Session()
+
+    code, data = timed_post(session, recorder, "login", f"{base_url}/api/login/",
+                            {"nama": nama, "pin_ujian": pin})
+    if code != 200:
+        return
+
+    code, data = timed_post(session, recorder, "validate_kode", f"{base_url}/api/validate-kode/",
+                            {"kode_akses": kode, "peserta_id": data["peserta_id"]})
+    if code != 200:
+        return
+    hasil_ujian_id = data["hasil_ujian_id"]
+
+    for n in range(pelanggaran):
+        time.sleep(think)
+        timed_post(session, recorder, "report_pelanggaran", f"{base_url}/api/report-pelanggaran/", {
+            "hasil_ujian_id": hasil_ujian_id,
+            "jenis_pelanggaran": "TAB_SWITCH",
+            "detail": f"loadtest ke-{n + 1}",
+        })
+        timed_post(session, recorder, "telegram_alert", f"{base_url}/api/telegram-alert/",
+                   alert_payload(nama, n, data.get("session_token")))
+
+    time.sleep(think)
+    jawaban = {str(no): "ABCDE"[(no + len(nama)) % 5] for no in range(1, 41)}
+    timed_post(session, recorder, "submit_jawaban", f"{base_url}/api/submit-jawaban/",
+               {"hasil_ujian_id": hasil_ujian_id, "jawaban_data": jawaban})
+
+
+def run_alert(base_url, nama, jumlah, recorder):
+    """Satu siswa mengirim beberapa alert pelanggaran berturut-turut"""
+    session = requests.Session()
+    for n in range(jumlah):
+        timed_post(session, recorder, "telegram_alert", f"{base_url}/api/telegram-alert/",
+                   alert_payload(nama, n))
+
+
+def load_kode(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.split(",")[0].strip() for line in f if line.strip() and not line.startswith("kode")]
+
+
+def load_nama(path):
+    with open(path, encoding="utf-8") as f:
+        return [item["Nama"].strip() for item in json.load(f) if item.get("Nama")]
+
+
+def summarize(recorder, elapsed):
+    """Ringkasan per endpoint (juga format file baseline)"""
+    endpoints = {}
+    for step in STEPS:
+        lat = recorder.latency.get(step, [])
+        if not lat:
+            continue
+        codes = recorder.status[step]
+        ok = sum(n for c, n in codes.items() if isinstance(c, int) and c < 400)
+        endpoints[step] = {
+            "requests": len(lat),
+            "rps": round(len(lat) / elapsed, 2),
+            "p50_ms": round(percentile(lat, 50) * 1000, 1),
+            "p95_ms": round(percentile(lat, 95) * 1000, 1),
+            "p99_ms": round(percentile(lat, 99) * 1000, 1),
+            "max_ms": round(max(lat) * 1000, 1),
+            "errors": len(lat) - ok,
+            "status": {str(c): n for c, n in sorted(codes.items(), key=str)},
+            "queries_per_req": round(recorder.queries[step] / len(lat), 2) if step in recorder.instrumented else None,
+            "db_ms_per_req": round(recorder.db_ms[step] / len(lat), 2) if step in recorder.instrumented else None,
+            "lock_errors": recorder.lock_errors[step],
+        }
+    all_lat = sum(recorder.latency.values(), [])
+    return {
+        "endpoints": endpoints,
+        "total": {
+            "requests": len(all_lat),
+            "elapsed_s": round(elapsed, 2),
+            "rps": round(len(all_lat) / elapsed, 2) if elapsed else 0,
+            "mean_ms": round(statistics.mean(all_lat) * 1000, 1) if all_lat else 0,
+        },
+    }
+
+
+def print_report(summary):
+    print("\n📊 HASIL LOAD TEST")
+    print("=" * 100)
+    print(f"{'endpoint':<20}{'req':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'q/req':>7}{'lock':>6}  status")
+    for step, row in summary["endpoints"].items():
+        codes = ", ".join(f"{c}×{n}" for c, n in row["status"].items())
+        queries = "-" if row["queries_per_req"] is None else f"{row['queries_per_req']:.1f}"
+        print(
+            f"{step:<20}{row['requests']:>6}{row['rps']:>9.1f}{row['p50_ms']:>9.0f}{row['p95_ms']:>9.0f}"
+            f"{row['p99_ms']:>9.0f}{row['max_ms']:>9.0f}{queries:>7}{row['lock_errors']:>6}  {codes}"
+        )
+    total = summary["total"]
+    print("=" * 100)
+    print(f"⏱️  {total['requests']} request dalam {total['elapsed_s']:.1f} detik "
+          f"({total['rps']:.1f} req/s), mean {total['mean_ms']:.0f} ms")
+
+
+def compare_baseline(summary, baseline, tolerance):
+    """Daftar regresi (teks) dibanding baseline; kosong = lolos"""
+    regressions = []
+    for step, base in baseline["endpoints"].items():
+        row = summary["endpoints"].get(step)
+        if row is None:
+            regressions.append(f"{step}: tidak ada request (baseline {base['requests']})")
+            continue
+        # p99 hanya informasi: terlalu dipengaruhi noise mesin untuk jadi gerbang
+        for key in ("p50_ms", "p95_ms"):
+            if row[key] > base[key] * (1 + tolerance) and row[key] - base[key] > NOISE_FLOOR_MS:
+                regressions.append(f"{step}: {key} {base[key]:.0f} → {row[key]:.0f}")
+        if row["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{step}: req/s {base['rps']:.1f} → {row['rps']:.1f}")
+        # Jumlah query tidak dipengaruhi kecepatan mesin; selisih < 0.5 = cache miss sesekali
+        if base.get("queries_per_req") is not None and (row["queries_per_req"] or 0) >= base["queries_per_req"] + 0.5:
+            regressions.append(f"{step}: query/request {base['queries_per_req']} → {row['queries_per_req']}")
+        for key in ("errors", "lock_errors"):
+            if row[key] / row["requests"] > base[key] / base["requests"]:
+                regressions.append(f"{step}: {key} {base[key]}/{base['requests']} → {row[key]}/{row['requests']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", choices=("ujian", "alert"), default="ujian")
+    parser.add_argument("--pin", help="PIN ujian aktif (skenario ujian)")
+    parser.add_argument("--kode-file", help="File kode akses, 1 per baris (skenario ujian)")
+    parser.add_argument("--pelanggaran", type=int, default=2, help="Pelanggaran per siswa sebelum submit (skenario ujian)")
+    parser.add_argument("--think", type=float, default=0.0, help="Jeda antar langkah per siswa (detik)")
+    parser.add_argument("--alerts", type=int, default=5, help="Alert per siswa (skenario alert)")
+    parser.add_argument("--siswa-json", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "siswa.json"))
+    parser.add_argument("--siswa", type=int, default=100, help="Jumlah siswa virtual")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--ramp", type=float, default=0.0, help="Detik untuk menaikkan beban sampai penuh")
+    parser.add_argument("--arrival", choices=ARRIVALS, default="linear", help="Pola kedatangan siswa selama ramp")
+    parser.add_argument("--waves", type=int, default=4, help="Jumlah gelombang (--arrival wave)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed acak (poisson / telegram 429)")
+    parser.add_argument("--fake-telegram", type=int, metavar="PORT", help="Nyalakan Telegram palsu di port ini")
+    parser.add_argument("--telegram-latency", type=float, default=0.0, help="Latency Telegram palsu (detik)")
+    parser.add_argument("--telegram-429", type=float, default=0.0, help="Proporsi respons 429 Telegram palsu (0-1)")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Simpan hasil sebagai baseline JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="Bandingkan dengan baseline JSON (exit 1 kalau regresi)")
+    parser.add_argument("--label", default="", help="Keterangan server/mesin yang disimpan di baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Toleransi regresi latency/throughput (0.25 = 25%%)")
+    args = parser.parse_args()
+    if args.scenario == "ujian" and not (args.pin and args.kode_file):
+        parser.error("skenario ujian butuh --pin dan --kode-file")
+
+    nama_list = load_nama(args.siswa_json)
+    if args.scenario == "ujian":
+        kode_list = load_kode(args.kode_file)
+        jumlah = min(args.siswa, len(nama_list), len(kode_list))
+    else:
+        jumlah = min(args.siswa, len(nama_list))
+    if jumlah < args.siswa:
+        print(f"⚠️ Hanya {jumlah} siswa (dibatasi jumlah nama/kode yang tersedia)")
+
+    telegram = None
+    if args.fake_telegram:
+        telegram = start_fake_telegram(args.fake_telegram, args.telegram_latency, args.telegram_429, args.seed)
+        print(f"📨 Telegram palsu di http://127.0.0.1:{args.fake_telegram}")
+
+    print(f"🚀 {jumlah} siswa, concurrency {args.concurrency}, {args.arrival} ramp {args.ramp}s → {args.base_url}")
+    recorder = Recorder()
+    offsets = arrival_offsets(jumlah, args.arrival, args.ramp, args.waves, args.seed)
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for i in range(jumlah):
+            delay = start + offsets[i] - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if args.scenario == "ujian":
+                pool.submit(run_student, args.base_url, args.pin, nama_list[i], kode_list[i], recorder,
+                            args.pelanggaran, args.think)
+            else:
+                pool.submit(run_alert, args.base_url, nama_list[i], args.alerts, recorder)
+
+    summary = summarize(recorder, time.perf_counter() - start)
+    print_report(summary)
+
+    if telegram is not None:
+        # Beri waktu AlertDispatcher server menghabiskan antrian (coalesce + rate limit)
+        time.sleep(3)
+        summary["telegram"] = dict(telegram.counts)
+        print(f"📨 Telegram palsu menerima {telegram.counts['sent']} pesan, {telegram.counts['429']}× dibalas 429")
+        telegram.shutdown()
+
+    summary["config"] = {
+        "label": args.label,
+        "scenario": args.scenario,
+        "siswa": jumlah,
+        "concurrency": args.concurrency,
+        "arrival": args.arrival,
+        "ramp": args.ramp,
+        "pelanggaran": args.pelanggaran if args.scenario == "ujian" else None,
+        "alerts": args.alerts if args.scenario == "alert" else None,
+    }
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"💾 Baseline disimpan: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config", {}).get("scenario") != args.scenario:
+            print(f"⚠️ Baseline dibuat untuk skenario {baseline.get('config', {}).get('scenario')}")
+        regressions = compare_baseline(summary, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresi dibanding {args.baseline}:")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"✅ Tidak ada regresi dibanding {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
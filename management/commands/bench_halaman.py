@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from ujian_core import views
+from ujian_core.page_cache import get_page_cache, warm
+
+PAGE_VIEWS = {
+    'ujian_core/login.html': views.login_view,
+    'ujian_core/menu.html': views.menu_view,
+    'ujian_core/exam.html': views.exam_view,
+    'ujian_core/exam_consent.html': views.exam_consent_view,
+    'ujian_core/exam_lock.html': views.exam_lock_view,
+}
+
+
+def _per_request_us(view, request, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        view(request)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+class Command(BaseCommand):
+    help = "Bandingkan biaya view halaman peserta: render() tiap request vs page cache vs revalidasi 304"
+
+    def add_arguments(self, parser):
+        parser.add_argument("-n", type=int, default=500, help="Jumlah panggilan per halaman per mode")
+
+    def handle(self, *args, **options):
+        n = options["n"]
+        factory = RequestFactory()
+        get_page_cache().clear()
+        pages = warm()
+
+        self.stdout.write(f"{'halaman':<30}{'render()':>12}{'cache':>12}{'304':>12}   (µs / request)")
+        for template_name in pages:
+            view = PAGE_VIEWS[template_name]
+            request = factory.get("/")
+            with override_settings(PAGE_CACHE_ENABLED=False):
+                render_us = _per_request_us(view, request, n)
+            cached_us = _per_request_us(view, request, n)
+            etag = view(request)["ETag"]
+            revalidate_us = _per_request_us(view, factory.get("/", HTTP_IF_NONE_MATCH=etag), n)
+            self.stdout.write(
+                f"{template_name.split('/')[-1]:<30}{render_us:>12.1f}{cached_us:>12.1f}{revalidate_us:>12.1f}"
+                f"   {render_us / cached_us:.0f}x"
+            )
+
+        missing = sorted(set(PAGE_VIEWS) - set(pages))
+        if missing:
+            self.stdout.write(self.style.WARNING(f"⚠️ Template tidak ditemukan, dilewati: {', '.join(missing)}"))
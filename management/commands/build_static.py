@@ -0,0 +1,54 @@
+import os
+import shutil
+import time
+
+from django.conf import settings
+from django.core.files.storage import storages
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from ujian_core.static_pipeline import OptimizedManifestStaticFilesStorage, brotli, Image
+
+
+def _kb(size):
+    return f"{size / 1024:.1f} KB"
+
+
+class Command(BaseCommand):
+    help = "collectstatic + optimasi gambar/audio + nama ber-hash + varian .gz/.br di STATIC_ROOT"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clear", action="store_true", help="Kosongkan STATIC_ROOT dulu")
+
+    def handle(self, *args, **options):
+        # Instance yang sama dengan yang dipakai collectstatic (storages meng-cache per alias)
+        storage = storages["staticfiles"]
+        if not isinstance(storage, OptimizedManifestStaticFilesStorage):
+            raise CommandError("STORAGES['staticfiles'] bukan ujian_core.static_pipeline.OptimizedManifestStaticFilesStorage")
+
+        if Image is None:
+            self.stdout.write(self.style.WARNING("⚠️ Pillow belum terpasang, gambar tidak dioptimasi (pip install Pillow)"))
+        if brotli is None:
+            self.stdout.write(self.style.WARNING("⚠️ brotli belum terpasang, hanya dibuat varian .gz (pip install brotli)"))
+        if shutil.which("ffmpeg") is None:
+            self.stdout.write(self.style.WARNING("⚠️ ffmpeg tidak ditemukan di PATH, audio tidak dioptimasi"))
+
+        start = time.perf_counter()
+        call_command("collectstatic", interactive=False, clear=options["clear"], verbosity=0)
+
+        optimized = getattr(storage, "optimized", {})
+        for name, (before, after) in sorted(optimized.items()):
+            self.stdout.write(f"  🖼️ {name}: {_kb(before)} → {_kb(after)}")
+
+        compressed = getattr(storage, "compressed", [])
+        for ext in (".gz", ".br"):
+            variants = [path for path in compressed if path.endswith(ext)]
+            if variants:
+                total = sum(os.path.getsize(path) for path in variants)
+                originals = sum(os.path.getsize(path[:-3]) for path in variants)
+                self.stdout.write(f"  📦 {len(variants)} file {ext}: {_kb(originals)} → {_kb(total)}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Aset statis siap di {settings.STATIC_ROOT} ({len(storage.hashed_files)} file ber-hash, "
+            f"{len(optimized)} dioptimasi, {(time.perf_counter() - start):.1f} detik)"
+        ))
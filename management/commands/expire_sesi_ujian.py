@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from ujian_core.exam_clock import expire_overdue_sessions
+
+
+class Command(BaseCommand):
+    help = "Tutup (status → selesai) semua sesi ujian yang melewati durasi"
+
+    def handle(self, *args, **options):
+        total = expire_overdue_sessions()
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} sesi ujian ditutup"))
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ujian_core.export_hasil import EXPORTERS, EXPORT_CHUNK_SIZE
+from ujian_core.models import HasilUjian, Ujian
+
+
+class Command(BaseCommand):
+    help = "Export hasil ujian (gabung peserta + ujian, jawaban per soal) ke CSV / JSONL secara streaming"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ujian", type=int, action="append", help="Id ujian (boleh diulang); default semua")
+        parser.add_argument("--status", choices=["mulai", "selesai", "diskualifikasi"])
+        parser.add_argument("--format", choices=sorted(EXPORTERS), default="csv")
+        parser.add_argument("--output", "-o", help="File tujuan (default: stdout)")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = HasilUjian.objects.all()
+        if options["ujian"]:
+            found = set(Ujian.objects.filter(id__in=options["ujian"]).values_list("id", flat=True))
+            missing = sorted(set(options["ujian"]) - found)
+            if missing:
+                raise CommandError(f"Ujian id {missing} tidak ditemukan")
+            queryset = queryset.filter(ujian_id__in=options["ujian"])
+        if options["status"]:
+            queryset = queryset.filter(status=options["status"])
+
+        exporter, _ = EXPORTERS[options["format"]]
+        chunks = exporter(queryset, chunk_size=options["chunk_size"])
+
+        if not options["output"]:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            self.stdout.flush()
+            return
+
+        start = time.perf_counter()
+        with open(options["output"], "w", newline="", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Export {options['format'].upper()} selesai: {options['output']} ({time.perf_counter() - start:.1f} detik)"
+        ))
@@ -0,0 +1,65 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ujian_core.kode_akses import generate_kode_akses, write_csv, KODE_PANJANG, KODE_BATCH_SIZE
+from ujian_core.models import KodeAkses, Ujian
+from ujian_core.qr_render import qr_available, render_many
+
+
+class Command(BaseCommand):
+    help = "Generate kode akses sekali pakai massal untuk satu ujian (+ CSV / QR PNG untuk dicetak)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("ujian_id", type=int)
+        parser.add_argument("--jumlah", type=int, required=True, help="Jumlah kode baru")
+        parser.add_argument("--panjang", type=int, default=KODE_PANJANG, help="Panjang kode (tanpa prefix)")
+        parser.add_argument("--prefix", default="", help="Awalan kode, mis. kode kelas")
+        parser.add_argument("--batch-size", type=int, default=KODE_BATCH_SIZE)
+        parser.add_argument("--csv", help="Tulis lembar kode ke file CSV ini")
+        parser.add_argument("--qr-dir", help="Tulis QR PNG (1 file per kode) ke folder ini")
+        parser.add_argument("--workers", type=int, default=None, help="Jumlah proses render QR (default: jumlah CPU)")
+
+    def handle(self, *args, **options):
+        try:
+            ujian = Ujian.objects.get(id=options["ujian_id"])
+        except Ujian.DoesNotExist:
+            raise CommandError(f"Ujian id {options['ujian_id']} tidak ditemukan")
+        if options["jumlah"] <= 0:
+            raise CommandError("--jumlah harus > 0")
+        if options["panjang"] < 1:
+            raise CommandError("--panjang harus > 0")
+        kode_max = KodeAkses._meta.get_field("kode").max_length
+        if len(options["prefix"]) + options["panjang"] > kode_max:
+            raise CommandError(f"--prefix + --panjang maksimal {kode_max} karakter")
+        if options["qr_dir"] and not qr_available():
+            raise CommandError("Library QR belum terpasang: pip install segno")
+
+        start = time.perf_counter()
+        try:
+            codes = generate_kode_akses(
+                ujian,
+                options["jumlah"],
+                panjang=options["panjang"],
+                prefix=options["prefix"],
+                batch_size=options["batch_size"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(codes)} kode akses dibuat untuk {ujian.nama_ujian} ({time.perf_counter() - start:.1f} detik)"
+        ))
+
+        if options["csv"]:
+            with open(options["csv"], "w", newline="", encoding="utf-8") as f:
+                write_csv(f, ujian, codes)
+            self.stdout.write(f"📄 CSV: {options['csv']}")
+
+        if options["qr_dir"]:
+            start = time.perf_counter()
+            os.makedirs(options["qr_dir"], exist_ok=True)
+            for kode, png in render_many(codes, workers=options["workers"]):
+                with open(os.path.join(options["qr_dir"], f"{kode}.png"), "wb") as f:
+                    f.write(png)
+            self.stdout.write(f"🖨️ QR: {len(codes)} PNG di {options['qr_dir']} ({time.perf_counter() - start:.1f} detik)")
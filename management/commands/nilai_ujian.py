@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ujian_core.models import Ujian
+from ujian_core.scoring import nilai_ujian, scoring_available
+
+
+class Command(BaseCommand):
+    help = "Hitung skor HasilUjian dari kunci jawaban + analisis butir soal (hanya hasil yang berubah yang ditulis)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("ujian_id", type=int, nargs="*", help="Id ujian; default semua ujian yang punya kunci jawaban")
+
+    def handle(self, *args, **options):
+        if not scoring_available():
+            raise CommandError("Library numpy belum terpasang: pip install numpy")
+
+        ujian_list = Ujian.objects.order_by("id")
+        if options["ujian_id"]:
+            ujian_list = ujian_list.filter(id__in=options["ujian_id"])
+            missing = sorted(set(options["ujian_id"]) - {u.id for u in ujian_list})
+            if missing:
+                raise CommandError(f"Ujian id {missing} tidak ditemukan")
+        else:
+            ujian_list = ujian_list.filter(kunci_jawaban__isnull=False).distinct()
+
+        for ujian in ujian_list:
+            start = time.perf_counter()
+            try:
+                ringkasan = nilai_ujian(ujian.id)
+            except ValueError as e:
+                self.stdout.write(self.style.WARNING(f"⚠️ {ujian.nama_ujian}: {e}"))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {ujian.nama_ujian}: {ringkasan['dinilai']} hasil, {ringkasan['diperbarui']} skor diperbarui, "
+                f"{ringkasan['soal']} soal ({(time.perf_counter() - start) * 1000:.0f} ms)"
+            ))
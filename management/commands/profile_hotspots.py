@@ -0,0 +1,82 @@
+import glob
+import io
+import os
+import pstats
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ujian_core.profiling import profile_dir
+
+
+class Command(BaseCommand):
+    help = "Gabungkan file profil (.prof / .collapsed) dari PROFILE_DIR menjadi laporan top-N hotspot"
+
+    def add_arguments(self, parser):
+        parser.add_argument("endpoint", nargs="*", help="Nama URL (folder di PROFILE_DIR); default semua")
+        parser.add_argument("--dir", help="Folder profil (default PROFILE_DIR)")
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument("--sort", choices=["cumulative", "tottime", "ncalls"], default="cumulative",
+                            help="Urutan untuk file .prof")
+        parser.add_argument("--collapsed-out", help="Tulis gabungan collapsed stack ke file ini (untuk flamegraph)")
+
+    def handle(self, *args, **options):
+        base = options["dir"] or profile_dir()
+        if not os.path.isdir(base):
+            raise CommandError(f"Folder profil {base} tidak ada (aktifkan PROFILE_HOOK dulu)")
+        endpoints = options["endpoint"] or sorted(
+            name for name in os.listdir(base) if os.path.isdir(os.path.join(base, name))
+        )
+        if not endpoints:
+            raise CommandError(f"Tidak ada data profil di {base}")
+
+        merged_stacks = Counter()
+        for endpoint in endpoints:
+            directory = os.path.join(base, endpoint)
+            prof_files = sorted(glob.glob(os.path.join(directory, "*.prof")))
+            collapsed_files = sorted(glob.glob(os.path.join(directory, "*.collapsed")))
+            if not prof_files and not collapsed_files:
+                self.stdout.write(self.style.WARNING(f"⚠️ {endpoint}: tidak ada file profil"))
+                continue
+
+            if prof_files:
+                self.stdout.write(self.style.SUCCESS(f"\n🔥 {endpoint}: {len(prof_files)} request (cProfile, urut {options['sort']})"))
+                out = io.StringIO()
+                stats = pstats.Stats(*prof_files, stream=out)
+                stats.strip_dirs().sort_stats(options["sort"]).print_stats(options["top"])
+                # Buang header pstats (nama file satu per satu)
+                text = out.getvalue()
+                self.stdout.write(text[text.find("   ncalls"):] if "   ncalls" in text else text)
+
+            if collapsed_files:
+                stacks = Counter()
+                for path in collapsed_files:
+                    with open(path, encoding="utf-8") as f:
+                        for line in f:
+                            stack, _, count = line.rstrip("\n").rpartition(" ")
+                            if stack and count.isdigit():
+                                stacks[stack] += int(count)
+                merged_stacks.update(stacks)
+                self._print_samples(endpoint, len(collapsed_files), stacks, options["top"])
+
+        if options["collapsed_out"]:
+            with open(options["collapsed_out"], "w", encoding="utf-8") as f:
+                for stack, count in merged_stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            self.stdout.write(self.style.SUCCESS(f"\n📄 Collapsed stack: {options['collapsed_out']}"))
+
+    def _print_samples(self, endpoint, files, stacks, top):
+        total = sum(stacks.values())
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            # Fungsi rekursif dihitung sekali per sampel
+            for name in set(frames):
+                inclusive[name] += count
+
+        self.stdout.write(self.style.SUCCESS(f"\n🔥 {endpoint}: {files} request, {total} sampel (stack sampling)"))
+        self.stdout.write(f"{'self %':>8}{'total %':>9}  fungsi")
+        for name, count in own.most_common(top):
+            self.stdout.write(f"{count * 100 / total:>7.1f}%{inclusive[name] * 100 / total:>8.1f}%  {name}")
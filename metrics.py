@@ -0,0 +1,281 @@
+"""
+Metrik per endpoint: waktu request, jumlah query DB dan waktu DB.
+
+MetricsMiddleware (middleware.py) memanggil record() sekali per request;
+isinya hanya bisect + beberapa penjumlahan di bawah satu lock, jadi
+biayanya mikrodetik. Angka disimpan sebagai histogram bucket tetap per
+(endpoint, method, status), bukan daftar sampel, sehingga memori tidak
+tumbuh seiring jumlah request.
+
+Kalau server jalan dengan beberapa worker (gunicorn / waitress
+multi-proses), tiap proses menulis snapshot-nya ke METRICS_DIR/<pid>.json
+tiap METRICS_FLUSH_INTERVAL detik (kalau tidak ada request baru, mtime
+file tetap diperbarui). collect() menggabungkan snapshot semua proses
+dengan angka live proses yang melayani request metrik; snapshot hanya
+dihapus kalau sudah lebih lama dari METRICS_STALE_SECONDS dan PID-nya
+sudah tidak hidup, supaya counter worker yang diam tidak "reset".
+"""
+import atexit
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+# Batas atas bucket (detik / jumlah query); bucket terakhir = +Inf
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+HISTOGRAMS = {
+    'duration': DURATION_BUCKETS,
+    'db_time': DURATION_BUCKETS,
+    'queries': QUERY_BUCKETS,
+}
+
+_series = {}
+_lock = threading.Lock()
+_dirty = False
+_flusher = None
+_flusher_pid = None
+
+
+def _empty_series():
+    return {name: {'counts': [0] * (len(buckets) + 1), 'sum': 0.0} for name, buckets in HISTOGRAMS.items()}
+
+
+def record(endpoint, method, status, seconds, queries, db_seconds):
+    """Catat satu request (dipanggil middleware)"""
+    global _dirty
+    _ensure_flusher()
+    key = (endpoint, method, status)
+    values = (('duration', seconds), ('db_time', db_seconds), ('queries', queries))
+    with _lock:
+        series = _series.get(key)
+        if series is None:
+            series = _series[key] = _empty_series()
+        for name, value in values:
+            hist = series[name]
+            hist['counts'][bisect.bisect_left(HISTOGRAMS[name], value)] += 1
+            hist['sum'] += value
+        _dirty = True
+
+
+def reset():
+    """Kosongkan metrik proses ini (dipakai test)"""
+    global _dirty
+    with _lock:
+        _series.clear()
+        _dirty = False
+
+
+def _snapshot():
+    with _lock:
+        return [
+            {'labels': list(key), **{name: {'counts': list(h['counts']), 'sum': h['sum']} for name, h in series.items()}}
+            for key, series in _series.items()
+        ]
+
+
+def _metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None)
+
+
+def _snapshot_path(pid):
+    return os.path.join(_metrics_dir(), f"{pid}.json")
+
+
+def flush():
+    """Tulis snapshot proses ini ke METRICS_DIR (atomic rename); tanpa perubahan cukup perbarui mtime"""
+    global _dirty
+    if not _metrics_dir():
+        return
+    with _lock:
+        dirty, _dirty = _dirty, False
+        empty = not _series
+    path = _snapshot_path(os.getpid())
+    if not dirty:
+        try:
+            os.utime(path)
+            return
+        except OSError:
+            if empty:
+                return
+    os.makedirs(_metrics_dir(), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'pid': os.getpid(), 'time': time.time(), 'series': _snapshot()}, f)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        # os.kill di Windows menghentikan proses; cukup andalkan mtime
+        # (worker yang hidup memperbarui file-nya tiap flush interval)
+        return False
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def collect():
+    """Gabungan metrik semua proses: {(endpoint, method, status): series}"""
+    merged = {}
+
+    def _add(rows):
+        for row in rows:
+            key = tuple(row['labels'])
+            series = merged.get(key)
+            if series is None:
+                series = merged[key] = _empty_series()
+            for name in HISTOGRAMS:
+                series[name]['counts'] = [a + b for a, b in zip(series[name]['counts'], row[name]['counts'])]
+                series[name]['sum'] += row[name]['sum']
+
+    directory = _metrics_dir()
+    if directory:
+        stale = time.time() - getattr(settings, 'METRICS_STALE_SECONDS', 300)
+        own = _snapshot_path(os.getpid())
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            if path == own:
+                continue
+            try:
+                if os.path.getmtime(path) < stale and not _pid_alive(int(os.path.basename(path)[:-5])):
+                    # Worker sudah mati / restart
+                    os.remove(path)
+                    continue
+                with open(path, encoding='utf-8') as f:
+                    _add(json.load(f)['series'])
+            except (OSError, ValueError, KeyError):
+                continue
+    _add(_snapshot())
+    return merged
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(merged=None):
+    """Format teks Prometheus (exposition format 0.0.4)"""
+    merged = collect() if merged is None else merged
+    meta = {
+        'duration': ('ujian_http_request_duration_seconds', 'Waktu request per endpoint'),
+        'db_time': ('ujian_http_request_db_seconds', 'Waktu query DB per request'),
+        'queries': ('ujian_http_request_db_queries', 'Jumlah query DB per request'),
+    }
+    lines = []
+    for name, (metric, help_text) in meta.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for (endpoint, method, status), series in sorted(merged.items()):
+            labels = f'endpoint="{_label(endpoint)}",method="{_label(method)}",status="{_label(status)}"'
+            hist = series[name]
+            cumulative = 0
+            for bound, count in zip(HISTOGRAMS[name] + ('+Inf',), hist['counts']):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum{{{labels}}} {hist['sum']:.6f}")
+            lines.append(f"{metric}_count{{{labels}}} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _quantile(counts, buckets, q):
+    """Perkiraan kuantil dari histogram (interpolasi linear dalam bucket)"""
+    total = sum(counts)
+    if not total:
+        return None
+    target = q * total
+    cumulative, lower = 0, 0.0
+    for bound, count in zip(buckets + (None,), counts):
+        if count and cumulative + count >= target:
+            if bound is None:
+                return lower
+            return lower + (bound - lower) * (target - cumulative) / count
+        cumulative += count
+        if bound is not None:
+            lower = bound
+    return lower
+
+
+def summary(merged=None):
+    """Ringkasan per endpoint untuk panel monitor (diurutkan dari total waktu terbesar)"""
+    merged = collect() if merged is None else merged
+    endpoints = {}
+    for (endpoint, method, status), series in merged.items():
+        row = endpoints.setdefault(endpoint, {
+            'endpoint': endpoint,
+            'requests': 0,
+            'errors': 0,
+            'duration': _empty_series()['duration'],
+            'queries_sum': 0.0,
+            'db_time_sum': 0.0,
+        })
+        count = sum(series['duration']['counts'])
+        row['requests'] += count
+        if str(status).startswith('5'):
+            row['errors'] += count
+        row['duration']['counts'] = [a + b for a, b in zip(row['duration']['counts'], series['duration']['counts'])]
+        row['duration']['sum'] += series['duration']['sum']
+        row['queries_sum'] += series['queries']['sum']
+        row['db_time_sum'] += series['db_time']['sum']
+
+    result = []
+    for row in endpoints.values():
+        n = row['requests'] or 1
+        counts = row['duration']['counts']
+        p50 = _quantile(counts, DURATION_BUCKETS, 0.5)
+        p95 = _quantile(counts, DURATION_BUCKETS, 0.95)
+        result.append({
+            'endpoint': row['endpoint'],
+            'requests': row['requests'],
+            'errors': row['errors'],
+            'total_s': round(row['duration']['sum'], 3),
+            'mean_ms': round(row['duration']['sum'] / n * 1000, 1),
+            'p50_ms': None if p50 is None else round(p50 * 1000, 1),
+            'p95_ms': None if p95 is None else round(p95 * 1000, 1),
+            'queries_per_req': round(row['queries_sum'] / n, 2),
+            'db_ms_per_req': round(row['db_time_sum'] / n * 1000, 2),
+        })
+    result.sort(key=lambda row: row['total_s'], reverse=True)
+    return result
+
+
+def _ensure_flusher():
+    global _flusher, _flusher_pid
+    if _flusher is not None and _flusher_pid == os.getpid():
+        return
+    with _lock:
+        if _flusher is not None and _flusher_pid == os.getpid():
+            return
+        # Proses hasil fork mulai dari nol (angka proses induk ada di file induk)
+        if _flusher_pid is not None:
+            _series.clear()
+        _flusher_pid = os.getpid()
+        _flusher = threading.Thread(target=_flush_forever, name="metrics-flush", daemon=True)
+        _flusher.start()
+
+
+def _flush_forever():
+    while True:
+        time.sleep(getattr(settings, 'METRICS_FLUSH_INTERVAL', 5))
+        try:
+            flush()
+        except OSError as e:
+            print("Error menulis metrik:", e)
+
+
+@atexit.register
+def _remove_snapshot():
+    # Proses keluar normal: angkanya tidak dihitung lagi
+    if _metrics_dir() and _flusher_pid == os.getpid():
+        try:
+            os.remove(_snapshot_path(os.getpid()))
+        except OSError:
+            pass
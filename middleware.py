@@ -0,0 +1,142 @@
+"""
+Middleware ujian_core.
+
+MetricsMiddleware (METRICS_ENABLED, default aktif) mencatat waktu request,
+jumlah query dan waktu DB per nama URL ke metrics.py; lihat /api/metrics/.
+
+ProfilingMiddleware hanya dipasang kalau PROFILE_HOOK=True (lihat
+profiling.py).
+
+QueryCountMiddleware hanya dipasang kalau BENCHMARK_HEADERS=True (lihat
+settings.py): setiap response diberi header jumlah query, waktu DB, dan
+jumlah error "database is locked" yang terjadi selama request (termasuk
+yang berhasil di-retry), supaya loadtest.py bisa melaporkannya per
+endpoint tanpa akses ke server.
+"""
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections, OperationalError
+
+from . import metrics, profiling
+
+LOCK_ERRORS = ('locked', 'deadlock', 'could not obtain lock')
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.lock_errors = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as e:
+            if any(text in str(e).lower() for text in LOCK_ERRORS):
+                self.lock_errors += 1
+            raise
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - start
+
+
+class QueryCountMiddleware:
+    """
+    Header X-DB-Queries / X-DB-Time-Ms / X-DB-Lock-Errors. Hanya query di
+    thread request yang terhitung (bukan thread run_orm / flusher).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = _QueryCounter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = self.get_response(request)
+        response['X-DB-Queries'] = str(counter.queries)
+        response['X-DB-Time-Ms'] = f"{counter.seconds * 1000:.1f}"
+        response['X-DB-Lock-Errors'] = str(counter.lock_errors)
+        return response
+
+
+def _endpoint(request):
+    # Nama URL, bukan path: jumlah label tetap terbatas walau ada id di URL
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match.route or 'unresolved'
+
+
+class MetricsMiddleware:
+    """
+    Histogram waktu / query / waktu DB per endpoint. Di mode async (ASGI)
+    query view async yang dijalankan lewat run_orm tidak ikut terhitung.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - start, counter)
+        return response
+
+    async def __acall__(self, request):
+        counter = _QueryCounter()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(counter))
+            response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - start, counter)
+        return response
+
+    def _record(self, request, response, seconds, counter):
+        metrics.record(
+            _endpoint(request),
+            request.method,
+            str(response.status_code),
+            seconds,
+            counter.queries,
+            counter.seconds,
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Jalankan view terpilih di bawah profiler (profiling.py). Harus jadi
+    middleware terakhir: response dari process_view melewati process_view
+    middleware sesudahnya. View async tidak diprofil.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if iscoroutinefunction(view_func):
+            return None
+        endpoint = _endpoint(request)
+        mode = profiling.should_profile(endpoint)
+        if mode is None:
+            return None
+        return profiling.run_profiled(mode, endpoint, view_func, request, *view_args, **view_kwargs)
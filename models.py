@@ -1,9 +1,19 @@
-from django.db import models
+from django.db import models, transaction, OperationalError
+from django.db.models import F, Q, Case, When, Value
 from django.contrib.auth.models import User
+import hashlib
+import json
+import random
+import threading
+import time
 import uuid
-from django.core.signing import Signer
+from datetime import timezone as dt_timezone
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signing import Signer, BadSignature
 from django.utils.crypto import get_random_string
 from django.utils import timezone
+from .roster import normalize_nama
 
 # Model yang sudah ada (TIDAK DIUBAH)
 class Ujian(models.Model):
@@ -14,6 +24,12 @@ class Ujian(models.Model):
     durasi = models.IntegerField()
     aktif = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            # Lookup login: PIN ujian yang sedang aktif
+            models.Index(fields=['pin_ujian', 'aktif'], name='ujian_pin_aktif_idx'),
+        ]
+
     def __str__(self):
         return self.nama_ujian
 
@@ -21,10 +37,34 @@ class Peserta(models.Model):
     nis = models.CharField(max_length=20)
     nama = models.CharField(max_length=100)
     kelas = models.CharField(max_length=50, blank=True)
+    # Nama yang sudah dinormalisasi (lihat roster.normalize_nama), dipakai
+    # untuk semua lookup nama supaya bisa dilayani index, bukan UPPER() scan
+    nama_normal = models.CharField(max_length=100, editable=False, default='')
+
+    class Meta:
+        constraints = [
+            # Index unik ini juga melayani lookup nama_normal saja (prefix kolom)
+            models.UniqueConstraint(
+                fields=['nama_normal', 'kelas'],
+                name='unique_peserta_nama_normal_kelas',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.nis} - {self.nama}"
 
+    def save(self, *args, **kwargs):
+        self.nama_normal = normalize_nama(self.nama)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'nama' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'nama_normal'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def cari_nama(cls, nama):
+        """Queryset peserta dengan nama sama (case/spasi diabaikan)"""
+        return cls.objects.filter(nama_normal=normalize_nama(nama))
+
 class KodeAkses(models.Model):
     kode = models.CharField(max_length=50, unique=True)
     ujian = models.ForeignKey(Ujian, on_delete=models.CASCADE)
@@ -37,6 +77,8 @@ class HasilUjian(models.Model):
     peserta = models.ForeignKey(Peserta, on_delete=models.CASCADE)
     ujian = models.ForeignKey(Ujian, on_delete=models.CASCADE)
     jawaban = models.JSONField(default=dict)
+    # Seq autosave terakhir per soal (lihat autosave.py)
+    jawaban_seq = models.JSONField(default=dict, blank=True)
     percobaan_keluar = models.IntegerField(default=0)
     waktu_mulai = models.DateTimeField(auto_now_add=True)
     waktu_selesai = models.DateTimeField(null=True, blank=True)
@@ -50,9 +92,54 @@ class HasilUjian(models.Model):
         default='mulai'
     )
 
+    # Diisi scoring.py; skor_digest = hash jawaban + kunci saat terakhir dinilai
+    skor = models.FloatField(null=True, blank=True)
+    jumlah_benar = models.IntegerField(null=True, blank=True)
+    skor_digest = models.CharField(max_length=40, blank=True)
+
     def __str__(self):
         return f"{self.peserta.nama} - {self.ujian.nama_ujian}"
 
+class KunciJawaban(models.Model):
+    """Kunci jawaban + bobot satu soal (nomor soal = key di HasilUjian.jawaban)"""
+    ujian = models.ForeignKey(Ujian, on_delete=models.CASCADE, related_name='kunci_jawaban')
+    soal = models.CharField(max_length=20)
+    kunci = models.CharField(max_length=100)
+    bobot = models.FloatField(default=1)
+
+    class Meta:
+        verbose_name = "Kunci Jawaban"
+        verbose_name_plural = "Kunci Jawaban"
+        constraints = [
+            models.UniqueConstraint(fields=['ujian', 'soal'], name='unique_kunci_soal'),
+        ]
+
+    def __str__(self):
+        return f"{self.ujian.nama_ujian} - soal {self.soal}: {self.kunci}"
+
+class AnalisisSoal(models.Model):
+    """Statistik butir soal hasil scoring.py (dihitung dari hasil berstatus selesai)"""
+    ujian = models.ForeignKey(Ujian, on_delete=models.CASCADE, related_name='analisis_soal')
+    soal = models.CharField(max_length=20)
+    jumlah_peserta = models.IntegerField(default=0)
+    # Proporsi peserta yang menjawab benar (0-1)
+    tingkat_kesulitan = models.FloatField(null=True, blank=True)
+    # Korelasi point-biserial benar/salah dengan skor sisa soal lain (-1..1)
+    daya_beda = models.FloatField(null=True, blank=True)
+    # {pilihan: jumlah peserta}, "-" = tidak dijawab
+    distraktor = models.JSONField(default=dict)
+    diperbarui = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Analisis Soal"
+        verbose_name_plural = "Analisis Soal"
+        constraints = [
+            models.UniqueConstraint(fields=['ujian', 'soal'], name='unique_analisis_soal'),
+        ]
+
+    def __str__(self):
+        return f"{self.ujian.nama_ujian} - soal {self.soal}"
+
 # ===== MODEL BARU UNTUK SISTEM PENGUNCIAN =====
 
 class SessionLock(models.Model):
@@ -103,6 +190,9 @@ class SessionLock(models.Model):
             self.hasil_ujian.status == 'mulai'
         )
 
+def generate_encryption_key():
+    return get_random_string(64)
+
 class RemoteAccess(models.Model):
     """Model untuk remote access admin ke sesi ujian"""
     ACCESS_TYPES = [
@@ -133,10 +223,9 @@ class RemoteAccess(models.Model):
     
     # Security
     admin_ip = models.GenericIPAddressField(null=True, blank=True)
-    encryption_key = models.CharField(max_length=64, default=lambda: get_random_string(64))
+    encryption_key = models.CharField(max_length=64, default=generate_encryption_key)
     
-    # Audit trail
-    activity_log = models.JSONField(default=list)
+    # Audit trail → AuditEntry (satu baris per aksi)
     
     class Meta:
         verbose_name = "Remote Access"
@@ -146,25 +235,208 @@ class RemoteAccess(models.Model):
         return f"Remote Access to {self.session_lock.hasil_ujian.peserta.nama}"
     
     def log_activity(self, action, details):
-        """Log activity to audit trail"""
-        log_entry = {
-            'timestamp': timezone.now().isoformat(),
-            'action': action,
-            'details': details,
-            'admin': self.granted_by_admin.username if self.granted_by_admin else 'System'
-        }
-        
-        # Encrypt sensitive data
-        signer = Signer()
-        encrypted_entry = signer.sign_object(log_entry)
-        
-        self.activity_log.append(encrypted_entry)
-        self.save(update_fields=['activity_log'])
+        """Log activity to audit trail (append 1 baris, tidak menulis ulang log lama)"""
+        return AuditEntry.append(
+            self,
+            action,
+            details,
+            self.granted_by_admin.username if self.granted_by_admin else 'System'
+        )
+    
+    def audit_trail(self, after_seq=0, limit=100):
+        """Halaman audit trail berurutan (keyset: lanjutkan dengan after_seq = seq terakhir)"""
+        return list(
+            self.audit_entries
+            .filter(seq__gt=after_seq)
+            .order_by('seq')[:limit]
+        )
+    
+    def verify_audit_trail(self):
+        """Cek hash chain + tanda tangan batch; lihat AuditEntry.verify_chain"""
+        return AuditEntry.verify_chain(self.audit_entries.order_by('seq').iterator(chunk_size=500))
     
     def has_control_permission(self):
         """Check if this access has control permission"""
         return self.access_type == 'CONTROL' and self.is_active
 
+class AuditEntry(models.Model):
+    """
+    Audit trail RemoteAccess, append-only.
+
+    Tiap baris menyimpan hash SHA-256 dari isinya + hash baris sebelumnya
+    (hash chain), jadi mengubah / menghapus baris lama memutus rantai.
+    Tiap AUDIT_SIGN_BATCH baris, hash terakhir ditandatangani Signer
+    (SECRET_KEY) supaya rantai tidak bisa dihitung ulang tanpa kunci.
+    """
+    remote_access = models.ForeignKey(RemoteAccess, on_delete=models.CASCADE, related_name='audit_entries')
+    seq = models.PositiveIntegerField()
+    timestamp = models.DateTimeField(default=timezone.now)
+    action = models.CharField(max_length=100)
+    details = models.JSONField(default=dict, blank=True)
+    admin = models.CharField(max_length=150, blank=True)
+
+    prev_hash = models.CharField(max_length=64, blank=True)
+    entry_hash = models.CharField(max_length=64)
+    # Tanda tangan entry_hash, hanya di baris penutup batch
+    signature = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        verbose_name = "Audit Entry"
+        verbose_name_plural = "Audit Entries"
+        constraints = [
+            models.UniqueConstraint(fields=['remote_access', 'seq'], name='unique_audit_entry_seq'),
+        ]
+
+    def __str__(self):
+        return f"#{self.seq} {self.action} - {self.timestamp}"
+
+    @staticmethod
+    def compute_hash(prev_hash, seq, timestamp, action, details, admin):
+        payload = json.dumps(
+            [prev_hash, seq, timestamp.astimezone(dt_timezone.utc).isoformat(), action, details, admin],
+            cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'), ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def sign_hash(entry_hash):
+        return Signer(salt='ujian_core.audit').sign(entry_hash).rsplit(':', 1)[1]
+
+    @staticmethod
+    def check_signature(entry_hash, signature):
+        try:
+            return Signer(salt='ujian_core.audit').unsign(f"{entry_hash}:{signature}") == entry_hash
+        except BadSignature:
+            return False
+
+    @classmethod
+    def build(cls, remote_access, seq, prev_hash, action, details, admin, timestamp=None):
+        """Baris baru (belum disimpan) lengkap dengan hash & tanda tangan batch"""
+        timestamp = timestamp or timezone.now()
+        # Round-trip JSON: hash harus sama dengan isi yang nanti dibaca dari DB
+        details = json.loads(json.dumps(details, cls=DjangoJSONEncoder))
+        entry_hash = cls.compute_hash(prev_hash, seq, timestamp, action, details, admin)
+        batch = getattr(settings, 'AUDIT_SIGN_BATCH', 20)
+        return cls(
+            remote_access=remote_access,
+            seq=seq,
+            timestamp=timestamp,
+            action=action,
+            details=details,
+            admin=admin,
+            prev_hash=prev_hash,
+            entry_hash=entry_hash,
+            signature=cls.sign_hash(entry_hash) if seq % batch == 0 else '',
+        )
+
+    @classmethod
+    def append(cls, remote_access, action, details, admin=''):
+        with transaction.atomic():
+            # Kunci baris induk supaya seq & prev_hash tidak balapan antar worker
+            RemoteAccess.objects.select_for_update().filter(pk=remote_access.pk).values('pk').first()
+            last = (
+                cls.objects
+                .filter(remote_access=remote_access)
+                .order_by('-seq')
+                .values('seq', 'entry_hash')
+                .first()
+            )
+            seq, prev_hash = (last['seq'], last['entry_hash']) if last else (0, '')
+            entry = cls.build(remote_access, seq + 1, prev_hash, action, details, admin)
+            entry.save(force_insert=True)
+        return entry
+
+    @classmethod
+    def verify_chain(cls, entries):
+        """
+        Verifikasi entri berurutan seq. Return dict ok, checked, signed,
+        unsigned_tail (baris setelah tanda tangan terakhir) dan broken_at
+        (seq pertama yang rusak, None kalau utuh).
+        """
+        result = {'ok': True, 'checked': 0, 'signed': 0, 'unsigned_tail': 0, 'broken_at': None}
+        prev_hash, expected_seq = '', 1
+        for entry in entries:
+            expected = cls.compute_hash(prev_hash, entry.seq, entry.timestamp, entry.action, entry.details, entry.admin)
+            valid = (
+                entry.seq == expected_seq
+                and entry.prev_hash == prev_hash
+                and entry.entry_hash == expected
+                and (not entry.signature or cls.check_signature(entry.entry_hash, entry.signature))
+            )
+            if not valid:
+                result.update(ok=False, broken_at=entry.seq)
+                return result
+            result['checked'] += 1
+            if entry.signature:
+                result['signed'] += 1
+                result['unsigned_tail'] = 0
+            else:
+                result['unsigned_tail'] += 1
+            prev_hash, expected_seq = entry.entry_hash, entry.seq + 1
+        return result
+
+class DeviceInfo(models.Model):
+    """User agent + browser fingerprint unik (di-intern lewat hash), dirujuk SecurityEvent"""
+    hash = models.CharField(max_length=64, unique=True)
+    user_agent = models.TextField(blank=True)
+    browser_fingerprint = models.TextField(blank=True)
+    first_seen = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Device Info"
+        verbose_name_plural = "Device Info"
+
+    def __str__(self):
+        return self.user_agent[:80] or self.hash[:12]
+
+    @staticmethod
+    def hash_for(user_agent, browser_fingerprint=''):
+        return hashlib.sha256(f"{user_agent}\0{browser_fingerprint}".encode('utf-8')).hexdigest()
+
+    @classmethod
+    def intern_many(cls, pairs):
+        """
+        {(user_agent, fingerprint): device_id} untuk banyak pasangan sekaligus.
+        Hash yang sudah dikenal diambil dari cache proses; sisanya satu
+        bulk_create(ignore_conflicts) + satu SELECT.
+        """
+        result, missing = {}, {}
+        for pair in set(pairs):
+            key = cls.hash_for(*pair)
+            device_id = _device_cache.get(key)
+            if device_id is None:
+                missing[key] = pair
+            else:
+                result[pair] = device_id
+
+        if missing:
+            cls.objects.bulk_create(
+                [cls(hash=key, user_agent=ua, browser_fingerprint=fp) for key, (ua, fp) in missing.items()],
+                ignore_conflicts=True,
+            )
+            found = dict(cls.objects.filter(hash__in=list(missing)).values_list('hash', 'id'))
+            with _device_lock:
+                if len(_device_cache) + len(found) > DEVICE_CACHE_MAX:
+                    _device_cache.clear()
+                _device_cache.update(found)
+            for key, pair in missing.items():
+                result[pair] = found[key]
+        return result
+
+    @classmethod
+    def intern(cls, user_agent, browser_fingerprint=''):
+        pair = (user_agent or '', browser_fingerprint or '')
+        return cls.intern_many([pair])[pair]
+
+# Cache hash → DeviceInfo.id per proses
+_device_cache = {}
+_device_lock = threading.Lock()
+DEVICE_CACHE_MAX = 10000
+
+def clear_device_cache():
+    with _device_lock:
+        _device_cache.clear()
+
 class SecurityEvent(models.Model):
     """Model untuk logging security events"""
     EVENT_TYPES = [
@@ -181,16 +453,17 @@ class SecurityEvent(models.Model):
     
     session_lock = models.ForeignKey(SessionLock, on_delete=models.CASCADE, related_name='security_events', null=True, blank=True)
     remote_access = models.ForeignKey(RemoteAccess, on_delete=models.SET_NULL, null=True, blank=True)
+    # Salinan session_lock.hasil_ujian.ujian supaya "event terbaru per ujian" tidak perlu join
+    ujian = models.ForeignKey(Ujian, on_delete=models.CASCADE, null=True, blank=True, related_name='security_events')
     
     event_type = models.CharField(max_length=50, choices=EVENT_TYPES)
     description = models.TextField()
     
-    # Device info
+    # Device info (user agent / fingerprint disimpan sekali di DeviceInfo)
     ip_address = models.GenericIPAddressField()
-    user_agent = models.TextField()
-    browser_fingerprint = models.TextField(blank=True)
+    device = models.ForeignKey(DeviceInfo, on_delete=models.PROTECT, null=True, blank=True)
     
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now)
     
     # Additional data
     metadata = models.JSONField(default=dict)
@@ -199,13 +472,27 @@ class SecurityEvent(models.Model):
         verbose_name = "Security Event"
         verbose_name_plural = "Security Events"
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['ujian', 'event_type', '-timestamp'], name='secevent_ujian_type_time_idx'),
+            models.Index(fields=['session_lock', '-timestamp'], name='secevent_session_time_idx'),
+            models.Index(fields=['event_type', '-timestamp'], name='secevent_type_time_idx'),
+            models.Index(fields=['-timestamp'], name='secevent_time_idx'),
+        ]
     
     def __str__(self):
         return f"{self.event_type} - {self.timestamp}"
+    
+    @property
+    def user_agent(self):
+        return self.device.user_agent if self.device_id else ''
+    
+    @property
+    def browser_fingerprint(self):
+        return self.device.browser_fingerprint if self.device_id else ''
 
 # ===== SIGNALS UNTUK AUTO-CREATE =====
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 @receiver(post_save, sender=HasilUjian)
@@ -217,6 +504,59 @@ def create_session_lock(sender, instance, created, **kwargs):
             session_token=str(uuid.uuid4())
         )
 
+@receiver(post_save, sender=Ujian)
+@receiver(post_delete, sender=Ujian)
+def invalidate_ujian_pin_cache(sender, **kwargs):
+    """
+    Ujian diubah/dihapus (termasuk toggle aktif di admin) → cache PIN dibuang
+    setelah commit; kalau dibuang sebelum commit, login bersamaan bisa
+    meng-cache ulang baris lama sampai TTL habis.
+    """
+    transaction.on_commit(clear_ujian_pin_cache)
+
+# ===== CACHE UJIAN AKTIF PER PIN =====
+
+# Cache per proses; TTL jadi pengaman kalau ujian diubah di worker lain
+_ujian_pin_cache = {}
+_ujian_pin_lock = threading.Lock()
+_ujian_pin_generation = 0
+UJIAN_PIN_CACHE_MAX = 1024
+
+def clear_ujian_pin_cache():
+    global _ujian_pin_generation
+    with _ujian_pin_lock:
+        _ujian_pin_generation += 1
+        _ujian_pin_cache.clear()
+
+def get_ujian_aktif(pin_ujian):
+    """
+    Metadata ujian aktif untuk PIN (id, nama_ujian, url_soal, waktu_mulai,
+    durasi) atau None. Hasil (termasuk PIN salah) di-cache sampai ada Ujian
+    yang disimpan/dihapus, atau paling lama UJIAN_PIN_CACHE_TTL detik.
+    """
+    now = time.monotonic()
+    entry = _ujian_pin_cache.get(pin_ujian)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    generation = _ujian_pin_generation
+    ujian = (
+        Ujian.objects
+        .filter(pin_ujian=pin_ujian, aktif=True)
+        .order_by('id')
+        .values('id', 'nama_ujian', 'url_soal', 'waktu_mulai', 'durasi')
+        .first()
+    )
+
+    with _ujian_pin_lock:
+        # Jangan simpan hasil query kalau cache di-invalidate selama query berjalan
+        if generation == _ujian_pin_generation:
+            if len(_ujian_pin_cache) >= UJIAN_PIN_CACHE_MAX:
+                _ujian_pin_cache.clear()
+            ttl = getattr(settings, 'UJIAN_PIN_CACHE_TTL', 30)
+            _ujian_pin_cache[pin_ujian] = (now + ttl, ujian)
+    return ujian
+
 # ===== UTILITY FUNCTIONS =====
 
 def create_remote_access_request(session_lock, admin_user, access_type='MONITOR', purpose=''):
@@ -234,10 +574,11 @@ def create_remote_access_request(session_lock, admin_user, access_type='MONITOR'
     SecurityEvent.objects.create(
         session_lock=session_lock,
         remote_access=remote_access,
+        ujian_id=session_lock.hasil_ujian.ujian_id,
         event_type='REMOTE_ACCESS_REQUEST',
         description=f'Remote access requested by {admin_user.username}',
         ip_address=admin_user.last_login_ip if hasattr(admin_user, 'last_login_ip') else '0.0.0.0',
-        user_agent='Admin Panel',
+        device=DeviceInfo.intern('Admin Panel'),
         metadata={
             'access_type': access_type,
             'purpose': purpose,
@@ -247,6 +588,107 @@ def create_remote_access_request(session_lock, admin_user, access_type='MONITOR'
     
     return remote_access
 
+class KodeAksesSibuk(Exception):
+    """Database terus terkunci saat menukar kode akses (retry habis)"""
+
+
+def redeem_kode_akses(kode_akses, peserta_id, ip_address=None, user_agent='', max_retries=5):
+    """
+    Tukar kode akses secara atomik.
+
+    Kode diklaim dengan satu UPDATE bersyarat (terpakai=False → True), lalu
+    HasilUjian dan SessionLock dibuat di transaksi yang sama; kalau gagal
+    semuanya di-rollback dan kode tidak hangus. Dua request dengan kode yang
+    sama tidak mungkin sama-sama berhasil. Error "database is locked" di-retry
+    dengan backoff.
+
+    Return (kode, hasil_ujian, session_lock), atau None kalau kode tidak valid
+    / sudah terpakai / peserta tidak ditemukan.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            kode = KodeAkses.objects.select_related('ujian').filter(kode=kode_akses, terpakai=False).first()
+            if kode is None or not Peserta.objects.filter(id=peserta_id).exists():
+                return None
+
+            with transaction.atomic():
+                # Statement pertama langsung menulis → tidak ada upgrade read→write lock
+                claimed = KodeAkses.objects.filter(pk=kode.pk, terpakai=False).update(terpakai=True)
+                if not claimed:
+                    return None
+
+                hasil_ujian, _ = HasilUjian.objects.get_or_create(
+                    peserta_id=peserta_id,
+                    ujian_id=kode.ujian_id,
+                    defaults={'status': 'mulai'}
+                )
+                session_lock, _ = SessionLock.objects.get_or_create(
+                    hasil_ujian=hasil_ujian,
+                    defaults={
+                        'session_token': str(uuid.uuid4()),
+                        'ip_address': ip_address,
+                        'user_agent': user_agent
+                    }
+                )
+            kode.terpakai = True
+            return kode, hasil_ujian, session_lock
+
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            if attempt == max_retries:
+                raise KodeAksesSibuk(str(e)) from e
+            time.sleep(0.05 * (2 ** attempt) * (0.5 + random.random()))
+
+
+# ===== PELANGGARAN =====
+
+# Waktu pelanggaran terakhir per sesi (monotonic), untuk buang event ganda
+_pelanggaran_terakhir = {}
+_pelanggaran_lock = threading.Lock()
+PELANGGARAN_DEBOUNCE_MAX = 10000
+
+def debounce_pelanggaran(key, window):
+    """True kalau sesi ini sudah melapor < window detik lalu (blur + visibilitychange dari 1x pindah tab)"""
+    now = time.monotonic()
+    with _pelanggaran_lock:
+        last = _pelanggaran_terakhir.get(key)
+        if last is not None and now - last < window:
+            return True
+        if len(_pelanggaran_terakhir) >= PELANGGARAN_DEBOUNCE_MAX:
+            for old in [k for k, t in _pelanggaran_terakhir.items() if now - t >= window]:
+                del _pelanggaran_terakhir[old]
+        _pelanggaran_terakhir[key] = now
+        return False
+
+def clear_pelanggaran_debounce():
+    with _pelanggaran_lock:
+        _pelanggaran_terakhir.clear()
+
+def catat_pelanggaran(batas, **lookup):
+    """
+    Tambah percobaan_keluar sesi 'mulai' dengan satu UPDATE bersyarat;
+    kalau hitungan mencapai batas (0 = tanpa batas) status sekalian jadi
+    diskualifikasi. lookup: id=... atau peserta_id=..., ujian_id=...
+
+    Return (tercatat, data sesi terbaru) - data None kalau sesi tidak ada.
+    """
+    changes = {'percobaan_keluar': F('percobaan_keluar') + 1}
+    if batas:
+        # Kondisi dibaca dari nilai sebelum UPDATE
+        kena = Q(percobaan_keluar__gte=batas - 1)
+        changes['status'] = Case(When(kena, then=Value('diskualifikasi')), default=F('status'))
+        changes['waktu_selesai'] = Case(When(kena, then=Value(timezone.now())), default=F('waktu_selesai'))
+
+    updated = HasilUjian.objects.filter(status='mulai', **lookup).update(**changes)
+    hasil = (
+        HasilUjian.objects
+        .filter(**lookup)
+        .values('id', 'ujian_id', 'percobaan_keluar', 'status', 'session_lock__id')
+        .first()
+    )
+    return bool(updated), hasil
+
 def get_active_session_locks(ujian_id=None):
     """Get all active session locks, optionally filtered by ujian"""
     query = SessionLock.objects.filter(
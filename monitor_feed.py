@@ -0,0 +1,225 @@
+"""
+Feed live untuk dashboard monitor (SSE / long-poll).
+
+Perubahan sesi (lock baru, status berubah, pelanggaran, selesai) dikirim
+ke event bus di memori oleh signal model dan endpoint alert. Setiap
+perubahan dibaca dari DB satu kali saat di-publish; pengawas yang
+berlangganan hanya menerima event dari bus, jadi 10 pengawas tidak
+berarti 10x query get_active_session_locks tiap refresh.
+
+Event disimpan di ring buffer dengan id "<epoch>:<n>". Client yang
+reconnect dengan Last-Event-ID menerima event yang terlewat; kalau id-nya
+sudah keluar dari buffer (atau server restart), client dikirimi snapshot
+sesi aktif lagi. Bus hanya berlaku dalam satu proses (runserver /
+waitress); kalau pakai beberapa worker, feed harus dilayani worker yang
+sama dengan yang menulis.
+"""
+import asyncio
+import threading
+import time
+import uuid
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import HasilUjian, SessionLock, SecurityEvent, get_active_session_locks
+
+SESSION_FIELDS = (
+    'hasil_ujian_id',
+    'hasil_ujian__ujian_id',
+    'hasil_ujian__ujian__nama_ujian',
+    'hasil_ujian__peserta__nama',
+    'hasil_ujian__peserta__kelas',
+    'hasil_ujian__status',
+    'hasil_ujian__percobaan_keluar',
+    'hasil_ujian__waktu_mulai',
+    'hasil_ujian__waktu_selesai',
+    'is_locked',
+    'user_consented',
+    'ip_address',
+)
+
+
+class MonitorBus:
+    """Ring buffer event + Condition untuk pelanggan yang menunggu"""
+
+    def __init__(self, max_events=1000):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._events = deque(maxlen=max_events)
+        self._cond = threading.Condition()
+        self._waiters = set()
+        self._last = 0
+
+    def publish(self, kind, data, ujian_id=None):
+        with self._cond:
+            self._last += 1
+            event = {
+                'id': f"{self.epoch}:{self._last}",
+                'seq': self._last,
+                'type': kind,
+                'ujian_id': ujian_id,
+                'time': timezone.now().isoformat(),
+                'data': data,
+            }
+            self._events.append(event)
+            self._cond.notify_all()
+            # Pelanggan async (ASGI) dibangunkan di event loop masing-masing
+            for loop, future in self._waiters:
+                loop.call_soon_threadsafe(_wake, future)
+        return event
+
+    def parse_id(self, last_event_id):
+        """Last-Event-ID → nomor urut; None kalau kosong / epoch lain"""
+        epoch, _, seq = str(last_event_id or '').partition(':')
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        return seq if seq <= self._last else None
+
+    def cursor(self, seq=None):
+        return f"{self.epoch}:{self._last if seq is None else seq}"
+
+    def since(self, seq, ujian_id=None):
+        """
+        Event setelah seq → (events, complete, seq_baru). complete False
+        kalau ada event yang sudah terbuang dari buffer (perlu snapshot).
+        """
+        with self._cond:
+            if seq is None:
+                return [], False, self._last
+            oldest = self._events[0]['seq'] if self._events else self._last + 1
+            if seq < oldest - 1:
+                return [], False, self._last
+            events = [
+                e for e in self._events
+                if e['seq'] > seq and (ujian_id is None or e['ujian_id'] == ujian_id)
+            ]
+            return events, True, self._last
+
+    def wait(self, seq, ujian_id=None, timeout=25):
+        """Seperti since(), tapi menunggu sampai ada event atau timeout"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                events, complete, head = self.since(seq, ujian_id)
+                if events or not complete:
+                    return events, complete, head
+                # Event untuk ujian lain tidak perlu dicek ulang
+                seq = head
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return [], True, head
+                self._cond.wait(remaining)
+
+    async def wait_async(self, seq, ujian_id=None, timeout=25):
+        """Versi async wait(): menunggu tanpa memakai thread"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            with self._cond:
+                events, complete, head = self.since(seq, ujian_id)
+                if events or not complete or remaining <= 0:
+                    return events, complete, head
+                seq = head
+                waiter = (loop, loop.create_future())
+                self._waiters.add(waiter)
+            try:
+                await asyncio.wait_for(waiter[1], remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._cond:
+                    self._waiters.discard(waiter)
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+bus = MonitorBus(getattr(settings, 'MONITOR_FEED_BUFFER', 1000))
+
+
+def _session_row(row):
+    return {
+        'hasil_ujian_id': row['hasil_ujian_id'],
+        'ujian_id': row['hasil_ujian__ujian_id'],
+        'ujian': row['hasil_ujian__ujian__nama_ujian'],
+        'nama': row['hasil_ujian__peserta__nama'],
+        'kelas': row['hasil_ujian__peserta__kelas'],
+        'status': row['hasil_ujian__status'],
+        'percobaan_keluar': row['hasil_ujian__percobaan_keluar'],
+        'waktu_mulai': row['hasil_ujian__waktu_mulai'].isoformat() if row['hasil_ujian__waktu_mulai'] else None,
+        'waktu_selesai': row['hasil_ujian__waktu_selesai'].isoformat() if row['hasil_ujian__waktu_selesai'] else None,
+        'is_locked': row['is_locked'],
+        'user_consented': row['user_consented'],
+        'ip_address': row['ip_address'],
+    }
+
+
+def snapshot(ujian_id=None):
+    """Sesi aktif saat ini (dikirim saat connect pertama / setelah gap)"""
+    rows = get_active_session_locks(ujian_id).values(*SESSION_FIELDS)
+    return [_session_row(row) for row in rows]
+
+
+def publish_session(hasil_ujian_id, kind):
+    """Baca satu sesi (sekali, setelah commit) lalu kirim ke bus"""
+    def _publish():
+        row = (
+            SessionLock.objects
+            .filter(hasil_ujian_id=hasil_ujian_id)
+            .values(*SESSION_FIELDS)
+            .first()
+        )
+        if row is not None:
+            data = _session_row(row)
+            bus.publish(kind, data, ujian_id=data['ujian_id'])
+    transaction.on_commit(_publish)
+
+
+def publish_alert(kind, data, ujian_id=None):
+    """Event dari endpoint alert (tanpa query DB)"""
+    bus.publish(kind, data, ujian_id=ujian_id)
+
+
+@receiver(post_save, sender=SessionLock)
+def feed_session_lock(sender, instance, created, **kwargs):
+    publish_session(instance.hasil_ujian_id, 'lock' if created else 'lock_update')
+
+
+@receiver(post_save, sender=HasilUjian)
+def feed_hasil_ujian(sender, instance, created, **kwargs):
+    # Sesi baru sudah dikirim lewat SessionLock
+    if not created:
+        publish_session(instance.id, instance.status)
+
+
+@receiver(post_save, sender=SecurityEvent)
+def feed_security_event(sender, instance, created, **kwargs):
+    if not created:
+        return
+
+    def _publish():
+        ujian_id, hasil_ujian_id = instance.ujian_id, None
+        if instance.session_lock_id:
+            row = (
+                SessionLock.objects
+                .filter(id=instance.session_lock_id)
+                .values('hasil_ujian_id', 'hasil_ujian__ujian_id')
+                .first()
+            )
+            if row:
+                hasil_ujian_id, ujian_id = row['hasil_ujian_id'], row['hasil_ujian__ujian_id']
+        bus.publish('security_event', {
+            'hasil_ujian_id': hasil_ujian_id,
+            'event_type': instance.event_type,
+            'description': instance.description,
+            'ip_address': instance.ip_address,
+        }, ujian_id=ujian_id)
+    transaction.on_commit(_publish)
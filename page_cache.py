@@ -0,0 +1,142 @@
+"""
+Cache halaman frontend peserta (login, menu, exam, consent, lock).
+
+Isi halaman-halaman ini tidak bergantung pada request: data siswa diambil
+JS dari localStorage / API. Jadi template cukup di-render sekali per versi,
+yaitu (mtime file template, hash manifest static). Versi dicek ulang paling
+sering sekali per PAGE_CACHE_RELOAD_INTERVAL detik; template yang diedit
+atau `manage.py build_static` ulang otomatis memicu render ulang.
+
+Response membawa ETag + Last-Modified dengan Cache-Control no-cache:
+browser selalu revalidasi (halaman tidak basi setelah update), tapi refresh
+cukup dibalas 304 tanpa body. Halaman di-render saat startup (apps.ready).
+PAGE_CACHE_ENABLED=False = render() biasa tiap request.
+"""
+import hashlib
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.core.files.storage import storages
+from django.http import HttpResponse
+from django.shortcuts import render
+from django.template import TemplateDoesNotExist
+from django.template.autoreload import reset_loaders
+from django.template.loader import get_template, render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+PAGES = (
+    'ujian_core/login.html',
+    'ujian_core/menu.html',
+    'ujian_core/exam.html',
+    'ujian_core/exam_consent.html',
+    'ujian_core/exam_lock.html',
+)
+
+
+class PageCache:
+    """Halaman ter-render per template, di-render ulang saat versinya berubah"""
+
+    def __init__(self, reload_interval=2.0):
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._manifest_mtime = None
+
+    def _manifest_version(self):
+        """(hash manifest, mtime) dan muat ulang manifest storage kalau file-nya berubah"""
+        storage = storages['staticfiles']
+        if not isinstance(storage, ManifestFilesMixin):
+            return '', 0
+        try:
+            mtime = os.path.getmtime(storage.manifest_storage.path(storage.manifest_name))
+        except (OSError, NotImplementedError):
+            mtime = 0
+        if mtime != self._manifest_mtime:
+            # {% static %} di semua template ikut memakai nama ber-hash yang baru
+            self._manifest_mtime = mtime
+            storage.hashed_files, storage.manifest_hash = storage.load_manifest()
+        return storage.manifest_hash, mtime
+
+    def get(self, template_name):
+        """dict body/etag/last_modified; TemplateDoesNotExist kalau template tidak ada"""
+        now = time.monotonic()
+        page = self._pages.get(template_name)
+        if page is not None and now - page['checked'] < self.reload_interval:
+            return page
+
+        with self._lock:
+            page = self._pages.get(template_name)
+            if page is not None and now - page['checked'] < self.reload_interval:
+                return page
+            manifest_hash, manifest_mtime = self._manifest_version()
+            template_mtime = os.path.getmtime(get_template(template_name).origin.name)
+            version = (template_mtime, manifest_hash)
+            if page is not None and page['version'] == version:
+                page['checked'] = now
+                return page
+            if page is not None and page['version'][0] != template_mtime:
+                # Loader cached masih menyimpan template lama yang sudah dikompilasi
+                reset_loaders()
+
+            body = render_to_string(template_name).encode('utf-8')
+            page = {
+                'version': version,
+                'body': body,
+                'etag': f'"{hashlib.sha1(body).hexdigest()[:20]}"',
+                'last_modified': int(max(template_mtime, manifest_mtime)),
+                'checked': now,
+            }
+            self._pages[template_name] = page
+            return page
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+            self._manifest_mtime = None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_page_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PageCache(getattr(settings, 'PAGE_CACHE_RELOAD_INTERVAL', 2.0))
+        return _cache
+
+
+def warm():
+    """Render semua halaman sekarang; return daftar template yang berhasil"""
+    cache = get_page_cache()
+    warmed = []
+    for template_name in PAGES:
+        try:
+            cache.get(template_name)
+        except TemplateDoesNotExist:
+            continue
+        warmed.append(template_name)
+    return warmed
+
+
+def cached_page(request, template_name):
+    """Pengganti render(request, template_name) untuk halaman yang sama untuk semua orang"""
+    if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+        return render(request, template_name)
+    try:
+        page = get_page_cache().get(template_name)
+    except TemplateDoesNotExist:
+        return render(request, template_name)
+
+    response = HttpResponse(page['body'], content_type='text/html; charset=utf-8')
+    response['ETag'] = page['etag']
+    response['Last-Modified'] = http_date(page['last_modified'])
+    response['Cache-Control'] = 'no-cache'
+    return get_conditional_response(
+        request, etag=page['etag'], last_modified=page['last_modified'], response=response,
+    )
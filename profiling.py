@@ -0,0 +1,242 @@
+"""
+Profiling opt-in untuk endpoint yang lambat (validate_kode, login, ...).
+
+ProfilingMiddleware hanya dipasang kalau PROFILE_HOOK=True; tanpa itu
+tidak ada kode profiling yang jalan sama sekali. Kalau terpasang, request
+diprofil bila nama URL-nya ada di daftar endpoint (kosong = semua) dan
+lolos undian sample rate. Daftar + rate diambil dari settings
+(PROFILE_ENDPOINTS, PROFILE_SAMPLE_RATE) atau dari toggle admin
+(/api/profiling/) yang ditulis ke PROFILE_DIR/toggle.json sehingga berlaku
+untuk semua worker dan otomatis mati setelah waktunya habis.
+
+Mode:
+    cprofile  file .prof (pstats) per request
+    sample    stack sampling tiap PROFILE_SAMPLE_INTERVAL detik, ditulis
+              sebagai collapsed stack (.collapsed, 1 baris "a;b;c jumlah")
+              yang bisa langsung dibuka speedscope / flamegraph.pl
+
+File disimpan di PROFILE_DIR/<endpoint>/, paling banyak PROFILE_MAX_FILES
+per endpoint (yang tertua dihapus). Ringkasan: manage.py profile_hotspots.
+"""
+import cProfile
+import glob
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+MODES = ('cprofile', 'sample')
+
+_toggle_lock = threading.Lock()
+_toggle_state = {'checked': 0.0, 'mtime': None, 'data': None}
+# Toggle dibaca ulang dari file paling sering tiap N detik
+TOGGLE_RELOAD_INTERVAL = 2.0
+
+
+def profile_dir():
+    return str(getattr(settings, 'PROFILE_DIR'))
+
+
+def _toggle_path():
+    return os.path.join(profile_dir(), 'toggle.json')
+
+
+def read_toggle():
+    """Isi toggle.json (dict) kalau ada dan belum kedaluwarsa, selain itu None"""
+    now = time.monotonic()
+    with _toggle_lock:
+        if now - _toggle_state['checked'] >= TOGGLE_RELOAD_INTERVAL:
+            _toggle_state['checked'] = now
+            try:
+                mtime = os.path.getmtime(_toggle_path())
+            except OSError:
+                mtime = None
+            if mtime != _toggle_state['mtime']:
+                _toggle_state['mtime'] = mtime
+                _toggle_state['data'] = None
+                if mtime is not None:
+                    try:
+                        with open(_toggle_path(), encoding='utf-8') as f:
+                            _toggle_state['data'] = json.load(f)
+                    except (OSError, ValueError):
+                        pass
+        data = _toggle_state['data']
+    if data and data.get('until', 0) > time.time():
+        return data
+    return None
+
+
+def write_toggle(endpoints, rate, mode='cprofile', minutes=10):
+    """Aktifkan profiling untuk semua worker selama `minutes` menit"""
+    os.makedirs(profile_dir(), exist_ok=True)
+    data = {
+        'endpoints': sorted(set(endpoints)),
+        'rate': rate,
+        'mode': mode,
+        'until': time.time() + minutes * 60,
+    }
+    tmp = f"{_toggle_path()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp, _toggle_path())
+    _reset_toggle_cache()
+    return data
+
+
+def clear_toggle():
+    try:
+        os.remove(_toggle_path())
+    except OSError:
+        pass
+    _reset_toggle_cache()
+
+
+def _reset_toggle_cache():
+    with _toggle_lock:
+        _toggle_state.update(checked=0.0, mtime=None, data=None)
+
+
+def current_config():
+    """(endpoints set, rate, mode): toggle admin menimpa settings"""
+    toggle = read_toggle()
+    if toggle is not None:
+        return set(toggle['endpoints']), float(toggle['rate']), toggle.get('mode', 'cprofile')
+    endpoints = getattr(settings, 'PROFILE_ENDPOINTS', '')
+    if isinstance(endpoints, str):
+        endpoints = [e.strip() for e in endpoints.split(',') if e.strip()]
+    return set(endpoints), float(getattr(settings, 'PROFILE_SAMPLE_RATE', 0)), getattr(settings, 'PROFILE_MODE', 'cprofile')
+
+
+def should_profile(endpoint):
+    """Mode profiling untuk request ini, atau None"""
+    endpoints, rate, mode = current_config()
+    if rate <= 0 or (endpoints and endpoint not in endpoints):
+        return None
+    if rate < 1 and random.random() >= rate:
+        return None
+    return mode
+
+
+class StackSampler:
+    """
+    Satu thread sampler untuk semua request yang sedang diprofil: tiap
+    interval membaca frame thread-thread terdaftar (sys._current_frames)
+    dan menghitung collapsed stack-nya.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._active = {}
+        self._thread = None
+
+    def start(self, thread_id):
+        with self._lock:
+            self._active[thread_id] = Counter()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._active.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                frames = sys._current_frames()
+                for thread_id, counts in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        counts[collapse_stack(frame)] += 1
+            time.sleep(self.interval)
+
+
+def collapse_stack(frame):
+    """Frame → "modul:fungsi;...;modul:fungsi" (terluar dulu)"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get('__name__', os.path.basename(code.co_filename))
+        names.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+_cprofile_lock = threading.Lock()
+_file_seq = itertools.count(1)
+
+
+def get_sampler():
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = StackSampler(getattr(settings, 'PROFILE_SAMPLE_INTERVAL', 0.001))
+        return _sampler
+
+
+def _safe_name(endpoint):
+    return ''.join(c if c.isalnum() or c in '-_' else '_' for c in endpoint) or 'unresolved'
+
+
+def output_path(endpoint, seconds, ext):
+    directory = os.path.join(profile_dir(), _safe_name(endpoint))
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(directory, f"{stamp}-{os.getpid()}-{next(_file_seq)}-{seconds * 1000:.0f}ms.{ext}")
+
+
+def rotate(endpoint):
+    """Hapus file tertua kalau jumlah file endpoint melewati PROFILE_MAX_FILES"""
+    keep = getattr(settings, 'PROFILE_MAX_FILES', 200)
+    files = sorted(
+        glob.glob(os.path.join(profile_dir(), _safe_name(endpoint), '*.*')),
+        key=os.path.getmtime,
+    )
+    for path in files[:-keep] if keep else files:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def run_profiled(mode, endpoint, func, *args, **kwargs):
+    """Jalankan func di bawah profiler lalu tulis hasilnya; return hasil func"""
+    start = time.perf_counter()
+    if mode == 'sample':
+        sampler = get_sampler()
+        thread_id = threading.get_ident()
+        sampler.start(thread_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            counts = sampler.stop(thread_id)
+            path = output_path(endpoint, time.perf_counter() - start, 'collapsed')
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, count in counts.most_common():
+                    f.write(f"{stack} {count}\n")
+            rotate(endpoint)
+
+    # Python 3.12+: hanya satu cProfile yang boleh aktif; request lain jalan tanpa profil
+    if not _cprofile_lock.acquire(blocking=False):
+        return func(*args, **kwargs)
+    try:
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            profiler.dump_stats(output_path(endpoint, time.perf_counter() - start, 'prof'))
+            rotate(endpoint)
+    finally:
+        _cprofile_lock.release()
@@ -0,0 +1,56 @@
+"""
+Render QR kode akses ke PNG (dipakai generate_kode_akses & aksi admin).
+
+Sengaja tanpa import Django: fungsi di sini dijalankan di process pool
+(spawn), jadi proses anak cukup import modul ini + segno.
+
+segno opsional: pip install segno
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+try:
+    import segno
+except ImportError:
+    segno = None
+
+# Di bawah ini lebih cepat dirender langsung daripada menyalakan pool
+POOL_THRESHOLD = 200
+
+
+def qr_available():
+    return segno is not None
+
+
+def render_png(kode, scale=8):
+    buf = io.BytesIO()
+    # QR biasa, bukan Micro QR (tidak terbaca sebagian besar scanner HP)
+    segno.make_qr(kode, error='m').save(buf, kind='png', scale=scale, border=2)
+    return buf.getvalue()
+
+
+def _render_chunk(codes, scale):
+    return [(kode, render_png(kode, scale)) for kode in codes]
+
+
+def render_many(codes, scale=8, workers=None, chunk_size=250):
+    """
+    Yield (kode, png_bytes) untuk semua kode, urutan sama dengan input.
+    Daftar besar dibagi per chunk ke ProcessPoolExecutor (context spawn,
+    aman walau proses induk punya thread background).
+    """
+    if segno is None:
+        raise RuntimeError("Library QR belum terpasang: pip install segno")
+
+    codes = list(codes)
+    chunks = [codes[i:i + chunk_size] for i in range(0, len(codes), chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if len(codes) < POOL_THRESHOLD or workers <= 1:
+        yield from _render_chunk(codes, scale)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+        for rendered in pool.map(_render_chunk, chunks, [scale] * len(chunks)):
+            yield from rendered
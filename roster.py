@@ -0,0 +1,148 @@
+"""
+Indeks roster siswa (siswa.json) di memori.
+
+File siswa.json dibaca sekali saat startup lalu disimpan sebagai map
+nama-normal → data siswa, sehingga login yang namanya belum ada di DB
+cukup lookup dict tanpa membaca disk. File dibaca ulang hanya kalau
+mtime-nya berubah, dan mtime itu sendiri hanya dicek paling sering
+sekali per ROSTER_RELOAD_INTERVAL detik.
+"""
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+
+def normalize_nama(nama):
+    """Nama → bentuk pembanding: spasi dirapikan, huruf di-casefold"""
+    return " ".join(str(nama or "").split()).casefold()
+
+
+def parse_siswa(item):
+    """Satu entri siswa.json → field Peserta (nama, nis, kelas)"""
+    return {
+        "nama": str(item.get("Nama", "")).strip(),
+        "nis": str(item.get("Nis ", "")).strip(),
+        "kelas": str(item.get("Jurusan", "")).strip(),
+    }
+
+
+class RosterIndex:
+    """Snapshot siswa.json yang di-reload otomatis saat file berubah"""
+
+    def __init__(self, path, reload_interval=5.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._checked_at = None
+        self._mtime = None
+        # (exists, is_valid, error, records, by_nama) diganti sekaligus
+        # supaya thread pembaca tidak pernah melihat snapshot setengah jadi
+        self._snapshot = (False, False, None, (), {})
+
+    @property
+    def exists(self):
+        self.refresh()
+        return self._snapshot[0]
+
+    @property
+    def is_valid(self):
+        self.refresh()
+        return self._snapshot[1]
+
+    @property
+    def error(self):
+        self.refresh()
+        return self._snapshot[2]
+
+    def records(self):
+        """Semua entri mentah siswa.json (urutan file)"""
+        self.refresh()
+        return self._snapshot[3]
+
+    def get(self, nama):
+        """Cari siswa berdasarkan nama (case/spasi diabaikan), None kalau tidak ada"""
+        self.refresh()
+        return self._snapshot[4].get(normalize_nama(nama))
+
+    def __len__(self):
+        self.refresh()
+        return len(self._snapshot[4])
+
+    def refresh(self, force=False):
+        """Reload kalau mtime file berubah; stat dibatasi oleh reload_interval"""
+        now = time.monotonic()
+        if not force and self._is_fresh(now):
+            return
+
+        with self._lock:
+            if not force and self._is_fresh(now):
+                return
+            self._checked_at = now
+
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = None
+
+            if not force and mtime == self._mtime and self._mtime is not None:
+                return
+
+            self._mtime = mtime
+            self._snapshot = self._load(mtime is not None)
+
+    def _is_fresh(self, now):
+        return (
+            self._checked_at is not None
+            and now - self._checked_at < self.reload_interval
+        )
+
+    def _load(self, exists):
+        if not exists:
+            return (False, False, None, (), {})
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            # File sedang ditulis / rusak → pakai snapshot lama kalau ada
+            old = self._snapshot
+            return (True, old[1], str(e), old[3], old[4])
+
+        if not isinstance(data, list):
+            return (True, False, None, (), {})
+
+        by_nama = {}
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            siswa = parse_siswa(item)
+            key = normalize_nama(siswa["nama"])
+            if key:
+                # Nama dobel di file: entri pertama yang dipakai
+                by_nama.setdefault(key, siswa)
+
+        return (True, True, None, tuple(data), by_nama)
+
+
+_roster = None
+_roster_lock = threading.Lock()
+
+
+def get_roster():
+    """Indeks roster bersama (satu per proses)"""
+    global _roster
+    if _roster is None:
+        with _roster_lock:
+            if _roster is None:
+                _roster = RosterIndex(
+                    getattr(
+                        settings,
+                        "SISWA_JSON_PATH",
+                        os.path.join(settings.BASE_DIR, "ujian_core", "siswa.json"),
+                    ),
+                    reload_interval=getattr(settings, "ROSTER_RELOAD_INTERVAL", 5.0),
+                )
+    return _roster
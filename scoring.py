@@ -0,0 +1,202 @@
+"""
+Penilaian HasilUjian + analisis butir soal (NumPy).
+
+Semua jawaban satu ujian dimuat sekali ke matriks respons (peserta x soal)
+berisi kode pilihan: 0 = kunci, 1.. = pilihan lain, -1 = kosong. Dari
+matriks itu skor, jumlah benar, tingkat kesulitan, daya beda dan sebaran
+distraktor dihitung sekaligus dengan operasi array, bukan loop per peserta
+per soal. Satu-satunya loop Python adalah mengubah JSON jawaban jadi kode.
+
+Skor hanya ditulis ulang untuk hasil yang jawabannya (atau kuncinya)
+berubah sejak penilaian terakhir: HasilUjian.skor_digest menyimpan hash
+jawaban + kunci yang dipakai. Hasil yang digest-nya sama tidak dinilai lagi;
+matriks hanya dibangun untuk hasil yang berubah + hasil selesai (analisis).
+
+numpy opsional: pip install numpy
+"""
+import hashlib
+import json
+
+from django.db import connection, transaction
+
+from .export_hasil import soal_sort_key
+from .models import HasilUjian, KunciJawaban, AnalisisSoal
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Status yang dinilai; analisis butir soal hanya dari yang selesai
+STATUS_DINILAI = ('selesai', 'diskualifikasi')
+KOSONG = '-'
+
+
+def scoring_available():
+    return np is not None
+
+
+def normalize_jawaban(value):
+    """Jawaban / kunci → teks pembanding ("a " == "A"; pilihan ganda kompleks diurutkan)"""
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ','.join(sorted(normalize_jawaban(v) for v in value))
+    return str(value).strip().upper()
+
+
+def _digest(jawaban, kunci_digest):
+    raw = json.dumps(jawaban, sort_keys=True, ensure_ascii=False) + kunci_digest
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def load_kunci(ujian_id):
+    """(soal, kunci_normal, bobot, digest kunci)"""
+    rows = sorted(
+        KunciJawaban.objects.filter(ujian_id=ujian_id).values_list('soal', 'kunci', 'bobot'),
+        key=lambda row: soal_sort_key(row[0]),
+    )
+    soal = [row[0] for row in rows]
+    kunci = [normalize_jawaban(row[1]) for row in rows]
+    bobot = [float(row[2]) for row in rows]
+    digest = hashlib.sha1(json.dumps([soal, kunci, bobot]).encode('utf-8')).hexdigest()
+    return soal, kunci, bobot, digest
+
+
+def build_matrix(jawaban_list, soal, kunci):
+    """
+    Matriks respons int32 (len(jawaban_list) x len(soal)) + daftar pilihan
+    per soal (index = kode). Jawaban untuk soal di luar kunci diabaikan.
+    """
+    index = {s: j for j, s in enumerate(soal)}
+    pilihan = [{k: 0} for k in kunci]
+    matrix = np.full((len(jawaban_list), len(soal)), -1, dtype=np.int32)
+    for i, jawaban in enumerate(jawaban_list):
+        if not isinstance(jawaban, dict):
+            continue
+        for s, value in jawaban.items():
+            j = index.get(str(s))
+            if j is None:
+                continue
+            value = normalize_jawaban(value)
+            if value:
+                codes = pilihan[j]
+                matrix[i, j] = codes.setdefault(value, len(codes))
+    return matrix, [list(codes) for codes in pilihan]
+
+
+def score_matrix(matrix, bobot):
+    """(benar bool matrix, skor per peserta, jumlah benar per peserta)"""
+    benar = matrix == 0
+    return benar, benar @ np.asarray(bobot, dtype=np.float64), benar.sum(axis=1)
+
+
+def item_analysis(matrix, benar, bobot, pilihan):
+    """
+    Per soal: tingkat kesulitan (p), daya beda (korelasi item dengan skor
+    soal lain), dan jumlah peserta per pilihan. Return list dict sejajar soal.
+    """
+    n, m = matrix.shape
+    if n == 0:
+        return [{'tingkat_kesulitan': None, 'daya_beda': None, 'distraktor': {}} for _ in range(m)]
+
+    w = np.asarray(bobot, dtype=np.float64)
+    x = benar.astype(np.float64)
+    p = x.mean(axis=0)
+
+    # Skor sisa = total tanpa soal itu sendiri, supaya soal tidak berkorelasi dengan dirinya
+    rest = (x @ w)[:, None] - x * w
+    xc = x - p
+    rc = rest - rest.mean(axis=0)
+    denom = np.sqrt((xc * xc).sum(axis=0) * (rc * rc).sum(axis=0))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        daya_beda = np.where(denom > 0, (xc * rc).sum(axis=0) / denom, np.nan)
+
+    # Hitung semua pilihan semua soal dengan satu bincount (kolom 0 = kosong)
+    width = max(len(codes) for codes in pilihan) + 1 if pilihan else 1
+    flat = (matrix.astype(np.int64) + 1) + np.arange(m) * width
+    counts = np.bincount(flat.ravel(), minlength=m * width).reshape(m, width)
+
+    result = []
+    for j in range(m):
+        distraktor = {KOSONG: int(counts[j, 0])}
+        distraktor.update({label: int(counts[j, k + 1]) for k, label in enumerate(pilihan[j])})
+        result.append({
+            'tingkat_kesulitan': round(float(p[j]), 4),
+            'daya_beda': None if np.isnan(daya_beda[j]) else round(float(daya_beda[j]), 4),
+            'distraktor': distraktor,
+        })
+    return result
+
+
+def _write_skor(changed):
+    """
+    UPDATE skor per hasil dengan executemany. bulk_update() membangun
+    CASE WHEN per baris dan jauh lebih lambat dari perhitungannya sendiri
+    saat semua hasil dinilai ulang (kunci berubah). Tidak memicu signal /
+    feed monitor per baris.
+    """
+    if not changed:
+        return
+    table = connection.ops.quote_name(HasilUjian._meta.db_table)
+    skor, jumlah_benar, digest, pk = (
+        connection.ops.quote_name(HasilUjian._meta.get_field(name).column)
+        for name in ('skor', 'jumlah_benar', 'skor_digest', 'id')
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"UPDATE {table} SET {skor} = %s, {jumlah_benar} = %s, {digest} = %s WHERE {pk} = %s",
+            changed,
+        )
+
+
+def nilai_ujian(ujian_id):
+    """
+    Nilai semua hasil ujian yang sudah selesai / diskualifikasi dan simpan
+    analisis soal. Return dict ringkasan (dinilai, diperbarui, soal).
+    """
+    if np is None:
+        raise RuntimeError("numpy belum terpasang (pip install numpy)")
+
+    soal, kunci, bobot, kunci_digest = load_kunci(ujian_id)
+    if not soal:
+        raise ValueError("Kunci jawaban ujian ini belum diisi")
+
+    rows = list(
+        HasilUjian.objects
+        .filter(ujian_id=ujian_id, status__in=STATUS_DINILAI)
+        .order_by('id')
+        .values_list('id', 'status', 'jawaban', 'skor_digest')
+    )
+    digests = [_digest(row[2], kunci_digest) for row in rows]
+    berubah = [digest != row[3] for row, digest in zip(rows, digests)]
+
+    # Hasil diskualifikasi yang tidak berubah tidak perlu masuk matriks sama sekali
+    dipakai = [i for i, row in enumerate(rows) if berubah[i] or row[1] == 'selesai']
+    matrix, pilihan = build_matrix([rows[i][2] for i in dipakai], soal, kunci)
+    benar = matrix == 0
+
+    dinilai = np.fromiter((berubah[i] for i in dipakai), dtype=bool, count=len(dipakai))
+    _, skor, jumlah_benar = score_matrix(matrix[dinilai], bobot)
+    changed = [
+        (round(float(skor[k]), 4), int(jumlah_benar[k]), digests[i], rows[i][0])
+        for k, i in enumerate(i for i in dipakai if berubah[i])
+    ]
+
+    selesai = np.fromiter((rows[i][1] == 'selesai' for i in dipakai), dtype=bool, count=len(dipakai))
+    stats = item_analysis(matrix[selesai], benar[selesai], bobot, pilihan)
+
+    with transaction.atomic():
+        _write_skor(changed)
+        AnalisisSoal.objects.filter(ujian_id=ujian_id).exclude(soal__in=soal).delete()
+        AnalisisSoal.objects.bulk_create(
+            [
+                AnalisisSoal(ujian_id=ujian_id, soal=s, jumlah_peserta=int(selesai.sum()), **stat)
+                for s, stat in zip(soal, stats)
+            ],
+            update_conflicts=True,
+            unique_fields=['ujian', 'soal'],
+            update_fields=['jumlah_peserta', 'tingkat_kesulitan', 'daya_beda', 'distraktor', 'diperbarui'],
+        )
+
+    return {'dinilai': len(rows), 'diperbarui': len(changed), 'soal': len(soal)}
@@ -0,0 +1,155 @@
+"""
+Ingestion SecurityEvent ber-buffer.
+
+Saat ujian, PAGE_VIOLATION datang bergelombang; menulis satu INSERT per
+event (plus user agent panjang di tiap baris) membuat tabel cepat besar
+dan request ikut menunggu DB. record_security_event() hanya menampung
+event di memori; thread background menulisnya per batch dengan
+bulk_create, setelah user agent / fingerprint di-intern ke DeviceInfo
+dan ujian_id diisi dari session_lock (satu query per batch).
+
+Batch yang gagal ditulis (mis. DB terkunci) dikembalikan ke antrean,
+dibatasi SECURITY_EVENT_MAX_PENDING event (yang terlama dibuang).
+SECURITY_EVENT_BACKGROUND=False mematikan thread penulis: event hanya
+ditulis saat batch penuh atau flush() dipanggil (dipakai test).
+"""
+import atexit
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import DeviceInfo, SecurityEvent, SessionLock, clear_device_cache
+
+
+_pending = []
+_pending_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_flusher = None
+_flusher_pid = None
+
+
+def _batch_size():
+    return getattr(settings, 'SECURITY_EVENT_BATCH', 100)
+
+
+def record_security_event(event_type, description, ip_address, user_agent='', browser_fingerprint='',
+                          session_lock_id=None, ujian_id=None, remote_access_id=None, metadata=None):
+    """Antrikan satu SecurityEvent (ditulis paling lambat SECURITY_EVENT_FLUSH_INTERVAL detik lagi)"""
+    if getattr(settings, 'SECURITY_EVENT_BACKGROUND', True):
+        _ensure_flusher()
+    with _pending_lock:
+        _pending.append({
+            'event_type': event_type,
+            'description': description,
+            'ip_address': ip_address or '0.0.0.0',
+            'device': (user_agent or '', browser_fingerprint or ''),
+            'session_lock_id': session_lock_id,
+            'ujian_id': ujian_id,
+            'remote_access_id': remote_access_id,
+            'metadata': metadata or {},
+            'timestamp': timezone.now(),
+        })
+        full = len(_pending) >= _batch_size()
+    if full:
+        try:
+            flush()
+        except Exception as e:
+            # Batch sudah kembali ke antrean; request pelapor jangan ikut gagal
+            print("Error menulis security event (dicoba lagi nanti):", e)
+
+
+def pending_count():
+    with _pending_lock:
+        return len(_pending)
+
+
+def flush():
+    """Tulis semua event yang tertunda; return jumlah baris. Gagal → batch kembali ke antrean"""
+    with _flush_lock:
+        with _pending_lock:
+            events = _pending[:]
+            del _pending[:]
+        if not events:
+            return 0
+
+        try:
+            with transaction.atomic():
+                return _write(events)
+        except Exception:
+            # DeviceInfo yang baru di-intern ikut di-rollback, id-nya jangan dipakai dari cache
+            clear_device_cache()
+            _requeue(events)
+            raise
+
+
+def _requeue(events):
+    with _pending_lock:
+        _pending[:0] = events
+        dibuang = len(_pending) - getattr(settings, 'SECURITY_EVENT_MAX_PENDING', 10000)
+        if dibuang > 0:
+            del _pending[:dibuang]
+    if dibuang > 0:
+        print(f"Antrean security event penuh, {dibuang} event terlama dibuang")
+
+
+def _write(events):
+    devices = DeviceInfo.intern_many([e['device'] for e in events])
+
+    lock_ids = {e['session_lock_id'] for e in events if e['session_lock_id'] and not e['ujian_id']}
+    ujian_by_lock = dict(
+        SessionLock.objects
+        .filter(id__in=lock_ids)
+        .values_list('id', 'hasil_ujian__ujian_id')
+    ) if lock_ids else {}
+
+    rows = [
+        SecurityEvent(
+            session_lock_id=e['session_lock_id'],
+            remote_access_id=e['remote_access_id'],
+            ujian_id=e['ujian_id'] or ujian_by_lock.get(e['session_lock_id']),
+            event_type=e['event_type'],
+            description=e['description'],
+            ip_address=e['ip_address'],
+            device_id=devices[e['device']],
+            timestamp=e['timestamp'],
+            metadata=e['metadata'],
+        )
+        for e in events
+    ]
+    SecurityEvent.objects.bulk_create(rows, batch_size=_batch_size())
+    return len(rows)
+
+
+def _ensure_flusher():
+    global _flusher, _flusher_pid
+    if _flusher is not None and _flusher.is_alive() and _flusher_pid == os.getpid():
+        return
+    with _pending_lock:
+        if _flusher is not None and _flusher.is_alive() and _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+        _flusher = threading.Thread(target=_flush_forever, name="security-event-flush", daemon=True)
+        _flusher.start()
+
+
+def _flush_forever():
+    while True:
+        time.sleep(getattr(settings, 'SECURITY_EVENT_FLUSH_INTERVAL', 1.0))
+        try:
+            flush()
+        except Exception as e:
+            print("Error menulis security event (dicoba lagi nanti):", e)
+        finally:
+            connection.close()
+
+
+@atexit.register
+def _flush_all():
+    try:
+        flush()
+    except Exception as e:
+        print("Error menulis security event saat proses berhenti:", e)
@@ -10,11 +10,24 @@ class KodeAksesSerializer(serializers.Serializer):
     peserta_id = serializers.IntegerField()
 
 class JawabanSerializer(serializers.Serializer):
-    peserta_id = serializers.IntegerField()
-    ujian_id = serializers.IntegerField()
-    jawaban = serializers.JSONField()
+    hasil_ujian_id = serializers.IntegerField()
+    # Opsional: kalau jawaban sudah di-autosave, submit cukup ubah status
+    jawaban_data = serializers.JSONField(required=False)
+
+class AutosaveSerializer(serializers.Serializer):
+    session_token = serializers.CharField()
+    seq = serializers.IntegerField(min_value=0)
+    jawaban = serializers.DictField()
 
 class PelanggaranSerializer(serializers.Serializer):
-    peserta_id = serializers.IntegerField()
-    ujian_id = serializers.IntegerField()
-    jenis_pelanggaran = serializers.CharField()
\ No newline at end of file
+    # Sesi ditunjuk lewat hasil_ujian_id, atau pasangan peserta_id + ujian_id
+    hasil_ujian_id = serializers.IntegerField(required=False)
+    peserta_id = serializers.IntegerField(required=False)
+    ujian_id = serializers.IntegerField(required=False)
+    jenis_pelanggaran = serializers.CharField()
+    detail = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, data):
+        if 'hasil_ujian_id' not in data and not ('peserta_id' in data and 'ujian_id' in data):
+            raise serializers.ValidationError("Isi hasil_ujian_id atau peserta_id + ujian_id")
+        return data
\ No newline at end of file
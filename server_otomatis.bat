@@ -10,5 +10,15 @@ echo UNTUK PC: http://localhost:8000
 echo UNTUK HP: http://putrialmafebriyanti:8000
 echo.
 echo ===============================
+
+REM Profil database (lihat settings.py):
+REM   default  : SQLite mode WAL (cukup untuk 1-2 lab)
+REM   sekolah  : set DB_ENGINE=postgres lalu isi DB_NAME/DB_USER/DB_PASSWORD/DB_HOST
+REM Aset statis (hash + gzip/brotli, cache browser 1 tahun): python manage.py build_static
+REM Uji beban dulu: python loadtest.py --pin PIN --kode-file kode.txt
+REM Mode ASGI (alert/feed monitor async): uvicorn ujian_platform.asgi:application --host 0.0.0.0 --port 8000
+if "%DB_ENGINE%"=="" set DB_ENGINE=sqlite
+echo DATABASE: %DB_ENGINE%
+echo.
 python manage.py runserver 0.0.0.0:8000
 pause
\ No newline at end of file
@@ -71,17 +71,64 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'ujian_platform.wsgi.application'
+ASGI_APPLICATION = 'ujian_platform.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Profil database dipilih lewat environment DB_ENGINE:
+#   sqlite   (default) → 1 file, cocok untuk 1 lab / beberapa kelas sekaligus.
+#                        WAL: pembaca tidak menunggu penulis; transaksi IMMEDIATE
+#                        supaya tidak ada "database is locked" saat upgrade lock.
+#   postgres           → ujian satu sekolah serentak (banyak penulis paralel).
+# Ukur mana yang cukup dengan loadtest.py (login → kode akses → submit).
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite").lower()
+
+if DB_ENGINE in ("postgres", "postgresql"):
+    DB_POOL = os.getenv("DB_POOL") == "True"
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("DB_NAME", "ujian_platform"),
+            'USER': os.getenv("DB_USER", "ujian"),
+            'PASSWORD': os.getenv("DB_PASSWORD", ""),
+            'HOST': os.getenv("DB_HOST", "127.0.0.1"),
+            'PORT': os.getenv("DB_PORT", "5432"),
+            # Koneksi persisten + dicek dulu sebelum dipakai ulang.
+            # Dengan DB_POOL=True (butuh psycopg[pool]) pakai pool bawaan
+            # Django; pool tidak boleh digabung dengan CONN_MAX_AGE.
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv("DB_POOL_MIN", "2")),
+                    'max_size': int(os.getenv("DB_POOL_MAX", "20")),
+                    'timeout': 10,
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("DB_NAME", BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Detik menunggu lock sebelum "database is locked"
+                'timeout': int(os.getenv("SQLITE_TIMEOUT", "20")),
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    f'PRAGMA busy_timeout={int(os.getenv("SQLITE_TIMEOUT", "20")) * 1000};'
+                    'PRAGMA mmap_size=134217728;'
+                    'PRAGMA cache_size=-20000;'
+                    'PRAGMA temp_store=MEMORY;'
+                ),
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -119,6 +166,17 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+# Hasil `manage.py build_static` (collectstatic + optimasi + gz/br), dilayani static_serve.py
+STATIC_ROOT = Path(os.getenv("STATIC_ROOT", str(BASE_DIR / "staticfiles")))
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "ujian_core.static_pipeline.OptimizedManifestStaticFilesStorage",
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -138,3 +196,88 @@ REST_FRAMEWORK = {
 }
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+
+
+# Roster siswa.json di memori: mtime file dicek paling sering tiap N detik
+ROSTER_RELOAD_INTERVAL = float(os.getenv("ROSTER_RELOAD_INTERVAL", "5"))
+
+# Log event JSON-lines (alerts.log, violations_fallback.log): ditulis tiap N baris / tiap N detik,
+# dirotasi kalau lewat N byte atau ganti hari; N backup terakhir disimpan (di-gzip kalau COMPRESS)
+EVENT_LOG_MAX_BUFFER = int(os.getenv("EVENT_LOG_MAX_BUFFER", "200"))
+EVENT_LOG_FLUSH_INTERVAL = float(os.getenv("EVENT_LOG_FLUSH_INTERVAL", "1"))
+EVENT_LOG_MAX_BYTES = int(os.getenv("EVENT_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+EVENT_LOG_BACKUP_COUNT = int(os.getenv("EVENT_LOG_BACKUP_COUNT", "10"))
+EVENT_LOG_COMPRESS = os.getenv("EVENT_LOG_COMPRESS", "True") == "True"
+
+# Cache PIN → ujian aktif untuk login (detik); di-reset juga saat Ujian disimpan
+UJIAN_PIN_CACHE_TTL = int(os.getenv("UJIAN_PIN_CACHE_TTL", "30"))
+
+# Sweeper sesi ujian yang waktunya habis (detik, 0 = mati; pakai manage.py expire_sesi_ujian)
+EXAM_EXPIRY_SWEEP_INTERVAL = int(os.getenv("EXAM_EXPIRY_SWEEP_INTERVAL", "30"))
+# Toleransi (detik) setelah deadline untuk submit / autosave yang masih di jalan; harus > AUTOSAVE_INTERVAL
+EXAM_SUBMIT_GRACE = int(os.getenv("EXAM_SUBMIT_GRACE", "30"))
+
+# Autosave jawaban: tiap sesi ditulis ke DB paling sering sekali per N detik
+AUTOSAVE_INTERVAL = int(os.getenv("AUTOSAVE_INTERVAL", "10"))
+# False = tanpa thread penulis (patch hanya ditulis lewat submit / flush_due(); dipakai test)
+AUTOSAVE_BACKGROUND = os.getenv("AUTOSAVE_BACKGROUND", "True") == "True"
+
+# Feed monitor admin: jumlah event yang disimpan untuk resume, lama 1 stream SSE (detik)
+MONITOR_FEED_BUFFER = int(os.getenv("MONITOR_FEED_BUFFER", "1000"))
+MONITOR_FEED_STREAM_SECONDS = int(os.getenv("MONITOR_FEED_STREAM_SECONDS", "300"))
+
+# Mode ASGI: jumlah thread untuk kerja ORM/file dari view async
+ASYNC_ORM_THREADS = int(os.getenv("ASYNC_ORM_THREADS", "8"))
+
+# Audit trail remote access: hash chain ditandatangani tiap N entri
+AUDIT_SIGN_BATCH = int(os.getenv("AUDIT_SIGN_BATCH", "20"))
+
+# SecurityEvent ditulis per batch (bulk_create) tiap N detik / tiap N event
+SECURITY_EVENT_FLUSH_INTERVAL = float(os.getenv("SECURITY_EVENT_FLUSH_INTERVAL", "1"))
+SECURITY_EVENT_BATCH = int(os.getenv("SECURITY_EVENT_BATCH", "100"))
+# Batas antrean kalau DB gagal ditulis; False = tanpa thread penulis (flush() manual, dipakai test)
+SECURITY_EVENT_MAX_PENDING = int(os.getenv("SECURITY_EVENT_MAX_PENDING", "10000"))
+SECURITY_EVENT_BACKGROUND = os.getenv("SECURITY_EVENT_BACKGROUND", "True") == "True"
+
+# Pelanggaran: diskualifikasi otomatis setelah N kali (0 = mati); laporan ganda < N detik diabaikan
+PELANGGARAN_MAKS = int(os.getenv("PELANGGARAN_MAKS", "3"))
+PELANGGARAN_DEBOUNCE = float(os.getenv("PELANGGARAN_DEBOUNCE", "2"))
+
+# Benchmark (loadtest.py): header X-DB-* jumlah query / error lock per request
+BENCHMARK_HEADERS = os.getenv("BENCHMARK_HEADERS") == "True"
+if BENCHMARK_HEADERS:
+    MIDDLEWARE = ['ujian_core.middleware.QueryCountMiddleware'] + MIDDLEWARE
+
+# Metrik per endpoint (/api/metrics/): snapshot tiap worker ditulis ke METRICS_DIR tiap N detik
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
+METRICS_DIR = os.getenv("METRICS_DIR", str(BASE_DIR / "metrics"))
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+METRICS_STALE_SECONDS = int(os.getenv("METRICS_STALE_SECONDS", "300"))
+# Bearer token untuk scraper Prometheus (kosong = hanya admin yang login)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+if METRICS_ENABLED:
+    MIDDLEWARE = ['ujian_core.middleware.MetricsMiddleware'] + MIDDLEWARE
+
+# Profiling opt-in (profiling.py): PROFILE_HOOK=True memasang middleware-nya (tanpa itu biaya nol).
+# Endpoint = nama URL dipisah koma (kosong = semua); rate 0 = mati kecuali di-toggle lewat /api/profiling/
+PROFILE_HOOK = os.getenv("PROFILE_HOOK") == "True"
+PROFILE_ENDPOINTS = os.getenv("PROFILE_ENDPOINTS", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MODE = os.getenv("PROFILE_MODE", "cprofile")
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.001"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", str(BASE_DIR / "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+if PROFILE_HOOK:
+    MIDDLEWARE = MIDDLEWARE + ['ujian_core.middleware.ProfilingMiddleware']
+
+# Aset statis (static_pipeline.py): gambar > N byte dikecilkan, audio > N byte di-encode ulang (ffmpeg).
+# File tanpa hash di nama (mis. URL hardcode di JS) di-cache STATIC_MAX_AGE detik + revalidasi ETag
+STATIC_IMAGE_MAX_BYTES = int(os.getenv("STATIC_IMAGE_MAX_BYTES", str(150 * 1024)))
+STATIC_IMAGE_MAX_WIDTH = int(os.getenv("STATIC_IMAGE_MAX_WIDTH", "1920"))
+STATIC_AUDIO_BITRATE = os.getenv("STATIC_AUDIO_BITRATE", "64k")
+STATIC_AUDIO_MAX_BYTES = int(os.getenv("STATIC_AUDIO_MAX_BYTES", str(120 * 1024)))
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "3600"))
+
+# Halaman peserta (login/menu/exam/...) di-render sekali per versi template + manifest static, dicek tiap N detik
+PAGE_CACHE_ENABLED = os.getenv("PAGE_CACHE_ENABLED", "True") == "True"
+PAGE_CACHE_RELOAD_INTERVAL = float(os.getenv("PAGE_CACHE_RELOAD_INTERVAL", "2"))
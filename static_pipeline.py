@@ -0,0 +1,162 @@
+"""
+Build aset statis: `manage.py build_static` (atau collectstatic biasa).
+
+Storage OptimizedManifestStaticFilesStorage (STORAGES["staticfiles"]):
+  1. gambar & audio salinan di STATIC_ROOT dikecilkan ke batas ukuran
+     (STATIC_IMAGE_MAX_BYTES / STATIC_AUDIO_BITRATE); file sumber di repo
+     tidak diubah.
+  2. nama file diberi hash isi (ManifestStaticFilesStorage bawaan Django),
+     jadi bisa di-cache browser selamanya (lihat static_serve.py).
+  3. file teks (css/js/svg/...) dibuatkan varian .gz dan .br.
+
+Pillow (gambar), brotli (.br) dan ffmpeg (audio) opsional; yang tidak ada
+dilewati dengan peringatan:
+    pip install Pillow brotli
+"""
+import gzip
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.mjs', '.svg', '.json', '.txt', '.html', '.map', '.xml', '.ico')
+IMAGE_TYPES = ('.jpg', '.jpeg', '.png')
+AUDIO_TYPES = ('.mp3',)
+# Varian terkompresi hanya disimpan kalau minimal 5% lebih kecil
+MIN_SAVING = 0.95
+
+
+def _replace_if_smaller(path, data):
+    """Tulis data ke path kalau lebih kecil dari file sekarang; return ukuran akhir"""
+    if len(data) < os.path.getsize(path):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return os.path.getsize(path)
+
+
+def optimize_image(path, max_bytes, max_width):
+    """Perkecil JPEG/PNG yang melewati max_bytes (resize + kualitas turun bertahap)"""
+    if Image is None or os.path.getsize(path) <= max_bytes:
+        return None
+    with Image.open(path) as img:
+        img.load()
+    if img.width > max_width:
+        img.thumbnail((max_width, max_width * img.height // img.width))
+
+    if path.lower().endswith('.png'):
+        buf = io.BytesIO()
+        img.save(buf, format='PNG', optimize=True)
+        return _replace_if_smaller(path, buf.getvalue())
+
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    data = None
+    for quality in range(85, 40, -5):
+        buf = io.BytesIO()
+        img.save(buf, format='JPEG', quality=quality, optimize=True, progressive=True)
+        data = buf.getvalue()
+        if len(data) <= max_bytes:
+            break
+    return _replace_if_smaller(path, data)
+
+
+def optimize_audio(path, bitrate, max_bytes):
+    """Encode ulang MP3 ke mono `bitrate` lewat ffmpeg kalau melewati max_bytes"""
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None or os.path.getsize(path) <= max_bytes:
+        return None
+    fd, tmp = tempfile.mkstemp(suffix='.mp3')
+    os.close(fd)
+    try:
+        subprocess.run(
+            [ffmpeg, '-y', '-loglevel', 'error', '-i', path, '-ac', '1', '-b:a', bitrate, '-map_metadata', '-1', tmp],
+            check=True,
+        )
+        with open(tmp, 'rb') as f:
+            return _replace_if_smaller(path, f.read())
+    finally:
+        os.remove(tmp)
+
+
+def compress_file(path):
+    """Buat path.gz (dan path.br kalau brotli ada); return daftar varian yang ditulis"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    written = []
+    # mtime=0 supaya hasil build bisa diulang byte-per-byte
+    variants = [('.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', lambda raw: brotli.compress(raw, quality=11)))
+    for ext, compress in variants:
+        if os.path.exists(path + ext) and os.path.getmtime(path + ext) >= os.path.getmtime(path):
+            written.append(path + ext)
+            continue
+        packed = compress(data)
+        if len(packed) < len(data) * MIN_SAVING:
+            with open(path + ext, 'wb') as f:
+                f.write(packed)
+            written.append(path + ext)
+        elif os.path.exists(path + ext):
+            os.remove(path + ext)
+    return written
+
+
+class OptimizedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest + hash nama file, dengan optimasi gambar/audio dan varian gz/br"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            self.optimized = {}
+            for name, (storage, source) in paths.items():
+                # Salinan yang ukurannya sudah beda dari sumber = sudah dioptimasi build sebelumnya
+                if os.path.getsize(self.path(name)) == storage.size(source):
+                    self._optimize(name)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if not dry_run:
+            self.compressed = []
+            for root, _, files in os.walk(self.location):
+                for filename in files:
+                    if filename.lower().endswith(COMPRESSIBLE):
+                        self.compressed.extend(compress_file(os.path.join(root, filename)))
+
+    def _optimize(self, name):
+        path = self.path(name)
+        before = os.path.getsize(path)
+        lower = name.lower()
+        if lower.endswith(IMAGE_TYPES):
+            after = optimize_image(
+                path,
+                getattr(settings, 'STATIC_IMAGE_MAX_BYTES', 150 * 1024),
+                getattr(settings, 'STATIC_IMAGE_MAX_WIDTH', 1920),
+            )
+        elif lower.endswith(AUDIO_TYPES):
+            after = optimize_audio(
+                path,
+                getattr(settings, 'STATIC_AUDIO_BITRATE', '64k'),
+                getattr(settings, 'STATIC_AUDIO_MAX_BYTES', 120 * 1024),
+            )
+        else:
+            return
+        if after is not None and after < before:
+            self.optimized[name] = (before, after)
+
+    def stored_name(self, name):
+        # Belum build_static (STATIC_ROOT kosong): pakai nama asli, jangan error 500
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
@@ -0,0 +1,291 @@
+"""
+Layani STATIC_ROOT langsung di level WSGI/ASGI, sebelum Django.
+
+Request ke STATIC_URL tidak melewati middleware, URL resolver, maupun
+view; isi folder di-index sekali ke memori (di-index ulang kalau
+staticfiles.json berubah). Fitur:
+  - nama ber-hash (ada di manifest build_static) → Cache-Control immutable
+    1 tahun; file lain max-age STATIC_MAX_AGE + revalidasi ETag
+  - varian .br / .gz dipilih dari Accept-Encoding
+  - ETag / Last-Modified → 304, Range / If-Range → 206 (audio bisa di-seek)
+File yang tidak ada di STATIC_ROOT diteruskan ke aplikasi Django seperti
+biasa (runserver DEBUG tetap bisa melayani dari folder app).
+"""
+import asyncio
+import json
+import mimetypes
+import os
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import unquote
+
+from django.conf import settings
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+CHUNK_SIZE = 64 * 1024
+# Index dicek ulang (mtime manifest) paling sering tiap N detik
+RELOAD_INTERVAL = 2.0
+
+
+class StaticFiles:
+    """Index file STATIC_ROOT + logika header (dipakai adapter WSGI & ASGI)"""
+
+    def __init__(self, root, prefix, max_age=3600):
+        self.root = str(root)
+        self.prefix = '/' + prefix.strip('/') + '/'
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._files = None
+        self._manifest_mtime = None
+        self._checked = 0.0
+
+    def _manifest_path(self):
+        return os.path.join(self.root, 'staticfiles.json')
+
+    def _index(self):
+        now = time.monotonic()
+        if self._files is not None and now - self._checked < RELOAD_INTERVAL:
+            return self._files
+        with self._lock:
+            self._checked = now
+            try:
+                mtime = os.path.getmtime(self._manifest_path())
+            except OSError:
+                mtime = None
+            if self._files is None or mtime != self._manifest_mtime:
+                self._manifest_mtime = mtime
+                self._files = self._scan()
+            return self._files
+
+    def _scan(self):
+        hashed = set()
+        try:
+            with open(self._manifest_path(), encoding='utf-8') as f:
+                hashed = set(json.load(f).get('paths', {}).values())
+        except (OSError, ValueError):
+            pass
+
+        files = {}
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(('.gz', '.br')) or name == 'staticfiles.json':
+                    continue
+                path = os.path.join(directory, name)
+                rel = os.path.relpath(path, self.root).replace(os.sep, '/')
+                entry = self._stat(path)
+                entry['immutable'] = rel in hashed
+                entry['content_type'] = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                entry['variants'] = {}
+                for encoding, ext in ENCODINGS:
+                    if os.path.exists(path + ext):
+                        variant = self._stat(path + ext)
+                        variant['etag'] = f'"{entry["etag"][1:-1]}-{encoding}"'
+                        entry['variants'][encoding] = variant
+                files[rel] = entry
+        return files
+
+    @staticmethod
+    def _stat(path):
+        st = os.stat(path)
+        return {
+            'path': path,
+            'size': st.st_size,
+            'mtime': st.st_mtime,
+            'etag': f'"{int(st.st_mtime):x}-{st.st_size:x}"',
+        }
+
+    def lookup(self, url_path):
+        if not url_path.startswith(self.prefix):
+            return None
+        return self._index().get(unquote(url_path[len(self.prefix):]))
+
+    def respond(self, url_path, method, headers):
+        """
+        None (teruskan ke Django) atau (status, [(header, nilai)], path, start, length).
+        headers: dict nama header huruf kecil → nilai.
+        """
+        if method not in ('GET', 'HEAD'):
+            return None
+        entry = self.lookup(url_path)
+        if entry is None:
+            return None
+
+        range_header = headers.get('range')
+        if range_header and headers.get('if-range') not in (None, entry['etag']):
+            range_header = None
+
+        # Range selalu dilayani dari file asli (offset byte tidak cocok dengan varian terkompresi)
+        chosen, encoding = entry, None
+        if not range_header:
+            accept = accepted_encodings(headers.get('accept-encoding', ''))
+            for name, _ in ENCODINGS:
+                if name in entry['variants'] and name in accept:
+                    chosen, encoding = entry['variants'][name], name
+                    break
+
+        response_headers = [
+            ('Content-Type', entry['content_type']),
+            ('Cache-Control', IMMUTABLE if entry['immutable'] else f'public, max-age={self.max_age}'),
+            ('ETag', chosen['etag']),
+            ('Last-Modified', formatdate(entry['mtime'], usegmt=True)),
+            ('Accept-Ranges', 'bytes'),
+        ]
+        if entry['variants']:
+            response_headers.append(('Vary', 'Accept-Encoding'))
+
+        if self._not_modified(headers, chosen, entry):
+            return '304 Not Modified', response_headers, None, 0, 0
+
+        if encoding:
+            response_headers.append(('Content-Encoding', encoding))
+
+        size = chosen['size']
+        if range_header:
+            byte_range = parse_range(range_header, size)
+            if byte_range is None:
+                response_headers.append(('Content-Range', f'bytes */{size}'))
+                response_headers.append(('Content-Length', '0'))
+                return '416 Range Not Satisfiable', response_headers, None, 0, 0
+            start, end = byte_range
+            response_headers.append(('Content-Range', f'bytes {start}-{end}/{size}'))
+            response_headers.append(('Content-Length', str(end - start + 1)))
+            return '206 Partial Content', response_headers, chosen['path'], start, end - start + 1
+
+        response_headers.append(('Content-Length', str(size)))
+        return '200 OK', response_headers, chosen['path'], 0, size
+
+    @staticmethod
+    def _not_modified(headers, chosen, entry):
+        if_none_match = headers.get('if-none-match')
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            return '*' in tags or chosen['etag'] in tags
+        if_modified_since = headers.get('if-modified-since')
+        if if_modified_since:
+            try:
+                return int(entry['mtime']) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+def accepted_encodings(header):
+    """'gzip, br;q=0' → {'gzip'} (encoding dengan q=0 dianggap ditolak)"""
+    result = set()
+    for part in header.split(','):
+        name, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        if params.startswith('q=0') and not params.strip('q=0.'):
+            continue
+        result.add(name.strip().lower())
+    return result
+
+
+def parse_range(header, size):
+    """'bytes=a-b' (satu range saja) → (start, end) inklusif, atau None kalau tidak valid"""
+    unit, _, spec = header.partition('=')
+    if unit.strip() != 'bytes' or ',' in spec or size == 0:
+        return None
+    start, _, end = spec.strip().partition('-')
+    try:
+        if not start:
+            length = int(end)
+            if length <= 0:
+                return None
+            return max(0, size - length), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def default_static_files():
+    return StaticFiles(
+        settings.STATIC_ROOT,
+        settings.STATIC_URL,
+        max_age=getattr(settings, 'STATIC_MAX_AGE', 3600),
+    )
+
+
+class StaticWSGIMiddleware:
+    """Bungkus aplikasi WSGI (wsgi.py)"""
+
+    def __init__(self, application, files=None):
+        self.application = application
+        self.files = files or default_static_files()
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not path.startswith(self.files.prefix):
+            return self.application(environ, start_response)
+
+        headers = {
+            key[5:].replace('_', '-').lower(): value
+            for key, value in environ.items() if key.startswith('HTTP_')
+        }
+        result = self.files.respond(path, environ.get('REQUEST_METHOD', 'GET'), headers)
+        if result is None:
+            return self.application(environ, start_response)
+
+        status, response_headers, file_path, start, length = result
+        start_response(status, response_headers)
+        if file_path is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return []
+        # file_wrapper (sendfile) selalu mengirim file utuh: hanya untuk respons 200
+        if status.startswith('200') and 'wsgi.file_wrapper' in environ:
+            return environ['wsgi.file_wrapper'](open(file_path, 'rb'), CHUNK_SIZE)
+        return _read_range(file_path, start, length)
+
+
+class StaticASGIMiddleware:
+    """Bungkus aplikasi ASGI (asgi.py); baca file di thread supaya event loop tidak tertahan"""
+
+    def __init__(self, application, files=None):
+        self.application = application
+        self.files = files or default_static_files()
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get('path', '')
+        if scope['type'] != 'http' or not path.startswith(self.files.prefix):
+            return await self.application(scope, receive, send)
+
+        headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope['headers']}
+        result = self.files.respond(path, scope['method'], headers)
+        if result is None:
+            return await self.application(scope, receive, send)
+
+        status, response_headers, file_path, start, length = result
+        await send({
+            'type': 'http.response.start',
+            'status': int(status.split()[0]),
+            'headers': [(key.lower().encode('latin-1'), value.encode('latin-1')) for key, value in response_headers],
+        })
+        if file_path is None or scope['method'] == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        chunks = _read_range(file_path, start, length)
+        sentinel = object()
+        chunk = await asyncio.to_thread(next, chunks, sentinel)
+        while chunk is not sentinel:
+            following = await asyncio.to_thread(next, chunks, sentinel)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': following is not sentinel})
+            chunk = following
+        if length == 0:
+            await send({'type': 'http.response.body', 'body': b''})
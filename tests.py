@@ -1,3 +1,1601 @@
-from django.test import TestCase
+import asyncio
+import csv
+import glob
+import gzip
+import importlib
+import io
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
+from wsgiref.util import FileWrapper
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, OperationalError, connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import AsyncClient, Client, RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext, modify_settings, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Ujian, Peserta, KodeAkses, HasilUjian, SessionLock, RemoteAccess, AuditEntry, DeviceInfo, SecurityEvent
+from .models import KunciJawaban, AnalisisSoal
+from .models import clear_pelanggaran_debounce, clear_device_cache, clear_ujian_pin_cache
+from . import security_events
+from . import autosave
+from .exam_clock import clear_session_cache, expire_overdue_sessions
+from .eventlog import EventLog
+from .export_hasil import iter_csv, iter_jsonl
+from .importer import bulk_import_peserta
+from .kode_akses import generate_kode_akses
+from .monitor_feed import MonitorBus, bus as monitor_bus
+from . import scoring
+from . import metrics
+from . import profiling
+from . import views
+from .page_cache import PageCache, get_page_cache
+from .roster import RosterIndex, parse_siswa
+from .static_pipeline import compress_file
+from .static_serve import StaticFiles, StaticWSGIMiddleware
+from .utils import AlertDispatcher, TELEGRAM_MAX_LENGTH, truncate_html
+
+
+_metrics_tmp = tempfile.TemporaryDirectory()
+_metrics_override = override_settings(METRICS_DIR=_metrics_tmp.name)
+
+
+def setUpModule():
+    # MetricsMiddleware aktif di semua test; snapshot-nya jangan ditulis ke BASE_DIR/metrics
+    _metrics_override.enable()
+
+
+def tearDownModule():
+    metrics.reset()
+    _metrics_override.disable()
+    _metrics_tmp.cleanup()
+
+
+@skipUnless(connection.vendor == 'sqlite', 'profil SQLite')
+class SqliteProfileTest(TestCase):
+    """Profil SQLite dari settings (WAL + BEGIN IMMEDIATE) benar-benar terpasang di koneksi file"""
+
+    def setUp(self):
+        # DB test in-memory selalu journal_mode=memory: cek pakai file sungguhan dengan OPTIONS yang sama
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'db.sqlite3')
+        default = connections['default']
+        self.db = type(default)(dict(default.settings_dict, NAME=self.path), alias='sqlite_profile')
+        self.addCleanup(self.db.close)
+
+    def pragma(self, name):
+        with self.db.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragma_wal(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), self.db.settings_dict['OPTIONS']['timeout'] * 1000)
+        self.assertEqual(self.pragma('temp_store'), 2)  # MEMORY
+
+    def test_transaksi_immediate(self):
+        with self.db.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (x INTEGER)')
+        self.assertEqual(self.db.transaction_mode, 'IMMEDIATE')
+
+        self.db.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        self.addCleanup(self.db.rollback)
+        lain = sqlite3.connect(self.path, timeout=0)
+        self.addCleanup(lain.close)
+        # Lock tulis sudah dipegang sejak BEGIN (belum ada write), pembaca tetap jalan (WAL)
+        self.assertEqual(lain.execute('SELECT COUNT(*) FROM t').fetchone()[0], 0)
+        with self.assertRaisesRegex(sqlite3.OperationalError, 'locked'):
+            lain.execute('BEGIN IMMEDIATE')
+
+
+class AdminChangelistQueryTest(TestCase):
+    """Jumlah query changelist admin tidak boleh ikut naik dengan jumlah baris"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'rahasia')
+        self.client.force_login(self.admin)
+        self.jumlah = 0
+
+    def tambah_data(self, n):
+        for _ in range(n):
+            i = self.jumlah
+            self.jumlah += 1
+            ujian = Ujian.objects.create(
+                nama_ujian=f'Ujian {i}',
+                pin_ujian=f'P{i}',
+                url_soal='https://example.com/soal',
+                waktu_mulai=timezone.now() + timedelta(days=1),
+                durasi=90,
+            )
+            peserta = Peserta.objects.create(nis=str(i), nama=f'Siswa {i}', kelas='X')
+            KodeAkses.objects.create(kode=f'KODE{i}', ujian=ujian)
+            HasilUjian.objects.create(peserta=peserta, ujian=ujian)
+
+    def hitung_query(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def assertQueryKonstan(self, model_name):
+        url = reverse(f'admin:ujian_core_{model_name}_changelist')
+        self.tambah_data(2)
+        sedikit = self.hitung_query(url)
+        self.tambah_data(20)
+        banyak = self.hitung_query(url)
+        self.assertEqual(sedikit, banyak, f'{model_name}: {sedikit} vs {banyak} query')
+
+    def test_peserta_changelist(self):
+        self.assertQueryKonstan('peserta')
+
+    def test_ujian_changelist(self):
+        self.assertQueryKonstan('ujian')
+
+    def test_kodeakses_changelist(self):
+        self.assertQueryKonstan('kodeakses')
+
+    def test_hasilujian_changelist(self):
+        self.assertQueryKonstan('hasilujian')
+
+    def test_kolom_count_bisa_diurutkan(self):
+        self.tambah_data(3)
+        url = reverse('admin:ujian_core_peserta_changelist')
+        self.assertEqual(self.client.get(url, {'o': '4'}).status_code, 200)
+        url = reverse('admin:ujian_core_ujian_changelist')
+        self.assertEqual(self.client.get(url, {'o': '6'}).status_code, 200)
+
+
+class UjianPinCacheTest(TestCase):
+    """Toggle aktif di admin langsung berlaku untuk login berikutnya (cache dibuang setelah commit)"""
+
+    def setUp(self):
+        clear_ujian_pin_cache()
+        self.addCleanup(clear_ujian_pin_cache)
+        self.ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='777', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60, aktif=True,
+        )
+        Peserta.objects.create(nama='Budi', kelas='X')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'rahasia'))
+
+    def login(self):
+        return self.client.post('/api/login/', {'nama': 'Budi', 'pin_ujian': '777'}, content_type='application/json')
+
+    def test_toggle_aktif_di_admin(self):
+        self.assertEqual(self.login().status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post(reverse('admin:ujian_core_ujian_changelist'), {
+                'form-TOTAL_FORMS': '1',
+                'form-INITIAL_FORMS': '1',
+                'form-0-id': str(self.ujian.id),
+                '_save': 'Save',
+            })
+        self.assertTrue(callbacks)
+        self.ujian.refresh_from_db()
+        self.assertFalse(self.ujian.aktif)
+        self.assertEqual(self.login().status_code, 400)
+
+    def test_cache_dibuang_setelah_commit(self):
+        self.assertEqual(self.login().status_code, 200)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.ujian.aktif = False
+            self.ujian.save()
+            # Belum commit: cache belum dibuang (login lain belum boleh melihat perubahan)
+            self.assertEqual(self.login().status_code, 200)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.login().status_code, 400)
+
+
+class PesertaNamaTest(TestCase):
+    """Lookup nama lewat nama_normal: case/spasi diabaikan, selalu sinkron dengan nama"""
+
+    def test_cari_nama_abaikan_case_dan_spasi(self):
+        ani = Peserta.objects.create(nama='Ani  Lestari', kelas='X')
+        Peserta.objects.create(nama='Budi', kelas='X')
+        self.assertEqual(ani.nama_normal, 'ani lestari')
+
+        for nama in ['ani lestari', '  ANI\tLestari ', 'aNi   LESTARI']:
+            self.assertEqual(list(Peserta.cari_nama(nama)), [ani], nama)
+        self.assertFalse(Peserta.cari_nama('Ani').exists())
+        # Lookup kolom biasa (bisa pakai index), bukan UPPER() / LIKE
+        sql = str(Peserta.cari_nama('Ani').query).upper()
+        self.assertNotIn('UPPER(', sql)
+        self.assertNotIn('LIKE', sql)
+
+    def test_save_sinkronkan_nama_normal(self):
+        peserta = Peserta.objects.create(nama='Ani', kelas='X')
+        peserta.nama = 'Ani  Rahma'
+        peserta.save()
+        self.assertEqual(Peserta.objects.get(id=peserta.id).nama_normal, 'ani rahma')
+
+        peserta.nama = 'CITRA'
+        peserta.save(update_fields=['nama'])
+        self.assertEqual(Peserta.objects.get(id=peserta.id).nama_normal, 'citra')
+        self.assertEqual(list(Peserta.cari_nama('citra')), [peserta])
+        self.assertFalse(Peserta.cari_nama('Ani Rahma').exists())
+
+    def test_nama_sama_beda_case_di_kelas_sama_ditolak(self):
+        Peserta.objects.create(nama='Ani', kelas='X')
+        Peserta.objects.create(nama='ANI', kelas='XI')
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Peserta.objects.create(nama=' ani ', kelas='X')
+        self.assertEqual(Peserta.cari_nama('ani').count(), 2)
+
+
+class ListPesertaTest(TestCase):
+    """list_peserta: halaman keyset tanpa dobel / bolong, satu query berapa pun jumlah baris"""
+
+    def setUp(self):
+        self.ujian = [
+            Ujian.objects.create(
+                nama_ujian=f'Ujian {i}', pin_ujian=str(i), url_soal='https://example.com/soal',
+                waktu_mulai=timezone.now(), durasi=60,
+            )
+            for i in range(2)
+        ]
+        self.jumlah = 0
+        self.tambah(25)
+
+    def tambah(self, n):
+        for _ in range(n):
+            i = self.jumlah
+            self.jumlah += 1
+            peserta = Peserta.objects.create(nama=f'Siswa {i}', nis=str(i) if i % 2 else '', kelas='X')
+            for ujian in self.ujian[:i % 3]:
+                HasilUjian.objects.create(peserta=peserta, ujian=ujian)
+
+    def get(self, **params):
+        response = self.client.get(reverse('list_peserta'), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_halaman_keyset_berurutan(self):
+        ids, cursor, halaman = [], 0, 0
+        while cursor is not None:
+            body = self.get(limit=10, after=cursor).json()
+            ids += [row['id'] for row in body['data']]
+            cursor = body['next_cursor']
+            halaman += 1
+            if halaman == 1:
+                # Baris yang sudah lewat dihapus + baris baru masuk di tengah paging
+                Peserta.objects.filter(id=ids[0]).delete()
+                self.tambah(1)
+
+        semua = list(Peserta.objects.order_by('id').values_list('id', flat=True))
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(ids[1:], semua)
+        self.assertEqual(halaman, 3)
+
+        baris = {row['id']: row for row in self.get().json()['data']}
+        for peserta in Peserta.objects.all():
+            self.assertEqual(baris[peserta.id]['total_ujian'], peserta.hasilujian_set.count())
+            self.assertEqual('nis' in baris[peserta.id], bool(peserta.nis))
+
+    def test_halaman_terakhir_pas(self):
+        body = self.get(limit=25).json()
+        self.assertEqual((body['total'], body['next_cursor']), (25, None))
+        body = self.get(limit=24).json()
+        self.assertEqual(body['next_cursor'], body['data'][-1]['id'])
+        self.assertEqual(self.client.get(reverse('list_peserta'), {'after': 'x'}).status_code, 400)
+
+    def test_satu_query_per_halaman(self):
+        def hitung(**params):
+            with CaptureQueriesContext(connection) as ctx:
+                self.get(**params)
+            return [q['sql'] for q in ctx.captured_queries if 'ujian_core_peserta' in q['sql']]
+
+        sedikit = hitung(limit=5)
+        self.assertEqual(len(sedikit), 1)
+        self.assertIn('COUNT(', sedikit[0].upper())
+        self.tambah(50)
+        self.assertEqual(len(hitung(limit=50)), 1)
+        self.assertEqual(len(hitung()), 1)
+
+    def test_stream_sama_dengan_list_penuh(self):
+        response = self.get(stream='1')
+        streamed = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(streamed, self.get().json())
+
+
+class RosterIndexTest(TestCase):
+    """Indeks siswa.json di memori: lookup nama, fallback login, reload saat file berubah"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'siswa.json')
+        self.tulis([
+            {'Nama': 'Ani Lestari', 'Nis ': '1', 'Jurusan': 'X'},
+            {'Nama': 'ani  lestari', 'Nis ': '2', 'Jurusan': 'XI'},
+            'bukan dict',
+            {'Nama': 'Budi', 'Nis ': '3', 'Jurusan': 'XII'},
+        ])
+
+    def tulis(self, data, mtime=None):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(data if isinstance(data, str) else json.dumps(data))
+        if mtime is not None:
+            os.utime(self.path, (mtime, mtime))
+
+    def test_indeks_dan_lookup(self):
+        roster = RosterIndex(self.path)
+        self.assertTrue(roster.exists and roster.is_valid)
+        self.assertEqual(len(roster), 2)
+        self.assertEqual(len(roster.records()), 4)
+        # Nama dobel di file: entri pertama yang dipakai
+        self.assertEqual(roster.get('  ANI   lestari '), {'nama': 'Ani Lestari', 'nis': '1', 'kelas': 'X'})
+        self.assertIsNone(roster.get('Citra'))
+        self.assertIsNone(roster.get(''))
+
+    def test_login_fallback_ke_roster(self):
+        Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='777', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60, aktif=True,
+        )
+        clear_ujian_pin_cache()
+        self.addCleanup(clear_ujian_pin_cache)
+        roster = RosterIndex(self.path)
+
+        def login(nama):
+            return self.client.post('/api/login/', {'nama': nama, 'pin_ujian': '777'}, content_type='application/json')
+
+        with mock.patch('ujian_core.views.get_roster', return_value=roster):
+            response = login('budi')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['nama'], 'Budi')
+            self.assertEqual(Peserta.objects.get().kelas, 'XII')
+
+            # Login kedua langsung ketemu di DB, tidak dibuat dobel
+            self.assertEqual(login('BUDI').json()['peserta_id'], response.json()['peserta_id'])
+            self.assertEqual(login('Citra').status_code, 400)
+        self.assertEqual(Peserta.objects.count(), 1)
+
+    def test_reload_saat_file_berubah(self):
+        roster = RosterIndex(self.path, reload_interval=60)
+        self.assertIsNone(roster.get('Citra'))
+        mtime = os.stat(self.path).st_mtime + 10
+        self.tulis([{'Nama': 'Citra', 'Jurusan': 'X'}], mtime=mtime)
+
+        # Dalam reload_interval mtime belum dicek ulang
+        self.assertIsNone(roster.get('Citra'))
+        roster.refresh(force=True)
+        self.assertEqual(roster.get('citra')['kelas'], 'X')
+        self.assertIsNone(roster.get('Budi'))
+
+        roster.reload_interval = 0
+        # File rusak (sedang ditulis): snapshot lama tetap dipakai
+        self.tulis('[{"Nama": ', mtime=mtime + 10)
+        self.assertEqual(roster.get('Citra')['kelas'], 'X')
+        self.assertTrue(roster.error)
+
+        self.tulis({'Nama': 'bukan list'}, mtime=mtime + 20)
+        self.assertFalse(roster.is_valid)
+        self.assertIsNone(roster.get('Citra'))
+
+        os.remove(self.path)
+        self.assertFalse(roster.exists)
+
+
+class ImportPesertaTest(TestCase):
+    """Import siswa.json / CSV: duplikat & baris rusak dilewati, imported = yang benar-benar masuk"""
+
+    def setUp(self):
+        Peserta.objects.create(nama='Budi Santoso', nis='1', kelas='X')
+
+    def test_import_json(self):
+        records = [
+            {'Nama': 'Ani', 'Nis ': '2', 'Jurusan': 'X'},
+            {'Nama': '  budi   SANTOSO ', 'Nis ': '3', 'Jurusan': 'XI'},
+            {'Nama': 'ani', 'Nis ': '4', 'Jurusan': 'X'},
+            'bukan dict',
+            {'Nama': '', 'Jurusan': 'X'},
+            {'Nama': 'Citra', 'Nis ': '5', 'Jurusan': 'XII'},
+        ]
+        report = bulk_import_peserta(enumerate(records, 1), parse_siswa, batch_size=2)
+
+        self.assertEqual(report['imported'], 2)
+        self.assertEqual(report['skipped'], 4)
+        self.assertEqual(report['existing'], [(2, 'budi   SANTOSO'), (3, 'ani')])
+        self.assertEqual([label for label, _, _ in report['errors']], [4])
+        self.assertEqual(
+            sorted(Peserta.objects.values_list('nama', 'nis', 'kelas')),
+            [('Ani', '2', 'X'), ('Budi Santoso', '1', 'X'), ('Citra', '5', 'XII')],
+        )
+        self.assertEqual(Peserta.objects.get(nama='Ani').nama_normal, 'ani')
+
+    def test_import_csv_admin(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'rahasia'))
+        upload = io.BytesIO(
+            '\ufeffnama,kelas,nis\n'
+            'Budi Santoso,X,9\n'
+            'Budi Santoso,XI,10\n'
+            'Dewi,XI,11\n'
+            'dewi ,XI,12\n'
+            ',XI,13\n'.encode('utf-8')
+        )
+        upload.name = 'peserta.csv'
+        response = self.client.post(
+            reverse('admin:peserta_import_csv'), {'csv_file': upload}, follow=True,
+        )
+        pesan = [str(m) for m in response.context['messages']]
+
+        self.assertIn('✅ 2 data berhasil diimport!', pesan)
+        self.assertTrue(any('Baris 2: Budi Santoso sudah ada' in m and 'Baris 5: dewi sudah ada' in m for m in pesan))
+        self.assertEqual(
+            sorted(Peserta.objects.values_list('nama', 'kelas')),
+            [('Budi Santoso', 'X'), ('Budi Santoso', 'XI'), ('Dewi', 'XI')],
+        )
+
+    def test_bentrok_dengan_insert_lain_tidak_dihitung(self):
+        def parse_lalu_bentrok(raw):
+            # Login lain membuat peserta yang sama setelah nama-nama di-cek
+            if raw['Nama'] == 'Eka':
+                Peserta.objects.create(nama='Eka', kelas='X')
+            return parse_siswa(raw)
+
+        records = [{'Nama': 'Eka', 'Jurusan': 'X'}, {'Nama': 'Fajar', 'Jurusan': 'X'}]
+        report = bulk_import_peserta(enumerate(records, 1), parse_lalu_bentrok)
+
+        self.assertEqual((report['imported'], report['skipped']), (1, 1))
+        self.assertEqual(Peserta.objects.filter(nama='Eka').count(), 1)
+
+
+class EventLogTest(TestCase):
+    """alerts.log / violations_fallback.log: buffer, rotasi + gzip, tail"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, 'alerts.log')
+
+    def log(self, **kwargs):
+        kwargs.setdefault('flush_interval', 60)
+        return EventLog(self.path, **kwargs)
+
+    def baris(self):
+        with open(self.path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_ditulis_per_batch(self):
+        log = self.log(max_buffer=3)
+        log.write({'n': 1})
+        log.write({'n': 2})
+        self.assertFalse(os.path.exists(self.path))
+        log.write({'n': 3})
+        self.assertEqual(self.baris(), [{'n': 1}, {'n': 2}, {'n': 3}])
+
+        log.write({'n': 4, 'student': 'Ani'})
+        log.flush()
+        self.assertEqual(self.baris()[-1], {'n': 4, 'student': 'Ani'})
+
+    def test_rotasi_gzip_dan_batas_backup(self):
+        log = self.log(max_buffer=1, max_bytes=200, backup_count=2)
+        for i in range(20):
+            log.write({'n': i, 'isi': 'x' * 40})
+
+        backups = sorted(glob.glob(self.path + '.*.gz'))
+        self.assertEqual(len(backups), 2)
+        self.assertEqual(glob.glob(self.path + '.2*[0-9]'), [])
+        self.assertLessEqual(os.path.getsize(self.path), 200)
+        self.assertEqual(self.baris()[-1]['n'], 19)
+
+        # Backup yang tersisa = yang terbaru, tepat sebelum isi file aktif
+        terbaru = max(backups, key=os.path.getmtime)
+        with gzip.open(terbaru, 'rt', encoding='utf-8') as f:
+            terakhir = json.loads(f.read().splitlines()[-1])
+        self.assertEqual(terakhir['n'], self.baris()[0]['n'] - 1)
+
+    def test_tail_terbaru_dulu_termasuk_buffer(self):
+        log = self.log(max_buffer=100)
+        for i, (student, exam) in enumerate([('Ani', 'MTK'), ('Budi', 'MTK'), ('ani', 'IPA'), ('Ani', 'MTK')]):
+            log.write({'n': i, 'student': student, 'exam': exam})
+
+        self.assertEqual([e['n'] for e in log.tail(limit=2)], [3, 2])
+        self.assertEqual([e['n'] for e in log.tail(student='ANI')], [3, 2, 0])
+        self.assertEqual([e['n'] for e in log.tail(student='ani', exam='mtk')], [3, 0])
+        # Baris rusak dilewati, bukan menggagalkan tail
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{rusak\n')
+        self.assertEqual(log.tail(limit=1)[0]['n'], 3)
+
+
+class FakeTelegram(BaseHTTPRequestHandler):
+    """Pengganti api.telegram.org; status diambil dari server.responses"""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.received.append(body['text'])
+        code, data = self.server.responses.pop(0) if self.server.responses else (200, {'ok': True})
+        raw = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+class AlertDispatcherTest(TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeTelegram)
+        self.server.received = []
+        self.server.responses = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def dispatcher(self, **kwargs):
+        kwargs.setdefault('coalesce_window', 0.2)
+        kwargs.setdefault('min_interval', 0)
+        kwargs.setdefault('backoff', 0.01)
+        return AlertDispatcher(
+            'TOKEN', '123',
+            api_url=f'http://127.0.0.1:{self.server.server_port}',
+            **kwargs
+        )
+
+    def test_alert_digabung_jadi_satu_pesan(self):
+        d = self.dispatcher()
+        for i in range(5):
+            self.assertTrue(d.enqueue(f'alert {i}'))
+        self.assertTrue(d.flush(5))
+        self.assertEqual(len(self.server.received), 1)
+        self.assertIn('alert 4', self.server.received[0])
+        self.assertEqual(d.stats()['sent'], 5)
+
+    def test_retry_setelah_rate_limit(self):
+        self.server.responses = [(429, {'ok': False, 'parameters': {'retry_after': 0.01}}), (500, {})]
+        d = self.dispatcher()
+        d.enqueue('alert')
+        self.assertTrue(d.flush(5))
+        stats = d.stats()
+        self.assertEqual((stats['sent'], stats['retried'], stats['dropped']), (1, 2, 0))
+        self.assertEqual(len(self.server.received), 3)
+
+    def test_pesan_gabungan_ditolak_dikirim_satu_per_satu(self):
+        self.server.responses = [(400, {'ok': False}), (200, {'ok': True}), (400, {'ok': False}), (200, {'ok': True})]
+        d = self.dispatcher()
+        for text in ['alert 0', 'nama <rusak', 'alert 2']:
+            d.enqueue(text)
+        self.assertTrue(d.flush(5))
+        self.assertEqual(self.server.received[1:], ['alert 0', 'nama <rusak', 'alert 2'])
+        stats = d.stats()
+        self.assertEqual((stats['sent'], stats['dropped']), (2, 1))
+
+    def test_potong_tidak_merusak_html(self):
+        self.assertEqual(truncate_html('<b>halo dunia</b>', 8), '<b>h</b>')
+        self.assertEqual(truncate_html('ab &amp; cd', 6), 'ab ')
+        self.assertEqual(truncate_html('<b>x</b> <a href="https://example.com">link</a>', 15), '<b>x</b> ')
+        self.assertEqual(truncate_html('<b>ok</b>', 9), '<b>ok</b>')
+
+        panjang = '🚨 <b>PELANGGARAN</b>\n' + '<b>Siswa: ' + 'x' * 5000 + ' &amp; <i>y</i></b>'
+        hasil = truncate_html(panjang)
+        self.assertLessEqual(len(hasil), TELEGRAM_MAX_LENGTH)
+        self.assertTrue(hasil.endswith('</b>'))
+        self.assertEqual(hasil.count('<b>'), hasil.count('</b>'))
+
+    def test_antrian_penuh_dibuang(self):
+        d = self.dispatcher(max_queue=2, coalesce_window=0.5)
+        hasil = [d.enqueue(f'alert {i}') for i in range(10)]
+        self.assertTrue(d.flush(5))
+        self.assertIn(False, hasil)
+        stats = d.stats()
+        self.assertEqual(stats['sent'] + stats['dropped'], 10)
+        self.assertGreater(stats['dropped'], 0)
+
+
+class RedeemKodeAksesConcurrencyTest(TransactionTestCase):
+    """Satu kode akses diperebutkan banyak thread: hanya satu yang boleh menang"""
+
+    JUMLAH_THREAD = 12
+
+    def setUp(self):
+        self.ujian = Ujian.objects.create(
+            nama_ujian='Ujian Serentak',
+            pin_ujian='111',
+            url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(),
+            durasi=90,
+        )
+        KodeAkses.objects.create(kode='REBUTAN', ujian=self.ujian)
+        self.peserta_ids = [
+            Peserta.objects.create(nis=str(i), nama=f'Siswa {i}', kelas='X').id
+            for i in range(self.JUMLAH_THREAD)
+        ]
+
+    def test_kode_hanya_bisa_dipakai_sekali(self):
+        barrier = threading.Barrier(self.JUMLAH_THREAD)
+        statuses = []
+
+        def tebus(peserta_id):
+            try:
+                barrier.wait()
+                response = self.client_class().post(
+                    '/api/validate-kode/',
+                    {'kode_akses': 'REBUTAN', 'peserta_id': peserta_id},
+                    content_type='application/json',
+                )
+                statuses.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=tebus, args=(pid,)) for pid in self.peserta_ids]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(statuses.count(200), 1, statuses)
+        self.assertNotIn(500, statuses)
+        self.assertTrue(KodeAkses.objects.get(kode='REBUTAN').terpakai)
+        self.assertEqual(HasilUjian.objects.count(), 1)
+        self.assertEqual(SessionLock.objects.count(), 1)
+
+    def test_peserta_tidak_ada_kode_tidak_hangus(self):
+        response = self.client.post(
+            '/api/validate-kode/',
+            {'kode_akses': 'REBUTAN', 'peserta_id': 999999},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(KodeAkses.objects.get(kode='REBUTAN').terpakai)
+
+
+@override_settings(SECURITY_EVENT_BACKGROUND=False)
+class AsyncAlertViewTest(TransactionTestCase):
+    """View async (telegram_alert / violation_alert / monitor_feed) lewat AsyncClient; ORM jalan di run_orm"""
+
+    def setUp(self):
+        clear_session_cache()
+        clear_device_cache()
+        self.addCleanup(clear_session_cache)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.logs = {}
+
+        def event_log(filename):
+            return self.logs.setdefault(filename, EventLog(os.path.join(tmp.name, filename), flush_interval=60))
+
+        for target, kwargs in [('get_event_log', {'side_effect': event_log}), ('send_alert', {})]:
+            patcher = mock.patch(f'ujian_core.views.{target}', **kwargs)
+            setattr(self, target, patcher.start())
+            self.addCleanup(patcher.stop)
+
+        ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+        self.hasil = HasilUjian.objects.create(peserta=Peserta.objects.create(nama='Ani', kelas='X'), ujian=ujian)
+        SessionLock.objects.filter(hasil_ujian=self.hasil).update(is_locked=True, user_consented=True)
+        self.token = self.hasil.session_lock.session_token
+        self.staff = User.objects.create_user('staff', password='x', is_staff=True)
+
+    async def test_telegram_alert_async(self):
+        head = monitor_bus.since(0)[2]
+        response = await AsyncClient().post('/api/telegram-alert/', {
+            'student': 'Ani', 'class': 'X', 'exam': 'Ujian', 'violationType': 'TAB_SWITCH',
+            'details': 'pindah tab', 'session_token': self.token,
+        }, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['alert_type'], 'violation')
+        self.send_alert.assert_called_once()
+        self.assertIn('TAB_SWITCH', self.send_alert.call_args[0][0])
+        self.assertEqual(self.logs['alerts.log'].tail()[0]['student'], 'Ani')
+
+        events, _, _ = monitor_bus.since(head, ujian_id=self.hasil.ujian_id)
+        self.assertEqual([e['data']['hasil_ujian_id'] for e in events if e['type'] == 'violation'], [self.hasil.id])
+        await asyncio.to_thread(security_events.flush)
+        self.assertTrue(await SecurityEvent.objects.filter(
+            event_type='PAGE_VIOLATION', session_lock__hasil_ujian=self.hasil,
+        ).aexists())
+
+    async def test_violation_alert_async(self):
+        response = await AsyncClient().post(
+            '/api/violation-alert/', {'student': 'Ani', 'violationType': 'BLUR'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.logs['violations_fallback.log'].tail()[0]['violationType'], 'BLUR')
+
+        response = await AsyncClient().post('/api/violation-alert/', 'bukan json', content_type='application/json')
+        self.assertEqual(response.status_code, 500)
+
+    async def test_monitor_feed_poll_async(self):
+        client = AsyncClient()
+        response = await client.get('/api/monitor/feed/', {'mode': 'poll', 'timeout': '0'})
+        self.assertEqual(response.status_code, 403)
+
+        await client.aforce_login(self.staff)
+        response = await client.get('/api/monitor/feed/', {'mode': 'poll', 'timeout': '0', 'ujian_id': str(self.hasil.ujian_id)})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['events'], [])
+        self.assertEqual([sesi['hasil_ujian_id'] for sesi in body['snapshot']], [self.hasil.id])
+
+
+@override_settings(AUDIT_SIGN_BATCH=5)
+class AuditTrailTest(TestCase):
+    """Audit trail append-only: hash chain + tanda tangan batch"""
+
+    def setUp(self):
+        admin = User.objects.create_user('pengawas')
+        ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+        hasil = HasilUjian.objects.create(peserta=Peserta.objects.create(nama='Siswa', kelas='X'), ujian=ujian)
+        self.akses = RemoteAccess.objects.create(session_lock=hasil.session_lock, granted_by_admin=admin)
+
+    def test_chain_utuh_dan_halaman(self):
+        for i in range(12):
+            self.akses.log_activity('KLIK', {'ke': i})
+
+        hasil = self.akses.verify_audit_trail()
+        self.assertTrue(hasil['ok'])
+        self.assertEqual((hasil['checked'], hasil['signed'], hasil['unsigned_tail']), (12, 2, 2))
+
+        halaman = self.akses.audit_trail(after_seq=5, limit=4)
+        self.assertEqual([e.seq for e in halaman], [6, 7, 8, 9])
+        self.assertEqual(halaman[0].admin, 'pengawas')
+
+    def test_perubahan_terdeteksi(self):
+        for i in range(6):
+            self.akses.log_activity('KLIK', {'ke': i})
+        AuditEntry.objects.filter(remote_access=self.akses, seq=3).update(details={'ke': 99})
+        self.assertEqual(self.akses.verify_audit_trail()['broken_at'], 3)
+
+    def test_baris_dihapus_terdeteksi(self):
+        for i in range(6):
+            self.akses.log_activity('KLIK', {'ke': i})
+        AuditEntry.objects.filter(remote_access=self.akses, seq=4).delete()
+        self.assertEqual(self.akses.verify_audit_trail()['broken_at'], 5)
+
+    @override_settings(AUDIT_SIGN_BATCH=2)
+    def test_hash_migrasi_lolos_verifikasi(self):
+        # Rumus yang dibekukan di migrasi 0006 harus menghasilkan rantai yang valid untuk model
+        migrasi = importlib.import_module('ujian_core.migrations.0006_auditentry')
+        prev_hash = ''
+        for seq in range(1, 4):
+            timestamp = timezone.now()
+            entry_hash = migrasi.compute_hash(prev_hash, seq, timestamp, 'LEGACY', {'ke': seq}, 'pengawas')
+            AuditEntry.objects.create(
+                remote_access=self.akses, seq=seq, timestamp=timestamp, action='LEGACY',
+                details={'ke': seq}, admin='pengawas', prev_hash=prev_hash, entry_hash=entry_hash,
+                signature=migrasi.sign_hash(entry_hash) if seq % 2 == 0 else '',
+            )
+            prev_hash = entry_hash
+
+        hasil = self.akses.verify_audit_trail()
+        self.assertTrue(hasil['ok'])
+        self.assertEqual((hasil['checked'], hasil['signed']), (3, 1))
+
+
+class DeviceMigrationTest(TransactionTestCase):
+    """Migrasi 0007: event lama di-intern ke DeviceInfo per batch pk, ujian diisi dari session_lock"""
+
+    sebelum = [('ujian_core', '0006_auditentry')]
+    sesudah = [('ujian_core', '0007_deviceinfo_securityevent_indexes')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_intern_per_batch(self):
+        apps = self.migrate(self.sebelum)
+        Ujian = apps.get_model('ujian_core', 'Ujian')
+        ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+        peserta = apps.get_model('ujian_core', 'Peserta').objects.create(nama='Ani', kelas='X', nama_normal='ani')
+        hasil = apps.get_model('ujian_core', 'HasilUjian').objects.create(peserta=peserta, ujian=ujian)
+        lock = apps.get_model('ujian_core', 'SessionLock').objects.create(hasil_ujian=hasil)
+        OldEvent = apps.get_model('ujian_core', 'SecurityEvent')
+        pasangan = [('Mozilla A', 'fp1'), ('Mozilla B', ''), ('Mozilla A', 'fp1'), ('Mozilla A', 'fp2'), ('Mozilla B', '')]
+        for i, (ua, fp) in enumerate(pasangan):
+            OldEvent.objects.create(
+                event_type='LOCK', description=str(i), ip_address='127.0.0.1',
+                user_agent=ua, browser_fingerprint=fp, session_lock=lock if i % 2 else None,
+            )
+
+        migrasi = importlib.import_module('ujian_core.migrations.0007_deviceinfo_securityevent_indexes')
+        with mock.patch.object(migrasi, 'BATCH_SIZE', 2):
+            self.migrate(self.sesudah)
+
+        self.assertEqual(DeviceInfo.objects.count(), 3)
+        for event in SecurityEvent.objects.select_related('device'):
+            ua, fp = pasangan[int(event.description)]
+            self.assertEqual((event.device.user_agent, event.device.browser_fingerprint), (ua, fp))
+            self.assertEqual(event.device.hash, DeviceInfo.hash_for(ua, fp))
+            self.assertEqual(event.ujian_id, ujian.id if event.session_lock_id else None)
+
+
+@override_settings(SECURITY_EVENT_BATCH=10000, SECURITY_EVENT_BACKGROUND=False)
+class SecurityEventIngestTest(TestCase):
+    """Event ditulis per batch; user agent di-intern ke DeviceInfo"""
+
+    def setUp(self):
+        clear_device_cache()
+        security_events.flush()
+        self.addCleanup(security_events.flush)
+
+    def test_flush_batch(self):
+        ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+        hasil = HasilUjian.objects.create(peserta=Peserta.objects.create(nama='Siswa', kelas='X'), ujian=ujian)
+        for i in range(300):
+            security_events.record_security_event(
+                'PAGE_VIOLATION', f'tab ke-{i}', '10.0.0.1',
+                user_agent=f'Browser {i % 3}', session_lock_id=hasil.session_lock.id,
+            )
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(security_events.flush(), 300)
+        # Savepoint batch (atomic) tidak dihitung
+        queries = [q for q in ctx.captured_queries if not q['sql'].startswith(('SAVEPOINT', 'RELEASE'))]
+        self.assertLessEqual(len(queries), 6)
+
+        self.assertEqual(DeviceInfo.objects.count(), 3)
+        self.assertEqual(SecurityEvent.objects.filter(ujian=ujian).count(), 300)
+        self.assertEqual(SecurityEvent.objects.latest('timestamp').user_agent[:8], 'Browser ')
+
+    def test_hash_migrasi_sama_dengan_intern(self):
+        # Device hasil migrasi 0007 harus dipakai ulang oleh intern(), bukan dibuat dobel
+        migrasi = importlib.import_module('ujian_core.migrations.0007_deviceinfo_securityevent_indexes')
+        ua, fp = 'Mozilla/5.0 (Ünïcode)', 'fp-1'
+        device = DeviceInfo.objects.create(hash=migrasi.hash_for(ua, fp), user_agent=ua, browser_fingerprint=fp)
+        self.assertEqual(DeviceInfo.intern(ua, fp), device.id)
+        self.assertEqual(migrasi.hash_for('ua'), DeviceInfo.hash_for('ua'))
+
+    def test_batch_gagal_kembali_ke_antrean(self):
+        for i in range(8):
+            security_events.record_security_event('PAGE_VIOLATION', f'tab ke-{i}', '10.0.0.1', user_agent='Browser')
+        gagal = mock.patch.object(SecurityEvent.objects, 'bulk_create', side_effect=OperationalError('database is locked'))
+        with override_settings(SECURITY_EVENT_MAX_PENDING=5), gagal, self.assertRaises(OperationalError):
+            security_events.flush()
+        # Dibatasi 5, yang terlama dibuang
+        self.assertEqual(security_events.pending_count(), 5)
+        self.assertEqual(SecurityEvent.objects.count(), 0)
+
+        self.assertEqual(security_events.flush(), 5)
+        self.assertEqual(
+            sorted(SecurityEvent.objects.values_list('description', flat=True)),
+            [f'tab ke-{i}' for i in range(3, 8)],
+        )
+
+
+@override_settings(PELANGGARAN_MAKS=3, PELANGGARAN_DEBOUNCE=60, SECURITY_EVENT_BACKGROUND=False)
+class ReportPelanggaranTest(TestCase):
+    """Hitungan pelanggaran atomik, debounce, dan diskualifikasi otomatis"""
+
+    def setUp(self):
+        clear_pelanggaran_debounce()
+        clear_device_cache()
+        self.ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+
+    def tearDown(self):
+        # SecurityEvent yang masih antri ditulis di transaksi test ini juga
+        security_events.flush()
+
+    def buat_sesi(self, nama):
+        return HasilUjian.objects.create(peserta=Peserta.objects.create(nama=nama, kelas='X'), ujian=self.ujian)
+
+    def lapor(self, **data):
+        data.setdefault('jenis_pelanggaran', 'TAB_SWITCH')
+        return self.client.post(reverse('report_pelanggaran'), data, content_type='application/json')
+
+    def test_event_ganda_dibuang(self):
+        hasil = self.buat_sesi('Siswa A')
+        self.assertEqual(self.lapor(hasil_ujian_id=hasil.id).json()['percobaan_keluar'], 1)
+        self.assertTrue(self.lapor(hasil_ujian_id=hasil.id).json()['debounced'])
+        hasil.refresh_from_db()
+        self.assertEqual(hasil.percobaan_keluar, 1)
+
+    def test_diskualifikasi_saat_batas(self):
+        hasil = self.buat_sesi('Siswa B')
+        with override_settings(PELANGGARAN_DEBOUNCE=0):
+            for _ in range(2):
+                self.assertFalse(self.lapor(peserta_id=hasil.peserta_id, ujian_id=self.ujian.id).json()['diskualifikasi'])
+            respon = self.lapor(hasil_ujian_id=hasil.id).json()
+            self.assertTrue(respon['diskualifikasi'])
+            # Sesi yang sudah selesai tidak dihitung lagi
+            respon = self.lapor(peserta_id=hasil.peserta_id, ujian_id=self.ujian.id)
+            self.assertEqual(respon.status_code, 409)
+            self.assertEqual((respon.json()['percobaan_keluar'], respon.json()['status_ujian']), (3, 'diskualifikasi'))
+
+        hasil.refresh_from_db()
+        self.assertEqual((hasil.status, hasil.percobaan_keluar), ('diskualifikasi', 3))
+        self.assertIsNotNone(hasil.waktu_selesai)
+
+    def test_submit_tidak_membatalkan_diskualifikasi(self):
+        hasil = self.buat_sesi('Siswa C')
+        HasilUjian.objects.filter(id=hasil.id).update(jawaban={'1': 'A'}, percobaan_keluar=2)
+        self.assertTrue(self.lapor(hasil_ujian_id=hasil.id).json()['diskualifikasi'])
+
+        respon = self.client.post(
+            reverse('submit_jawaban'),
+            {'hasil_ujian_id': hasil.id, 'jawaban_data': {'1': 'B'}},
+            content_type='application/json',
+        )
+        self.assertEqual(respon.status_code, 409)
+        hasil.refresh_from_db()
+        self.assertEqual((hasil.status, hasil.jawaban), ('diskualifikasi', {'1': 'A'}))
+
+    def test_debounce_per_sesi_apa_pun_bentuk_request(self):
+        hasil = self.buat_sesi('Siswa D')
+        self.assertEqual(self.lapor(hasil_ujian_id=hasil.id).json()['percobaan_keluar'], 1)
+        self.assertTrue(self.lapor(peserta_id=hasil.peserta_id, ujian_id=self.ujian.id).json()['debounced'])
+        hasil.refresh_from_db()
+        self.assertEqual(hasil.percobaan_keluar, 1)
+
+    def test_sesi_selesai_409(self):
+        hasil = self.buat_sesi('Siswa E')
+        HasilUjian.objects.filter(id=hasil.id).update(status='selesai')
+        respon = self.lapor(hasil_ujian_id=hasil.id)
+        self.assertEqual(respon.status_code, 409)
+        self.assertEqual(respon.json()['status_ujian'], 'selesai')
+        hasil.refresh_from_db()
+        self.assertEqual(hasil.percobaan_keluar, 0)
+        security_events.flush()
+        self.assertFalse(SecurityEvent.objects.filter(event_type='PAGE_VIOLATION').exists())
+
+    def test_sesi_tidak_ada(self):
+        self.assertEqual(self.lapor(hasil_ujian_id=999).status_code, 400)
+        self.assertEqual(self.lapor(peserta_id=1).status_code, 400)
+
+
+@override_settings(EXAM_EXPIRY_SWEEP_INTERVAL=0, EXAM_SUBMIT_GRACE=30)
+class ExamClockTest(TestCase):
+    """Sisa waktu dari jam server; submit / autosave ditolak setelah deadline + grace"""
+
+    def setUp(self):
+        clear_session_cache()
+        self.addCleanup(clear_session_cache)
+        self.ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+
+    def buat_sesi(self, mulai_lalu):
+        nama = f'Siswa {Peserta.objects.count()}'
+        hasil = HasilUjian.objects.create(peserta=Peserta.objects.create(nama=nama, kelas='X'), ujian=self.ujian)
+        HasilUjian.objects.filter(id=hasil.id).update(waktu_mulai=timezone.now() - mulai_lalu, jawaban={'1': 'A'})
+        hasil.refresh_from_db()
+        return hasil, hasil.session_lock.session_token
+
+    def submit(self, hasil, jawaban):
+        return self.client.post(
+            reverse('submit_jawaban'),
+            {'hasil_ujian_id': hasil.id, 'jawaban_data': jawaban},
+            content_type='application/json',
+        )
+
+    def test_heartbeat_sisa_waktu(self):
+        _, token = self.buat_sesi(timedelta(minutes=10))
+        data = self.client.get(reverse('heartbeat'), {'session_token': token}).json()
+        self.assertEqual(data['sesi'], 'mulai')
+        self.assertAlmostEqual(data['remaining'], 50 * 60, delta=5)
+        self.assertEqual(self.client.get(reverse('heartbeat'), {'session_token': 'salah'}).status_code, 404)
+
+    def test_expire_sesi_lewat_waktu(self):
+        lewat, token = self.buat_sesi(timedelta(minutes=61))
+        berjalan, _ = self.buat_sesi(timedelta(minutes=5))
+        self.assertEqual(expire_overdue_sessions(), 1)
+
+        lewat.refresh_from_db()
+        self.assertEqual(lewat.status, 'selesai')
+        self.assertEqual(lewat.waktu_selesai, lewat.waktu_mulai + timedelta(minutes=60))
+        berjalan.refresh_from_db()
+        self.assertEqual(berjalan.status, 'mulai')
+        data = self.client.get(reverse('heartbeat'), {'session_token': token}).json()
+        self.assertEqual((data['sesi'], data['remaining']), ('selesai', 0))
+
+    def test_submit_terlambat_ditolak(self):
+        # Belum ditutup sweeper, tapi sudah lewat deadline + grace
+        hasil, token = self.buat_sesi(timedelta(minutes=61))
+        respon = self.submit(hasil, {'1': 'B'})
+        self.assertEqual(respon.status_code, 409)
+        self.assertEqual(respon.json()['message'], 'Waktu ujian sudah habis')
+        patch = self.client.post(
+            reverse('autosave_jawaban'),
+            {'session_token': token, 'seq': 1, 'jawaban': {'1': 'C'}},
+            content_type='application/json',
+        )
+        self.assertEqual(patch.status_code, 409)
+        hasil.refresh_from_db()
+        self.assertEqual((hasil.status, hasil.jawaban), ('mulai', {'1': 'A'}))
+
+        # Masih dalam grace → diterima
+        dalam_grace, _ = self.buat_sesi(timedelta(minutes=60, seconds=10))
+        self.assertEqual(self.submit(dalam_grace, {'1': 'B'}).status_code, 200)
+        dalam_grace.refresh_from_db()
+        self.assertEqual((dalam_grace.status, dalam_grace.jawaban), ('selesai', {'1': 'B'}))
+
+    def test_aksi_admin_langsung_berlaku(self):
+        hasil, token = self.buat_sesi(timedelta(minutes=5))
+        self.assertEqual(self.client.get(reverse('heartbeat'), {'session_token': token}).json()['sesi'], 'mulai')
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'rahasia'))
+        url = reverse('admin:ujian_core_hasilujian_changelist')
+        self.client.post(url, {'action': 'diskualifikasi_ujian', '_selected_action': [str(hasil.id)]})
+        # Jam sesi yang ter-cache tidak boleh masih bilang 'mulai'
+        self.assertEqual(self.client.get(reverse('heartbeat'), {'session_token': token}).json()['sesi'], 'diskualifikasi')
+        patch = self.client.post(
+            reverse('autosave_jawaban'),
+            {'session_token': token, 'seq': 1, 'jawaban': {'1': 'C'}},
+            content_type='application/json',
+        )
+        self.assertEqual(patch.status_code, 409)
+
+        self.client.post(url, {'action': 'reset_ujian', '_selected_action': [str(hasil.id)]})
+        self.assertEqual(self.client.get(reverse('heartbeat'), {'session_token': token}).json()['sesi'], 'mulai')
+
+
+@override_settings(AUTOSAVE_BACKGROUND=False, EXAM_EXPIRY_SWEEP_INTERVAL=0)
+class AutosaveTest(TestCase):
+    """Patch per soal: seq terbesar menang, seq lama ditolak, gagal tulis dicoba lagi"""
+
+    def setUp(self):
+        autosave.clear_pending()
+        self.addCleanup(autosave.clear_pending)
+        clear_session_cache()
+        ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+        self.hasil = HasilUjian.objects.create(peserta=Peserta.objects.create(nama='Siswa', kelas='X'), ujian=ujian)
+        self.token = self.hasil.session_lock.session_token
+
+    def patch(self, seq, jawaban):
+        return self.client.post(
+            reverse('autosave_jawaban'),
+            {'session_token': self.token, 'seq': seq, 'jawaban': jawaban},
+            content_type='application/json',
+        ).json()
+
+    def test_urutan_seq(self):
+        self.assertTrue(self.patch(2, {'1': 'B', '2': 'C'})['accepted'])
+        respon = self.patch(1, {'1': 'A'})
+        self.assertEqual((respon['accepted'], respon['seq']), (False, 2))
+        self.assertTrue(self.patch(3, {'2': 'D'})['accepted'])
+        autosave.flush_session(self.hasil.id)
+
+        self.hasil.refresh_from_db()
+        self.assertEqual(self.hasil.jawaban, {'1': 'B', '2': 'D'})
+        self.assertEqual(self.hasil.jawaban_seq, {'1': 2, '2': 3})
+
+    def test_seq_lama_dari_worker_lain_diabaikan(self):
+        sekarang = timezone.now()
+        self.assertTrue(autosave.apply_deltas(self.hasil.id, {'1': (5, 'B', sekarang)}))
+        self.assertFalse(autosave.apply_deltas(self.hasil.id, {'1': (4, 'A', sekarang)}))
+        self.hasil.refresh_from_db()
+        self.assertEqual(self.hasil.jawaban, {'1': 'B'})
+
+    def test_gagal_tulis_dicoba_lagi(self):
+        self.patch(1, {'1': 'A'})
+        with mock.patch.object(autosave, 'apply_deltas', side_effect=OperationalError('database is locked')):
+            with mock.patch('builtins.print') as cetak:
+                autosave.flush_due(force=True)
+        self.assertIn('database is locked', str(cetak.call_args))
+        # Patch lebih baru yang datang selama gagal tetap menang
+        self.patch(2, {'2': 'B'})
+        self.assertEqual(set(autosave.pending_deltas(self.hasil.id)), {'1', '2'})
+
+        autosave.flush_due(force=True)
+        self.hasil.refresh_from_db()
+        self.assertEqual(self.hasil.jawaban, {'1': 'A', '2': 'B'})
+        self.assertEqual(autosave.pending_deltas(self.hasil.id), {})
+
+    def test_patch_worker_lain_setelah_submit(self):
+        sebelum = timezone.now()
+        self.client.post(reverse('submit_jawaban'), {'hasil_ujian_id': self.hasil.id}, content_type='application/json')
+        sesudah = timezone.now()
+        autosave.apply_deltas(self.hasil.id, {'1': (1, 'A', sebelum), '2': (1, 'B', sesudah)})
+        self.hasil.refresh_from_db()
+        self.assertEqual((self.hasil.status, self.hasil.jawaban), ('selesai', {'1': 'A'}))
+
+
+class GenerateKodeAksesTest(TestCase):
+    """Kode massal unik tanpa query cek per kode"""
+
+    def test_unik_dan_query_tetap(self):
+        ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+        generate_kode_akses(ujian, 50, panjang=6)
+
+        with CaptureQueriesContext(connection) as ctx:
+            codes = generate_kode_akses(ujian, 2500, panjang=6, batch_size=1000)
+        # Satu SELECT kode yang sudah ada; sisanya INSERT (jumlahnya dibatasi limit parameter DB)
+        selects = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+        self.assertLessEqual(len(ctx.captured_queries), 20)
+
+        self.assertEqual(len(set(codes)), 2500)
+        self.assertEqual(KodeAkses.objects.filter(ujian=ujian).count(), 2550)
+
+    def test_ruang_kode_terlalu_kecil(self):
+        ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+        with self.assertRaises(ValueError):
+            generate_kode_akses(ujian, 1000, panjang=2)
+
+    def test_command_tolak_panjang_tidak_valid(self):
+        ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+        for args in (['--panjang', '0'], ['--prefix', 'X' * 45, '--panjang', '6']):
+            with self.assertRaises(CommandError):
+                call_command('generate_kode_akses', str(ujian.id), '--jumlah', '5', *args, stdout=io.StringIO())
+        self.assertFalse(KodeAkses.objects.filter(ujian=ujian).exists())
+
+
+class ExportHasilTest(TestCase):
+    """Export streaming: 1 kolom per soal, durasi dan jumlah pelanggaran"""
+
+    def setUp(self):
+        ujian = Ujian.objects.create(
+            nama_ujian='Fisika', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+        for i, jawaban in enumerate([{'1': 'A', '10': 'B'}, {'2': 'C'}, {}]):
+            peserta = Peserta.objects.create(nama=f'Siswa {i}', kelas='XI', nis=f'N{i}')
+            HasilUjian.objects.create(peserta=peserta, ujian=ujian, jawaban=jawaban, percobaan_keluar=i)
+        mulai = timezone.now() - timedelta(minutes=30)
+        HasilUjian.objects.update(status='selesai', waktu_mulai=mulai, waktu_selesai=mulai + timedelta(minutes=20))
+
+    def test_csv_kolom_per_soal(self):
+        # 1 pass kolom jawaban + 1 query data
+        with self.assertNumQueries(2):
+            text = ''.join(iter_csv(HasilUjian.objects.all(), chunk_size=2))
+        rows = list(csv.reader(io.StringIO(text.lstrip('\ufeff'))))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0][-3:], ['soal_1', 'soal_2', 'soal_10'])
+        self.assertEqual(rows[1][-3:], ['A', '', 'B'])
+        self.assertEqual(rows[1][rows[0].index('durasi_detik')], '1200')
+        self.assertEqual(rows[3][rows[0].index('pelanggaran')], '2')
+
+    def test_jsonl(self):
+        lines = ''.join(iter_jsonl(HasilUjian.objects.all())).splitlines()
+        self.assertEqual(len(lines), 3)
+        record = json.loads(lines[1])
+        self.assertEqual(record['nis'], 'N1')
+        self.assertEqual(record['jawaban'], {'2': 'C'})
+
+    def test_command_ke_stdout(self):
+        out = io.StringIO()
+        call_command('export_hasil_ujian', '--status', 'selesai', stdout=out)
+        self.assertTrue(out.getvalue().startswith('\ufeff'))
+        rows = list(csv.reader(io.StringIO(out.getvalue().lstrip('\ufeff'))))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[0][-3:], ['soal_1', 'soal_2', 'soal_10'])
+
+
+@skipUnless(scoring.scoring_available(), 'numpy belum terpasang')
+class ScoringTest(TestCase):
+    """Skor + analisis soal dari matriks respons; hanya hasil berubah yang ditulis ulang"""
+
+    def setUp(self):
+        self.ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+        for soal, kunci in [('1', 'A'), ('2', 'B'), ('10', 'C')]:
+            KunciJawaban.objects.create(ujian=self.ujian, soal=soal, kunci=kunci, bobot=2 if soal == '10' else 1)
+        jawaban_list = [
+            {'1': 'A', '2': 'B', '10': 'C'},
+            {'1': 'a ', '2': 'B', '10': 'D'},
+            {'1': 'B', '10': 'D'},
+            {'1': 'C', '2': 'A', '10': 'C'},
+        ]
+        self.hasil = []
+        for i, jawaban in enumerate(jawaban_list):
+            peserta = Peserta.objects.create(nama=f'Siswa {i}', kelas='XI')
+            self.hasil.append(HasilUjian.objects.create(peserta=peserta, ujian=self.ujian, jawaban=jawaban))
+        HasilUjian.objects.update(status='selesai')
+
+    def test_skor_dan_analisis(self):
+        self.assertEqual(scoring.nilai_ujian(self.ujian.id), {'dinilai': 4, 'diperbarui': 4, 'soal': 3})
+
+        skor = dict(HasilUjian.objects.values_list('id', 'skor'))
+        self.assertEqual([skor[h.id] for h in self.hasil], [4, 2, 0, 2])
+
+        soal1 = AnalisisSoal.objects.get(ujian=self.ujian, soal='1')
+        self.assertEqual(soal1.tingkat_kesulitan, 0.5)
+        self.assertEqual(soal1.distraktor, {'-': 0, 'A': 2, 'B': 1, 'C': 1})
+        self.assertGreater(soal1.daya_beda, 0)
+        self.assertEqual(AnalisisSoal.objects.get(ujian=self.ujian, soal='2').distraktor['-'], 1)
+
+    def test_hanya_hasil_berubah_ditulis(self):
+        scoring.nilai_ujian(self.ujian.id)
+        self.assertEqual(scoring.nilai_ujian(self.ujian.id)['diperbarui'], 0)
+
+        HasilUjian.objects.filter(id=self.hasil[2].id).update(jawaban={'1': 'A', '2': 'B', '10': 'D'})
+        with mock.patch('ujian_core.scoring.score_matrix', wraps=scoring.score_matrix) as score:
+            self.assertEqual(scoring.nilai_ujian(self.ujian.id)['diperbarui'], 1)
+        # Hanya baris yang berubah yang dinilai
+        self.assertEqual(score.call_args.args[0].shape, (1, 3))
+        self.assertEqual(HasilUjian.objects.get(id=self.hasil[2].id).skor, 2)
+
+        # Kunci berubah → semua dinilai ulang
+        KunciJawaban.objects.filter(ujian=self.ujian, soal='10').update(kunci='D')
+        self.assertEqual(scoring.nilai_ujian(self.ujian.id)['diperbarui'], 4)
+
+    def test_reset_admin_membuang_skor(self):
+        scoring.nilai_ujian(self.ujian.id)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'rahasia'))
+        self.client.post(reverse('admin:ujian_core_hasilujian_changelist'), {
+            'action': 'reset_ujian',
+            '_selected_action': [str(self.hasil[0].id)],
+        })
+        hasil = HasilUjian.objects.get(id=self.hasil[0].id)
+        self.assertEqual(hasil.status, 'mulai')
+        self.assertEqual((hasil.skor, hasil.jumlah_benar, hasil.skor_digest), (None, None, ''))
+        self.assertEqual(HasilUjian.objects.get(id=self.hasil[1].id).skor, 2)
+
+        # Selesai lagi → dinilai ulang walau jawabannya sama dengan sebelum reset
+        HasilUjian.objects.filter(id=self.hasil[0].id).update(status='selesai', jawaban={'1': 'A', '2': 'B', '10': 'C'})
+        self.assertEqual(scoring.nilai_ujian(self.ujian.id)['diperbarui'], 1)
+
+    def test_matriks_besar_tanpa_loop_per_soal(self):
+        rng = random.Random(1)
+        soal = [str(i) for i in range(1, 51)]
+        kunci = [rng.choice('ABCD') for _ in soal]
+        jawaban_list = [{s: rng.choice('ABCDE') for s in soal} for _ in range(2000)]
+
+        start = time.perf_counter()
+        matrix, pilihan = scoring.build_matrix(jawaban_list, soal, kunci)
+        benar, skor, _ = scoring.score_matrix(matrix, [1] * 50)
+        stats = scoring.item_analysis(matrix, benar, [1] * 50, pilihan)
+        self.assertLess(time.perf_counter() - start, 1)
+
+        self.assertEqual(matrix.shape, (2000, 50))
+        self.assertEqual(matrix.dtype, scoring.np.int32)
+        self.assertEqual(sum(stats[0]['distraktor'].values()), 2000)
+        self.assertEqual(int(skor[0]), sum(jawaban_list[0][s] == k for s, k in zip(soal, kunci)))
+
+
+@modify_settings(MIDDLEWARE={'prepend': 'ujian_core.middleware.QueryCountMiddleware'})
+class QueryCountMiddlewareTest(TestCase):
+    """Header X-DB-* untuk loadtest.py (BENCHMARK_HEADERS=True)"""
+
+    def test_header_jumlah_query(self):
+        clear_pelanggaran_debounce()
+        response = self.client.post(
+            reverse('report_pelanggaran'),
+            {'hasil_ujian_id': 999, 'jenis_pelanggaran': 'TAB_SWITCH'},
+            content_type='application/json',
+        )
+        self.assertGreaterEqual(int(response['X-DB-Queries']), 1)
+        self.assertEqual(response['X-DB-Lock-Errors'], '0')
+
+
+class MetricsTest(TestCase):
+    """Histogram per endpoint, gabungan antar worker, endpoint Prometheus staff-only"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.metrics_dir = tmp.name
+        settings_override = override_settings(METRICS_DIR=tmp.name, METRICS_TOKEN='rahasia')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+        clear_pelanggaran_debounce()
+
+    def test_request_tercatat_per_nama_url(self):
+        response = self.client.post(
+            reverse('report_pelanggaran'),
+            {'hasil_ujian_id': 999, 'jenis_pelanggaran': 'TAB_SWITCH'},
+            content_type='application/json',
+        )
+        series = metrics.collect()[('report_pelanggaran', 'POST', str(response.status_code))]
+        self.assertEqual(sum(series['duration']['counts']), 1)
+        self.assertGreaterEqual(series['queries']['sum'], 1)
+
+    def test_gabung_snapshot_worker_lain(self):
+        metrics.record('login', 'POST', '200', 0.02, 1, 0.001)
+        with open(os.path.join(self.metrics_dir, '99999.json'), 'w') as f:
+            json.dump({'pid': 99999, 'time': time.time(), 'series': metrics._snapshot()}, f)
+        metrics.record('login', 'POST', '200', 3.0, 1, 0.001)
+
+        [row] = metrics.summary()
+        self.assertEqual(row['requests'], 3)
+        self.assertEqual(row['queries_per_req'], 1)
+
+    @skipUnless(os.name != 'nt', 'cek PID hidup hanya di POSIX')
+    def test_snapshot_worker_diam_tidak_dihapus(self):
+        lama = time.time() - 3600
+        for pid in (os.getppid(), 999999999):
+            path = os.path.join(self.metrics_dir, f'{pid}.json')
+            with open(path, 'w') as f:
+                json.dump({'pid': pid, 'time': lama, 'series': []}, f)
+            os.utime(path, (lama, lama))
+        metrics.collect()
+        # PID induk masih hidup → snapshot-nya tetap dihitung; PID mati → dibuang
+        self.assertEqual(os.listdir(self.metrics_dir), [f'{os.getppid()}.json'])
+
+    def test_flush_tanpa_perubahan_memperbarui_mtime(self):
+        metrics.record('login', 'POST', '200', 0.02, 1, 0.001)
+        metrics.flush()
+        path = os.path.join(self.metrics_dir, f'{os.getpid()}.json')
+        os.utime(path, (0, 0))
+        metrics.flush()
+        self.assertGreater(os.path.getmtime(path), time.time() - 60)
+
+    def test_endpoint_prometheus(self):
+        metrics.record('login', 'POST', '200', 0.02, 2, 0.001)
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer rahasia')
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('ujian_http_request_duration_seconds_bucket{endpoint="login",method="POST",status="200",le="0.025"} 1', text)
+        self.assertIn('ujian_http_request_db_queries_sum{endpoint="login",method="POST",status="200"} 2', text)
+
+        staff = User.objects.create_user('staff', password='x', is_staff=True)
+        self.client.force_login(staff)
+        data = self.client.get(url, {'format': 'json'}).json()
+        self.assertEqual(data['endpoints'][0]['endpoint'], 'login')
+
+    def test_dashboard_monitor_anonim_ke_login(self):
+        # Dipanggil langsung: di URLconf proyek /admin/ lebih dulu ditangkap admin.site
+        request = RequestFactory().get('/admin/monitor/')
+        request.user = AnonymousUser()
+        response = views.admin_monitor_view(request)
+        self.assertRedirects(response, '/admin/login/?next=/admin/monitor/', fetch_redirect_response=False)
+
+    def test_biaya_record_kecil(self):
+        start = time.perf_counter()
+        for i in range(10000):
+            metrics.record('login', 'POST', '200', 0.01 * (i % 50), i % 7, 0.001)
+        # Jauh di bawah 1 ms per request (biasanya beberapa mikrodetik)
+        self.assertLess((time.perf_counter() - start) / 10000, 0.0001)
+
+
+@modify_settings(MIDDLEWARE={'append': 'ujian_core.middleware.ProfilingMiddleware'})
+class ProfilingTest(TestCase):
+    """Profil request terpilih → file .prof / .collapsed → profile_hotspots"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+        settings_override = override_settings(PROFILE_DIR=tmp.name, PROFILE_SAMPLE_RATE=0, PROFILE_MAX_FILES=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(profiling.clear_toggle)
+        profiling.clear_toggle()
+        clear_pelanggaran_debounce()
+
+    def lapor(self, n=1):
+        for i in range(n):
+            self.client.post(
+                reverse('report_pelanggaran'),
+                {'hasil_ujian_id': 999 + i, 'jenis_pelanggaran': 'TAB_SWITCH'},
+                content_type='application/json',
+            )
+
+    def test_mati_tanpa_file(self):
+        self.lapor()
+        self.assertEqual(glob.glob(os.path.join(self.dir, '*', '*')), [])
+
+    def test_toggle_cprofile_dan_rotasi(self):
+        profiling.write_toggle(['report_pelanggaran', 'login'], 1.0)
+        self.lapor(3)
+        files = glob.glob(os.path.join(self.dir, 'report_pelanggaran', '*.prof'))
+        self.assertEqual(len(files), 2)
+
+        out = io.StringIO()
+        call_command('profile_hotspots', 'report_pelanggaran', '--top', '5', stdout=out)
+        self.assertIn('report_pelanggaran: 2 request', out.getvalue())
+
+    def test_mode_sample_collapsed(self):
+        profiling.write_toggle([], 1.0, mode='sample')
+        self.lapor()
+        [path] = glob.glob(os.path.join(self.dir, 'report_pelanggaran', '*.collapsed'))
+        out = io.StringIO()
+        merged = os.path.join(self.dir, 'merged.txt')
+        call_command('profile_hotspots', '--collapsed-out', merged, stdout=out)
+        self.assertTrue(os.path.exists(merged))
+
+    def test_toggle_hanya_admin(self):
+        url = reverse('profiling_toggle')
+        self.assertEqual(self.client.post(url, {'rate': 1}, content_type='application/json').status_code, 403)
+        self.client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+        data = self.client.post(url, {'rate': 0.5, 'endpoints': ['login'], 'minutes': 5},
+                                content_type='application/json').json()
+        self.assertEqual((data['rate'], data['endpoints']), (0.5, ['login']))
+        self.assertEqual(self.client.post(url, {'rate': 0}, content_type='application/json').json()['rate'], 0)
+        self.assertEqual(self.client.post(url, [], content_type='application/json').status_code, 400)
+
+    def test_toggle_butuh_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(User.objects.create_user('staff', password='x', is_staff=True))
+        url = reverse('profiling_toggle')
+        self.assertEqual(client.post(url, {'rate': 1}, content_type='application/json').status_code, 403)
+        self.assertIsNone(profiling.read_toggle())
+
+        client.get(url)
+        token = client.cookies['csrftoken'].value
+        respon = client.post(url, {'rate': 0.5}, content_type='application/json', HTTP_X_CSRFTOKEN=token)
+        self.assertEqual(respon.json()['rate'], 0.5)
+
+
+class StaticServeTest(TestCase):
+    """STATIC_ROOT dilayani sebelum Django: cache immutable, gz/br, 304, Range"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        os.makedirs(os.path.join(tmp.name, 'css'))
+        with open(os.path.join(tmp.name, 'css', 'app.abc123.css'), 'w') as f:
+            f.write('body { color: red; }\n' * 200)
+        with open(os.path.join(tmp.name, 'bunyi.mp3'), 'wb') as f:
+            f.write(bytes(range(256)) * 4)
+        with open(os.path.join(tmp.name, 'staticfiles.json'), 'w') as f:
+            json.dump({'paths': {'css/app.css': 'css/app.abc123.css'}}, f)
+        compress_file(os.path.join(tmp.name, 'css', 'app.abc123.css'))
+
+        self.app = StaticWSGIMiddleware(lambda environ, start_response: [b'django'], StaticFiles(tmp.name, '/static/'))
+
+    def get(self, path, **headers):
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': 'GET', 'wsgi.file_wrapper': FileWrapper}
+        environ.update({f"HTTP_{key.upper()}": value for key, value in headers.items()})
+        result = {}
+
+        def start_response(status, response_headers):
+            result['status'] = status
+            result['headers'] = dict(response_headers)
+
+        result['body'] = b''.join(self.app(environ, start_response))
+        return result
+
+    def test_hashed_gzip_dan_304(self):
+        res = self.get('/static/css/app.abc123.css', accept_encoding='gzip')
+        self.assertEqual(res['status'], '200 OK')
+        self.assertEqual(res['headers']['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(res['headers']['Content-Encoding'], 'gzip')
+        self.assertEqual(res['headers']['Vary'], 'Accept-Encoding')
+        self.assertLess(len(res['body']), 4200)
+
+        ulang = self.get('/static/css/app.abc123.css', accept_encoding='gzip', if_none_match=res['headers']['ETag'])
+        self.assertEqual((ulang['status'], ulang['body']), ('304 Not Modified', b''))
+        self.assertNotIn('Content-Encoding', self.get('/static/css/app.abc123.css')['headers'])
+
+    def test_range_dan_fallback(self):
+        res = self.get('/static/bunyi.mp3', range='bytes=10-19')
+        self.assertEqual(res['status'], '206 Partial Content')
+        self.assertEqual(res['body'], bytes(range(10, 20)))
+        self.assertEqual(res['headers']['Content-Range'], 'bytes 10-19/1024')
+        # Range dari byte 0 (probe audio Safari) tidak boleh mengirim file utuh
+        awal = self.get('/static/bunyi.mp3', range='bytes=0-9')
+        self.assertEqual((awal['status'], awal['body']), ('206 Partial Content', bytes(range(10))))
+        self.assertEqual(len(self.get('/static/bunyi.mp3')['body']), 1024)
+        self.assertEqual(res['headers']['Cache-Control'], 'public, max-age=3600')
+        self.assertEqual(self.get('/static/bunyi.mp3', range='bytes=5000-')['status'], '416 Range Not Satisfiable')
+        # If-Range tidak cocok → file utuh
+        self.assertEqual(len(self.get('/static/bunyi.mp3', range='bytes=0-9', if_range='"lama"')['body']), 1024)
+        self.assertEqual(self.get('/static/tidak-ada.css')['body'], b'django')
+
+
+class PageCacheTest(TestCase):
+    """Halaman peserta di-render sekali per versi; refresh dengan ETag → 304"""
+
+    def setUp(self):
+        get_page_cache().clear()
+        self.addCleanup(get_page_cache().clear)
+
+    def test_etag_304(self):
+        res = self.client.get('/exam/')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res['Cache-Control'], 'no-cache')
+        self.assertIn('Last-Modified', res)
+
+        ulang = self.client.get('/exam/', HTTP_IF_NONE_MATCH=res['ETag'])
+        self.assertEqual(ulang.status_code, 304)
+        self.assertEqual(ulang.content, b'')
+        self.assertEqual(self.client.get('/exam/', HTTP_IF_NONE_MATCH='"lama"').content, res.content)
+
+        with override_settings(PAGE_CACHE_ENABLED=False):
+            self.assertNotIn('ETag', self.client.get('/exam/'))
+
+    def test_render_sekali_per_versi(self):
+        cache = PageCache(reload_interval=0)
+        page = cache.get('ujian_core/login.html')
+        self.assertIs(cache.get('ujian_core/login.html'), page)
+        # Versi (mtime template / hash manifest) berubah → render ulang
+        page['version'] = (0, 'lama')
+        self.assertIsNot(cache.get('ujian_core/login.html'), page)
+
+
+class MonitorBusTest(TestCase):
+    """Resume Last-Event-ID, filter ujian, dan snapshot saat event terlewat"""
+
+    def test_resume_dan_filter_ujian(self):
+        bus = MonitorBus(max_events=10)
+        awal = bus.publish('lock', {'hasil_ujian_id': 1}, ujian_id=1)
+        bus.publish('lock', {'hasil_ujian_id': 2}, ujian_id=2)
+        bus.publish('selesai', {'hasil_ujian_id': 1}, ujian_id=1)
+
+        events, complete, head = bus.since(bus.parse_id(awal['id']))
+        self.assertTrue(complete)
+        self.assertEqual([e['data']['hasil_ujian_id'] for e in events], [2, 1])
+
+        events, complete, _ = bus.since(bus.parse_id(awal['id']), ujian_id=1)
+        self.assertEqual([e['type'] for e in events], ['selesai'])
+        self.assertEqual(head, 3)
+
+    def test_id_lama_atau_epoch_lain_perlu_snapshot(self):
+        bus = MonitorBus(max_events=2)
+        awal = bus.publish('lock', {}, ujian_id=1)
+        bus.publish('lock', {}, ujian_id=1)
+        bus.publish('lock', {}, ujian_id=1)
+        bus.publish('lock', {}, ujian_id=1)
+
+        _, complete, _ = bus.since(bus.parse_id(awal['id']))
+        self.assertFalse(complete)
+        self.assertIsNone(bus.parse_id(MonitorBus().cursor(1)))
+
+    def test_aksi_admin_masuk_feed(self):
+        ujian = Ujian.objects.create(
+            nama_ujian='Ujian', pin_ujian='1', url_soal='https://example.com/soal',
+            waktu_mulai=timezone.now(), durasi=60,
+        )
+        hasil = HasilUjian.objects.create(peserta=Peserta.objects.create(nama='Ani', kelas='X'), ujian=ujian)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'rahasia'))
+        url = reverse('admin:ujian_core_hasilujian_changelist')
+
+        head = monitor_bus.since(0)[2]
+        for action in ('diskualifikasi_ujian', 'reset_ujian'):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(url, {'action': action, '_selected_action': [str(hasil.id)]})
+
+        events, _, _ = monitor_bus.since(head, ujian_id=ujian.id)
+        self.assertEqual(
+            [(e['type'], e['data']['status']) for e in events],
+            [('diskualifikasi', 'diskualifikasi'), ('mulai', 'mulai')],
+        )
+
+    def test_wait_bangun_saat_ada_event(self):
+        bus = MonitorBus()
+        threading.Timer(0.1, bus.publish, args=('violation', {}, 5)).start()
+        events, complete, _ = bus.wait(0, ujian_id=5, timeout=5)
+        self.assertTrue(complete)
+        self.assertEqual(events[0]['type'], 'violation')
 
-# Create your tests here.
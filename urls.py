@@ -16,8 +16,14 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from ujian_core import views as ujian_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('ujian_core.urls')),  # SEMUA ROUTING DIHANDLE OLEH ujian_core
+    path('api/heartbeat/', ujian_views.heartbeat, name='heartbeat'),
+    path('api/autosave/', ujian_views.autosave_jawaban, name='autosave_jawaban'),
+    path('api/monitor/feed/', ujian_views.monitor_feed, name='monitor_feed'),
+    path('api/metrics/', ujian_views.metrics_view, name='metrics'),
+    path('api/profiling/', ujian_views.profiling_toggle, name='profiling_toggle'),
 ]
\ No newline at end of file
@@ -1,22 +1,248 @@
+import atexit
 import os
+import queue
+import re
+import threading
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 load_dotenv()  # penting kalau kamu pakai .env
 
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+
+# Batas panjang 1 pesan Telegram (karakter)
+TELEGRAM_MAX_LENGTH = 4096
+ALERT_SEPARATOR = "\n\n➖➖➖➖➖\n"
+TAG_RE = re.compile(r"<(/?)([a-zA-Z][\w-]*)[^>]*>")
+
+
+def truncate_html(text, limit=TELEGRAM_MAX_LENGTH):
+    """
+    Potong teks parse_mode=HTML jadi <= limit karakter tanpa memotong di
+    tengah tag / entity, lalu tutup tag yang masih terbuka (kalau tidak,
+    Telegram menolak pesan dengan 400 "can't parse entities").
+    """
+    if len(text) <= limit:
+        return text
+    cut = limit
+    while cut > 0:
+        head = text[:cut]
+        # Jangan berhenti di dalam "<b" atau "&amp"
+        lt = head.rfind("<")
+        if lt > head.rfind(">"):
+            head = head[:lt]
+        amp = head.rfind("&")
+        if amp > head.rfind(";") and len(head) - amp <= 10:
+            head = head[:amp]
+
+        stack = []
+        for match in TAG_RE.finditer(head):
+            closing, name = match.group(1), match.group(2).lower()
+            if not closing:
+                stack.append(name)
+            elif name in stack:
+                del stack[len(stack) - 1 - stack[::-1].index(name)]
+        closers = "".join(f"</{name}>" for name in reversed(stack))
+        if len(head) + len(closers) <= limit:
+            return head + closers
+        cut = len(head) - (len(head) + len(closers) - limit)
+    return ""
+
+
+class AlertDispatcher:
+    """
+    Kirim alert Telegram di thread background.
+
+    enqueue() langsung return; worker menggabungkan alert yang masuk dalam
+    coalesce_window detik menjadi satu pesan, menjaga jeda min_interval
+    antar pesan (rate limit Telegram), dan retry dengan backoff kalau kena
+    429 / error jaringan. Pesan gabungan yang ditolak 400 dikirim ulang per
+    alert. Antrian dibatasi max_queue; alert yang tidak muat dihitung sebagai
+    dropped.
+    """
+
+    def __init__(self, bot_token, chat_id, api_url=TELEGRAM_API_URL,
+                 max_queue=1000, coalesce_window=2.0, min_interval=1.0,
+                 max_retries=5, backoff=1.0, timeout=(3.05, 10)):
+        self.bot_token = bot_token
+        self.chat_id = chat_id
+        self.api_url = api_url.rstrip("/")
+        self.coalesce_window = coalesce_window
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._session = None
+        self._last_post = 0.0
+        self.counters = {"queued": 0, "sent": 0, "dropped": 0, "retried": 0, "messages": 0}
+
+    def stats(self):
+        """Snapshot counter + isi antrian saat ini"""
+        with self._lock:
+            data = dict(self.counters)
+        data["pending"] = self._queue.qsize()
+        return data
+
+    def enqueue(self, text):
+        """Masukkan alert ke antrian; False kalau antrian penuh (alert dibuang)"""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(truncate_html(str(text)))
+        except queue.Full:
+            self._count("dropped")
+            print("Alert queue penuh, alert dibuang")
+            return False
+        self._count("queued")
+        return True
+
+    def flush(self, timeout=None):
+        """Tunggu sampai antrian kosong (dipakai saat shutdown / test)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def _ensure_worker(self):
+        # Cek pid juga: setelah fork (gunicorn dll) thread lama tidak ikut
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+            self._thread = threading.Thread(target=self._run, name="telegram-alert", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        carry = None
+        while True:
+            text = carry if carry is not None else self._queue.get()
+            carry = None
+            batch = [text]
+            length = len(text)
+            deadline = time.monotonic() + self.coalesce_window
+
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if length + len(ALERT_SEPARATOR) + len(nxt) > TELEGRAM_MAX_LENGTH:
+                    carry = nxt
+                    break
+                batch.append(nxt)
+                length += len(ALERT_SEPARATOR) + len(nxt)
+
+            try:
+                self._send(batch)
+            except Exception as e:
+                self._count("dropped", len(batch))
+                print("Error sending alert:", e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _send(self, batch):
+        status = self._post(ALERT_SEPARATOR.join(batch))
+        if status == 400 and len(batch) > 1:
+            # Satu alert rusak (mis. HTML dari nama siswa) jangan ikut membuang
+            # alert lain yang digabung bersamanya: kirim ulang satu per satu
+            print(f"Pesan gabungan ditolak, kirim ulang {len(batch)} alert satu per satu")
+            for text in batch:
+                self._count("sent" if _ok(self._post(text)) else "dropped")
+            return
+        self._count("sent" if _ok(status) else "dropped", len(batch))
+
+    def _post(self, text):
+        """Status HTTP terakhir dari Telegram, None kalau retry habis"""
+        url = f"{self.api_url}/bot{self.bot_token}/sendMessage"
+        payload = {
+            "chat_id": self.chat_id,
+            "text": text,
+            "parse_mode": "HTML"
+        }
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retried")
+
+            wait = self._last_post + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_post = time.monotonic()
+
+            delay = self.backoff * (2 ** attempt)
+            try:
+                resp = self._session.post(url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                print("Error sending alert:", e)
+                time.sleep(delay)
+                continue
+
+            if resp.status_code == 429:
+                # Telegram memberi tahu berapa detik harus menunggu
+                try:
+                    delay = float(resp.json()["parameters"]["retry_after"])
+                except (ValueError, KeyError, TypeError):
+                    pass
+                print(f"Telegram rate limit, tunggu {delay} detik")
+                time.sleep(delay)
+                continue
+
+            if resp.status_code >= 500:
+                print("Error sending alert:", resp.status_code)
+                time.sleep(delay)
+                continue
+
+            if resp.status_code >= 400:
+                # 4xx lain (token/chat salah, HTML rusak) tidak akan sukses di-retry
+                print("Error sending alert:", resp.status_code, resp.text[:200])
+                return resp.status_code
+
+            self._count("messages")
+            print("Telegram alert sent")
+            return resp.status_code
+
+        return None
+
+
+def _ok(status):
+    return status is not None and status < 400
+
+
+dispatcher = AlertDispatcher(
+    BOT_TOKEN,
+    CHAT_ID,
+    max_queue=int(os.getenv("ALERT_QUEUE_SIZE", "1000")),
+    coalesce_window=float(os.getenv("ALERT_COALESCE_WINDOW", "2")),
+)
+# Alert yang masih antri dikirim dulu sebelum proses keluar
+atexit.register(dispatcher.flush, 10)
+
 
 def send_alert(text):
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": CHAT_ID,
-        "text": text,
-        "parse_mode": "HTML"
-    }
-    try:
-        resp = requests.post(url, json=payload)
-        resp.raise_for_status()
-        print("Telegram alert sent")
-    except Exception as e:
-        print("Error sending alert:", e)
+    """Antrikan alert Telegram (tidak menunggu HTTP); False kalau dibuang"""
+    return dispatcher.enqueue(text)
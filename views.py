@@ -1,29 +1,47 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Peserta, Ujian, KodeAkses, HasilUjian
-from .serializers import LoginSerializer, KodeAksesSerializer, JawabanSerializer, PelanggaranSerializer
-from django.shortcuts import render
-from django.views.decorators.csrf import csrf_exempt
+from .models import Peserta, Ujian, KodeAkses, HasilUjian, redeem_kode_akses, KodeAksesSibuk, get_ujian_aktif
+from .models import debounce_pelanggaran, catat_pelanggaran
+from .serializers import LoginSerializer, KodeAksesSerializer, JawabanSerializer, PelanggaranSerializer, AutosaveSerializer
+from django.shortcuts import render, redirect
+from django.db.models import Count
+from django.http import HttpResponse, StreamingHttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt, csrf_protect, ensure_csrf_cookie
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
+from django.core.handlers.asgi import ASGIRequest
 import json
-from .utils import send_alert 
+from .utils import send_alert, dispatcher
+from .roster import get_roster, parse_siswa
+from .importer import bulk_import_peserta
+from .eventlog import get_event_log
+from .exam_clock import get_session_clock, forget_session, masih_dalam_waktu
+from .autosave import queue_patch, flush_session
+from .async_orm import run_orm
+from .security_events import record_security_event
+from .monitor_feed import bus as monitor_bus, snapshot as monitor_snapshot, publish_session, publish_alert
+from . import metrics, profiling
+from .page_cache import cached_page
 import os
+import time
 from django.conf import settings
 import uuid
 from django.utils import timezone
+from django.db import IntegrityError, transaction
 
 # ==================== HALAMAN FRONTEND ====================
+# Halaman peserta sama untuk semua orang: dilayani dari page_cache (ETag / 304)
 def login_view(request):
     """Halaman login peserta"""
-    return render(request, 'ujian_core/login.html')
+    return cached_page(request, 'ujian_core/login.html')
 
 def menu_view(request):
     """Halaman menu setelah login"""
-    return render(request, 'ujian_core/menu.html')
+    return cached_page(request, 'ujian_core/menu.html')
 
 def exam_view(request):
     """Halaman exam (masuk kode akses)"""
-    return render(request, 'ujian_core/exam.html')
+    return cached_page(request, 'ujian_core/exam.html')
 
 def manage_peserta_view(request):
     """Halaman manage peserta"""
@@ -31,24 +49,25 @@ def manage_peserta_view(request):
 
 def exam_consent_view(request):
     """Halaman persetujuan ujian"""
-    return render(request, 'ujian_core/exam_consent.html')
+    return cached_page(request, 'ujian_core/exam_consent.html')
 
 def exam_lock_view(request):
     """Halaman terkunci saat ujian"""
-    return render(request, 'ujian_core/exam_lock.html')
+    return cached_page(request, 'ujian_core/exam_lock.html')
 
 # ==================== TEST NOTIF ====================
-@api_view(['GET'])
-def test_notif(request):
+@require_GET
+async def test_notif(request):
     """Test endpoint untuk notifikasi"""
     try:
-        send_alert("Test notifikasi dari Django")
-        return Response({
-            "status": "success",
-            "message": "Notifikasi test dikirim"
+        queued = send_alert("Test notifikasi dari Django")
+        return JsonResponse({
+            "status": "success" if queued else "error",
+            "message": "Notifikasi test masuk antrian" if queued else "Antrian alert penuh",
+            "alert_stats": dispatcher.stats()
         })
     except Exception as e:
-        return Response({
+        return JsonResponse({
             "status": "error",
             "message": f"Gagal: {str(e)}"
         })
@@ -59,7 +78,7 @@ def login_peserta(request):
     """
     LOGIN:
     1. cek DB
-    2. kalau tidak ada → cek siswa.json
+    2. kalau tidak ada → cek roster siswa.json (indeks in-memory)
     3. kalau ada di JSON → auto insert DB → login
     """
     serializer = LoginSerializer(data=request.data)
@@ -68,37 +87,27 @@ def login_peserta(request):
         nama = serializer.validated_data['nama'].strip()
         pin_ujian = serializer.validated_data['pin_ujian']
 
-        # ====== CEK UJIAN DULU ======
-        try:
-            ujian = Ujian.objects.get(pin_ujian=pin_ujian, aktif=True)
-        except Ujian.DoesNotExist:
+        # ====== CEK UJIAN DULU (cache PIN, tanpa query DB) ======
+        ujian = get_ujian_aktif(pin_ujian)
+        if ujian is None:
             return Response({
                 "status": "error",
                 "message": "PIN ujian salah atau ujian tidak aktif"
             }, status=400)
 
         # ====== CEK DATABASE ======
-        peserta = Peserta.objects.filter(nama__iexact=nama).first()
+        peserta = Peserta.cari_nama(nama).order_by('id').first()
 
-        # ====== KALAU TIDAK ADA → CEK JSON ======
+        # ====== KALAU TIDAK ADA → CEK ROSTER siswa.json (in-memory) ======
         if not peserta:
-            # ---------- FIX PATH JSON ----------
-            json_path = os.path.join(settings.BASE_DIR, "ujian_core", "siswa.json")
-
-            if os.path.exists(json_path):
-                with open(json_path, "r", encoding="utf-8") as f:
-                    siswa_data = json.load(f)
-
-                for item in siswa_data:
-                    nama_json = item.get("Nama", "").strip().lower()
-
-                    if nama_json == nama.lower():
-                        peserta = Peserta.objects.create(
-                            nama=item.get("Nama", "").strip(),
-                            nis=str(item.get("Nis ", "")).strip(),
-                            kelas=item.get("Jurusan", "").strip()
-                        )
-                        break
+            siswa = get_roster().get(nama)
+            if siswa:
+                try:
+                    with transaction.atomic():
+                        peserta = Peserta.objects.create(**siswa)
+                except IntegrityError:
+                    # Login bersamaan untuk siswa yang sama → pakai yang sudah dibuat
+                    peserta = Peserta.cari_nama(nama).order_by('id').first()
 
         # ====== VALIDASI TERAKHIR ======
         if not peserta:
@@ -113,8 +122,8 @@ def login_peserta(request):
             "peserta_id": peserta.id,
             "nama": peserta.nama,
             "kelas": getattr(peserta, "kelas", None),
-            "ujian_id": ujian.id,
-            "nama_ujian": ujian.nama_ujian
+            "ujian_id": ujian["id"],
+            "nama_ujian": ujian["nama_ujian"]
         })
 
     return Response(serializer.errors, status=400)
@@ -127,81 +136,145 @@ def validate_kode_akses(request):
         kode_akses = serializer.validated_data['kode_akses']
         peserta_id = serializer.validated_data['peserta_id']
         
+        # ====== KLAIM KODE + BUAT HASIL & LOCK DALAM 1 TRANSAKSI ======
         try:
-            kode = KodeAkses.objects.get(kode=kode_akses, terpakai=False)
-            peserta = Peserta.objects.get(id=peserta_id)
-            
-            hasil_ujian, created = HasilUjian.objects.get_or_create(
-                peserta=peserta,
-                ujian=kode.ujian,
-                defaults={'status': 'mulai'}
+            redeemed = redeem_kode_akses(
+                kode_akses,
+                peserta_id,
+                ip_address=request.META.get('REMOTE_ADDR'),
+                user_agent=request.META.get('HTTP_USER_AGENT', '')
             )
-            
-            kode.terpakai = True
-            kode.save()
-            
-            # ✅ RESPONSE DENGAN SESSION TOKEN
-            response_data = {
-                "status": "success",
-                "url_soal": kode.ujian.url_soal,
-                "ujian_id": kode.ujian.id,
-                "hasil_ujian_id": hasil_ujian.id,
-                "session_token": None,  # Default null
-                "requires_consent": False  # Default false
-            }
-            
-            # ✅ CEK APAKAH LOCK SYSTEM AKTIF
-            try:
-                from .models import SessionLock
-                
-                # Buat session lock
-                session_lock, created = SessionLock.objects.get_or_create(
-                    hasil_ujian=hasil_ujian,
-                    defaults={
-                        'session_token': str(uuid.uuid4()),
-                        'ip_address': request.META.get('REMOTE_ADDR'),
-                        'user_agent': request.META.get('HTTP_USER_AGENT', '')
-                    }
-                )
-                
-                response_data['session_token'] = session_lock.session_token
-                response_data['requires_consent'] = True
-                
-            except ImportError:
-                # Model SessionLock belum ada, skip
-                pass
-            
-            return Response(response_data)
-            
-        except (KodeAkses.DoesNotExist, Peserta.DoesNotExist):
+        except KodeAksesSibuk:
+            return Response({
+                "status": "error",
+                "message": "Server sedang sibuk, silakan coba lagi"
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        if redeemed is None:
             return Response({
                 "status": "error",
                 "message": "Kode akses tidak valid atau peserta tidak ditemukan"
             }, status=status.HTTP_400_BAD_REQUEST)
+
+        kode, hasil_ujian, session_lock = redeemed
+
+        # ✅ RESPONSE DENGAN SESSION TOKEN
+        return Response({
+            "status": "success",
+            "url_soal": kode.ujian.url_soal,
+            "ujian_id": kode.ujian.id,
+            "hasil_ujian_id": hasil_ujian.id,
+            "session_token": session_lock.session_token,
+            "requires_consent": True
+        })
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+def heartbeat(request):
+    """
+    Sisa waktu ujian menurut server (dipanggil tiap beberapa detik oleh
+    exam.js). Hanya baca cache jam sesi, tidak ada query/tulis DB.
+    """
+    sesi = get_session_clock(request.GET.get('session_token', ''))
+    if sesi is None:
+        return Response({
+            "status": "error",
+            "message": "Sesi ujian tidak ditemukan"
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        "status": "success",
+        "sesi": sesi['status'],
+        "remaining": sesi['remaining'],
+        "deadline": sesi['deadline'].isoformat(),
+        "server_time": timezone.now().isoformat()
+    })
+
+
+@api_view(['POST'])
+def autosave_jawaban(request):
+    """
+    AUTOSAVE: patch jawaban per soal {"session_token", "seq", "jawaban": {soal: jawaban}}.
+    Patch ditampung lalu ditulis ke DB paling sering sekali per AUTOSAVE_INTERVAL;
+    patch dengan seq lama / berulang diabaikan.
+    """
+    serializer = AutosaveSerializer(data=request.data)
+    if serializer.is_valid():
+        sesi = get_session_clock(serializer.validated_data['session_token'])
+        if sesi is None:
+            return Response({
+                "status": "error",
+                "message": "Sesi ujian tidak ditemukan"
+            }, status=status.HTTP_404_NOT_FOUND)
+
+        if not sesi['menerima']:
+            return Response({
+                "status": "error",
+                "message": "Ujian sudah selesai, jawaban tidak bisa diubah"
+            }, status=status.HTTP_409_CONFLICT)
+
+        accepted, seq = queue_patch(
+            sesi['hasil_ujian_id'],
+            serializer.validated_data['seq'],
+            serializer.validated_data['jawaban']
+        )
+        return Response({
+            "status": "success",
+            "accepted": accepted,
+            "seq": seq
+        })
+
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 @api_view(['POST'])
 def submit_jawaban(request):
     serializer = JawabanSerializer(data=request.data)
     if serializer.is_valid():
-        try:
-            hasil_ujian = HasilUjian.objects.get(id=serializer.validated_data['hasil_ujian_id'])
-            hasil_ujian.jawaban = serializer.validated_data['jawaban_data']
-            hasil_ujian.status = 'selesai'
-            hasil_ujian.save()
-            
-            return Response({
-                "status": "success",
-                "message": "Jawaban berhasil disimpan"
-            })
-            
-        except HasilUjian.DoesNotExist:
+        hasil_ujian_id = serializer.validated_data['hasil_ujian_id']
+        jawaban_data = serializer.validated_data.get('jawaban_data')
+
+        # Patch autosave yang masih di memori ditulis dulu
+        flush_session(hasil_ujian_id)
+
+        # Hanya sesi yang masih berjalan dan belum lewat deadline + grace (jam server):
+        # submit tidak boleh membatalkan diskualifikasi / menimpa jawaban setelah waktu habis
+        sesi_berjalan = HasilUjian.objects.filter(masih_dalam_waktu(), id=hasil_ujian_id, status='mulai')
+        if jawaban_data:
+            # Client lama: jawaban lengkap dikirim sekaligus saat submit
+            updated = sesi_berjalan.update(
+                jawaban=jawaban_data,
+                status='selesai',
+                waktu_selesai=timezone.now()
+            )
+        else:
+            # Jawaban sudah tersimpan lewat autosave → cukup ubah status
+            updated = sesi_berjalan.update(
+                status='selesai',
+                waktu_selesai=timezone.now()
+            )
+
+        if not updated:
+            status_ujian = HasilUjian.objects.filter(id=hasil_ujian_id).values_list('status', flat=True).first()
+            if status_ujian is None:
+                return Response({
+                    "status": "error",
+                    "message": "Data ujian tidak ditemukan"
+                }, status=status.HTTP_400_BAD_REQUEST)
             return Response({
                 "status": "error",
-                "message": "Data ujian tidak ditemukan"
-            }, status=status.HTTP_400_BAD_REQUEST)
+                "message": "Waktu ujian sudah habis" if status_ujian == 'mulai' else "Ujian sudah selesai, jawaban tidak bisa diubah",
+                "status_ujian": status_ujian
+            }, status=status.HTTP_409_CONFLICT)
+
+        forget_session(hasil_ujian_id=hasil_ujian_id)
+        publish_session(hasil_ujian_id, 'selesai')
+        return Response({
+            "status": "success",
+            "message": "Jawaban berhasil disimpan"
+        })
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -210,22 +283,67 @@ def submit_jawaban(request):
 def report_pelanggaran(request):
     serializer = PelanggaranSerializer(data=request.data)
     if serializer.is_valid():
-        try:
-            hasil_ujian = HasilUjian.objects.get(id=serializer.validated_data['hasil_ujian_id'])
-            
-            hasil_ujian.catatan_pelanggaran = f"{serializer.validated_data['jenis_pelanggaran']}: {serializer.validated_data['detail']}"
-            hasil_ujian.save()
-            
+        data = serializer.validated_data
+        if 'hasil_ujian_id' in data:
+            hasil_ujian_id = data['hasil_ujian_id']
+        else:
+            hasil_ujian_id = (
+                HasilUjian.objects
+                .filter(peserta_id=data['peserta_id'], ujian_id=data['ujian_id'])
+                .values_list('id', flat=True)
+                .first()
+            )
+
+        # Satu kali pindah tab bisa memicu beberapa event dari browser. Kunci = id sesi,
+        # jadi klien yang berganti bentuk request (id / peserta+ujian) tetap kena debounce
+        if hasil_ujian_id is not None and debounce_pelanggaran(hasil_ujian_id, getattr(settings, 'PELANGGARAN_DEBOUNCE', 2)):
             return Response({
-                "status": "success", 
-                "message": "Pelanggaran berhasil dilaporkan"
+                "status": "success",
+                "message": "Pelanggaran sudah tercatat",
+                "debounced": True
             })
-            
-        except HasilUjian.DoesNotExist:
+
+        tercatat, hasil = (
+            catat_pelanggaran(getattr(settings, 'PELANGGARAN_MAKS', 3), id=hasil_ujian_id)
+            if hasil_ujian_id is not None else (False, None)
+        )
+        if hasil is None:
             return Response({
                 "status": "error",
                 "message": "Data ujian tidak ditemukan"
             }, status=status.HTTP_400_BAD_REQUEST)
+
+        if not tercatat:
+            # Sesi sudah selesai / didiskualifikasi: tidak ada yang dicatat
+            return Response({
+                "status": "error",
+                "message": "Ujian sudah selesai, pelanggaran tidak dicatat",
+                "percobaan_keluar": hasil['percobaan_keluar'],
+                "status_ujian": hasil['status'],
+                "diskualifikasi": hasil['status'] == 'diskualifikasi'
+            }, status=status.HTTP_409_CONFLICT)
+
+        diskualifikasi = hasil['status'] == 'diskualifikasi'
+        record_security_event(
+            'PAGE_VIOLATION',
+            f"{data['jenis_pelanggaran']}: {data['detail']}",
+            request.META.get('REMOTE_ADDR'),
+            user_agent=request.headers.get('User-Agent', ''),
+            session_lock_id=hasil['session_lock__id'],
+            ujian_id=hasil['ujian_id'],
+            metadata={'percobaan_keluar': hasil['percobaan_keluar']},
+        )
+        if diskualifikasi:
+            forget_session(hasil_ujian_id=hasil['id'])
+        publish_session(hasil['id'], hasil['status'] if diskualifikasi else 'pelanggaran')
+
+        return Response({
+            "status": "success",
+            "message": "Peserta didiskualifikasi" if diskualifikasi else "Pelanggaran berhasil dilaporkan",
+            "percobaan_keluar": hasil['percobaan_keluar'],
+            "status_ujian": hasil['status'],
+            "diskualifikasi": diskualifikasi
+        })
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -245,7 +363,7 @@ def tambah_peserta_simple(request):
                     "message": "❌ Nama tidak boleh kosong"
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            if Peserta.objects.filter(nama__iexact=nama).exists():
+            if Peserta.cari_nama(nama).exists():
                 return Response({
                     "status": "error", 
                     "message": f"❌ Peserta dengan nama '{nama}' sudah ada"
@@ -270,28 +388,83 @@ def tambah_peserta_simple(request):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+LIST_PESERTA_MAX_LIMIT = 1000
+
+
+def _peserta_rows(rows):
+    """Baris .values() → dict response (nis/kelas hanya kalau terisi)"""
+    for row in rows:
+        peserta_data = {
+            "id": row["id"],
+            "nama": row["nama"],
+            "total_ujian": row["total_ujian"]
+        }
+
+        if row["nis"]:
+            peserta_data["nis"] = row["nis"]
+        if row["kelas"]:
+            peserta_data["kelas"] = row["kelas"]
+
+        yield peserta_data
+
+
+def _stream_peserta_json(rows):
+    """Dump JSON penuh per potongan, tanpa menampung seluruh roster di memori"""
+    yield '{"status": "success", "data": ['
+    total = 0
+    for peserta_data in rows:
+        yield ("," if total else "") + json.dumps(peserta_data, ensure_ascii=False)
+        total += 1
+    yield f'], "total": {total}}}'
+
+
 @api_view(['GET'])
 def list_peserta(request):
+    """
+    LIST PESERTA (1 query, jumlah ujian via annotate):
+    - ?limit=N&after=<id>  → halaman keyset, lanjut pakai next_cursor
+    - ?stream=1            → dump semua peserta sebagai streaming JSON
+    - tanpa parameter      → semua peserta (format lama)
+    """
     try:
-        peserta_list = Peserta.objects.all().order_by('id')
-        
-        data = []
-        for peserta in peserta_list:
-            total_ujian = peserta.hasilujian_set.count()
-
-            peserta_data = {
-                "id": peserta.id,
-                "nama": peserta.nama,
-                "total_ujian": total_ujian
-            }
-            
-            if hasattr(peserta, 'nis') and peserta.nis:
-                peserta_data["nis"] = peserta.nis
-            if hasattr(peserta, 'kelas') and peserta.kelas:
-                peserta_data["kelas"] = peserta.kelas
-                
-            data.append(peserta_data)
-        
+        try:
+            after = int(request.GET.get('after', 0))
+            limit = request.GET.get('limit')
+            limit = max(1, min(int(limit), LIST_PESERTA_MAX_LIMIT)) if limit else None
+        except ValueError:
+            return Response({
+                "status": "error",
+                "message": "❌ Parameter after/limit harus angka"
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        peserta_list = (
+            Peserta.objects
+            .filter(id__gt=after)
+            .order_by('id')
+            .annotate(total_ujian=Count('hasilujian'))
+            .values('id', 'nama', 'nis', 'kelas', 'total_ujian')
+        )
+
+        if request.GET.get('stream') in ('1', 'true'):
+            return StreamingHttpResponse(
+                _stream_peserta_json(_peserta_rows(peserta_list.iterator(chunk_size=2000))),
+                content_type='application/json'
+            )
+
+        if limit is not None:
+            # Ambil 1 ekstra untuk tahu masih ada halaman berikutnya atau tidak
+            rows = list(peserta_list[:limit + 1])
+            has_more = len(rows) > limit
+            data = list(_peserta_rows(rows[:limit]))
+            return Response({
+                "status": "success",
+                "total": len(data),
+                "data": data,
+                "next_cursor": data[-1]["id"] if has_more else None
+            })
+
+        data = list(_peserta_rows(peserta_list))
+
         return Response({
             "status": "success",
             "total": len(data),
@@ -306,11 +479,12 @@ def list_peserta(request):
 
 
 # ==================== TELEGRAM ALERT ====================
-@api_view(['POST'])
 @csrf_exempt
-def telegram_alert(request):
+@require_POST
+async def telegram_alert(request):
+    """Async: log, feed monitor & antrian Telegram; tidak ada I/O yang ditunggu di event loop"""
     try:
-        data = request.data if hasattr(request, 'data') else json.loads(request.body)
+        data = json.loads(request.body)
         
         print("📨 Received alert data:", data)
         
@@ -368,24 +542,26 @@ def telegram_alert(request):
 ⏰ <b>Waktu:</b> {timestamp}
             """
         
-        log_file = os.path.join(settings.BASE_DIR, 'alerts.log')
-        with open(log_file, 'a', encoding='utf-8') as f:
-            log_entry = {
-                'timestamp': data.get('timestamp', ''),
-                'type': 'COMPLETION' if is_completion else 'VIOLATION',
-                'student': data.get('student', ''),
-                'class': data.get('class', ''),
-                'exam': data.get('exam', ''),
-                'violation': data.get('violationType', ''),
-                'details': data.get('details', '')
-            }
-            f.write(json.dumps(log_entry, ensure_ascii=False) + '\n')
+        record = {
+            'timestamp': data.get('timestamp', ''),
+            'type': 'COMPLETION' if is_completion else 'VIOLATION',
+            'student': data.get('student', ''),
+            'class': data.get('class', ''),
+            'exam': data.get('exam', ''),
+            'violation': data.get('violationType', ''),
+            'details': data.get('details', '')
+        }
+        await run_orm(
+            _record_alert, 'alerts.log', record['type'].lower(), record, data,
+            request.META.get('REMOTE_ADDR'), request.headers.get('User-Agent', '')
+        )
         
+        # Hanya masuk antrian; pengiriman ke Telegram dilakukan thread background
         send_alert(message)
         
-        print(f"✅ { 'COMPLETION' if is_completion else 'VIOLATION' } Alert sent to Telegram successfully")
+        print(f"✅ { 'COMPLETION' if is_completion else 'VIOLATION' } Alert queued for Telegram")
         
-        return Response({
+        return JsonResponse({
             "status": "success", 
             "message": "Alert dikirim ke Telegram",
             "alert_type": "completion" if is_completion else "violation",
@@ -398,29 +574,59 @@ def telegram_alert(request):
         
     except Exception as e:
         print("❌ Error in telegram_alert:", str(e))
-        return Response({
+        return JsonResponse({
             "status": "error", 
             "message": f"Internal server error: {str(e)}"
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _record_alert(filename, kind, record, data, ip_address=None, user_agent=''):
+    """
+    Bagian sinkron endpoint alert, dijalankan lewat run_orm: file log,
+    feed monitor, dan SecurityEvent PAGE_VIOLATION kalau sesi pengirim
+    dikenali dari session_token.
+    """
+    get_event_log(filename).write(record)
+
+    sesi = None
+    token = data.get('session_token')
+    if token:
+        sesi = get_session_clock(token)
+    if sesi is None:
+        publish_alert(kind, record)
+        return
+
+    publish_alert(kind, dict(record, hasil_ujian_id=sesi['hasil_ujian_id']), ujian_id=sesi['ujian_id'])
+    if kind == 'violation':
+        record_security_event(
+            'PAGE_VIOLATION',
+            f"{data.get('violationType', '')}: {data.get('details', '')}",
+            ip_address,
+            user_agent=user_agent,
+            browser_fingerprint=data.get('fingerprint', ''),
+            session_lock_id=sesi['session_lock_id'],
+            ujian_id=sesi['ujian_id'],
+            metadata=record,
+        )
+
 # ==================== FALLBACK VIOLATION ENDPOINT ====================
-@api_view(['POST'])
 @csrf_exempt
-def violation_alert(request):
+@require_POST
+async def violation_alert(request):
     try:
         data = json.loads(request.body)
         
-        log_file = os.path.join(settings.BASE_DIR, 'violations_fallback.log')
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(data, ensure_ascii=False) + '\n')
+        await run_orm(
+            _record_alert, 'violations_fallback.log', 'violation', data, data,
+            request.META.get('REMOTE_ADDR'), request.headers.get('User-Agent', '')
+        )
         
-        return Response({
+        return JsonResponse({
             "status": "success",
             "message": "Violation logged (fallback)"
         })
         
     except Exception as e:
-        return Response({
+        return JsonResponse({
             "status": "error",
             "message": str(e)
         }, status=500)
@@ -435,58 +641,35 @@ def import_siswa_json(request):
     IMPORT DATA PESERTA DARI FILE siswa.json 
     """
     try:
-        json_path = os.path.join(settings.BASE_DIR, "ujian_core", "siswa.json")
+        roster = get_roster()
+        roster.refresh(force=True)
 
-        if not os.path.exists(json_path):
+        if not roster.exists:
             return Response({
                 "status": "error",
                 "message": "File siswa.json tidak ditemukan."
             }, status=400)
 
-        # baca file json
-        with open(json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        if roster.error:
+            raise ValueError(roster.error)
 
-        if not isinstance(data, list):
+        if not roster.is_valid:
             return Response({
                 "status": "error",
                 "message": "Format JSON tidak valid (harus list)."
             }, status=400)
 
-        imported = 0
-        skipped = 0
-        errors = []
-
-        for item in data:
-            try:
-                nama = item.get("Nama", "").strip()
-                nis = str(item.get("Nis ", "")).strip()
-                kelas = item.get("Jurusan", "").strip()
-
-                if not nama:
-                    skipped += 1
-                    continue
-
-                if Peserta.objects.filter(nama__iexact=nama).exists():
-                    skipped += 1
-                    continue
-
-                Peserta.objects.create(
-                    nama=nama,
-                    nis=nis,
-                    kelas=kelas
-                )
-
-                imported += 1
-
-            except Exception as e:
-                errors.append({"nama": item.get("Nama", ""), "error": str(e)})
-                skipped += 1
+        # ====== BULK IMPORT (1 query cek + bulk_create per batch) ======
+        report = bulk_import_peserta(
+            enumerate(roster.records(), 1),
+            parse_siswa,
+        )
+        errors = [{"nama": nama, "error": pesan} for _, nama, pesan in report["errors"]]
 
         return Response({
             "status": "success",
-            "imported": imported,
-            "skipped": skipped,
+            "imported": report["imported"],
+            "skipped": report["skipped"],
             "errors": errors
         })
 
@@ -504,4 +687,195 @@ def admin_monitor_view(request):
     if not request.user.is_authenticated or not request.user.is_staff:
         return redirect('/admin/login/?next=/admin/monitor/')
     
-    return render(request, 'ujian_core/admin_monitor.html')
\ No newline at end of file
+    return render(request, 'ujian_core/admin_monitor.html', {
+        # Panel metrik (metrics_panel.html) diisi awal dari sini lalu di-refresh lewat /api/metrics/?format=json
+        'metrics_summary': metrics.summary()[:15],
+    })
+
+
+# ==================== FEED MONITOR (SSE / LONG-POLL) ====================
+def _sse_event(kind, data, event_id):
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _stream_monitor_feed(ujian_id, seq):
+    yield "retry: 3000\n\n"
+    end = time.monotonic() + getattr(settings, 'MONITOR_FEED_STREAM_SECONDS', 300)
+    events, complete, head = monitor_bus.since(seq, ujian_id)
+    while True:
+        if not complete:
+            # Client baru / event terlewat sudah terbuang → kirim keadaan penuh
+            yield _sse_event('snapshot', {'sessions': monitor_snapshot(ujian_id)}, monitor_bus.cursor(head))
+        elif not events:
+            # Komentar keep-alive; id ikut maju supaya resume tidak jatuh ke snapshot
+            yield f": ping\nid: {monitor_bus.cursor(head)}\n\n"
+        for event in events:
+            yield _sse_event(event['type'], event, event['id'])
+        seq = head
+
+        # Stream ditutup berkala; EventSource reconnect sendiri dengan Last-Event-ID
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            return
+        events, complete, head = monitor_bus.wait(seq, ujian_id, timeout=min(15, remaining))
+
+
+async def _astream_monitor_feed(ujian_id, seq):
+    """Versi async _stream_monitor_feed untuk ASGI (tidak memegang thread per pengawas)"""
+    yield "retry: 3000\n\n"
+    end = time.monotonic() + getattr(settings, 'MONITOR_FEED_STREAM_SECONDS', 300)
+    events, complete, head = monitor_bus.since(seq, ujian_id)
+    while True:
+        if not complete:
+            sessions = await run_orm(monitor_snapshot, ujian_id)
+            yield _sse_event('snapshot', {'sessions': sessions}, monitor_bus.cursor(head))
+        elif not events:
+            yield f": ping\nid: {monitor_bus.cursor(head)}\n\n"
+        for event in events:
+            yield _sse_event(event['type'], event, event['id'])
+        seq = head
+
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            return
+        events, complete, head = await monitor_bus.wait_async(seq, ujian_id, timeout=min(15, remaining))
+
+
+async def monitor_feed(request):
+    """
+    FEED MONITOR: perubahan sesi ujian secara live untuk dashboard admin.
+
+    Default Server-Sent Events; ?mode=poll untuk long-poll JSON.
+    ?ujian_id= membatasi ke satu ujian; resume lewat header Last-Event-ID
+    atau ?last_event_id=.
+    """
+    user = await request.auser()
+    if not user.is_authenticated or not user.is_staff:
+        return JsonResponse({
+            "status": "error",
+            "message": "Hanya untuk admin"
+        }, status=403)
+
+    ujian_id = request.GET.get('ujian_id')
+    if ujian_id:
+        if not ujian_id.isdigit():
+            return JsonResponse({
+                "status": "error",
+                "message": "ujian_id harus angka"
+            }, status=400)
+        ujian_id = int(ujian_id)
+    else:
+        ujian_id = None
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    seq = monitor_bus.parse_id(last_event_id)
+
+    if request.GET.get('mode') == 'poll':
+        try:
+            timeout = min(max(float(request.GET.get('timeout', 25)), 0), 60)
+        except ValueError:
+            timeout = 25
+        events, complete, head = await monitor_bus.wait_async(seq, ujian_id, timeout=timeout)
+        body = {
+            "status": "success",
+            "last_event_id": monitor_bus.cursor(head),
+            "events": events,
+        }
+        if not complete:
+            body["snapshot"] = await run_orm(monitor_snapshot, ujian_id)
+        return JsonResponse(body)
+
+    # WSGI tidak bisa menyalurkan iterator async secara streaming → pakai versi sync
+    if isinstance(request, ASGIRequest):
+        stream = _astream_monitor_feed(ujian_id, seq)
+    else:
+        stream = _stream_monitor_feed(ujian_id, seq)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ==================== METRIK (PROMETHEUS / PANEL MONITOR) ====================
+def _metrics_allowed(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    # Scraper Prometheus tidak punya sesi login admin
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    return bool(token) and request.headers.get('Authorization') == f"Bearer {token}"
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Metrik per endpoint (gabungan semua worker). Default format teks
+    Prometheus; ?format=json untuk ringkasan panel monitor admin.
+    """
+    if not _metrics_allowed(request):
+        return JsonResponse({
+            "status": "error",
+            "message": "Hanya untuk admin"
+        }, status=403)
+
+    merged = metrics.collect()
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            "status": "success",
+            "endpoints": metrics.summary(merged),
+        })
+    return HttpResponse(metrics.render_prometheus(merged), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# ==================== TOGGLE PROFILING (ADMIN) ====================
+# csrf_protect: POST diotorisasi cookie sesi admin, jadi halaman lain tidak boleh bisa memicunya
+@csrf_protect
+@ensure_csrf_cookie
+@require_http_methods(['GET', 'POST'])
+def profiling_toggle(request):
+    """
+    GET: konfigurasi profiling yang berlaku. POST {"endpoints": [...],
+    "rate": 0.1, "mode": "cprofile"|"sample", "minutes": 10} mengaktifkan
+    untuk semua worker; POST {"rate": 0} mematikan. Hanya berpengaruh kalau
+    server dijalankan dengan PROFILE_HOOK=True. POST wajib membawa header
+    X-CSRFToken (cookie csrftoken, di-set oleh GET ini / halaman admin).
+    """
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({
+            "status": "error",
+            "message": "Hanya untuk admin"
+        }, status=403)
+
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body or b'{}')
+            if not isinstance(data, dict) or not isinstance(data.get('endpoints', []), list):
+                raise TypeError("body harus objek JSON, endpoints berupa list")
+            rate = float(data.get('rate', 0))
+            minutes = float(data.get('minutes', 10))
+            endpoints = [str(e) for e in data.get('endpoints', [])]
+        except (ValueError, TypeError):
+            return JsonResponse({
+                "status": "error",
+                "message": "Format JSON tidak valid"
+            }, status=400)
+        mode = data.get('mode', 'cprofile')
+        if mode not in profiling.MODES or not 0 <= rate <= 1 or not 0 < minutes <= 24 * 60:
+            return JsonResponse({
+                "status": "error",
+                "message": f"mode harus {'/'.join(profiling.MODES)}, rate 0-1, minutes 1-1440"
+            }, status=400)
+        if rate == 0:
+            profiling.clear_toggle()
+        else:
+            profiling.write_toggle(endpoints, rate, mode, minutes)
+
+    endpoints, rate, mode = profiling.current_config()
+    return JsonResponse({
+        "status": "success",
+        "hook_aktif": getattr(settings, 'PROFILE_HOOK', False),
+        "endpoints": sorted(endpoints),
+        "rate": rate,
+        "mode": mode,
+        "toggle": profiling.read_toggle(),
+    })
+
@@ -0,0 +1,23 @@
+"""
+WSGI config for ujian_platform project.
+
+It exposes the WSGI callable as a module-level variable named ``application``.
+
+File di STATIC_ROOT (hasil `manage.py build_static`) dilayani langsung
+oleh StaticWSGIMiddleware sebelum masuk Django.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ujian_platform.settings')
+
+application = get_wsgi_application()
+
+from ujian_core.static_serve import StaticWSGIMiddleware  # noqa: E402 (butuh settings)
+
+application = StaticWSGIMiddleware(application)